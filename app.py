@@ -1,45 +1,27 @@
-import json
 import os
-import re
-from typing import Literal
 
+import pandas as pd
 import streamlit as st
 
-from src.app.services.sadf import convert_with_sadf as _svc_convert_with_sadf
-
-## Legacy helper removed
-
-
-@st.cache_data(show_spinner=False)
-def convert_with_sadf_cached(
-    path: str, sar_args: tuple[str, ...], prefer: Literal["auto", "12", "11"] = "auto"
-) -> tuple[Literal["json", "csv"], str]:
-    return _svc_convert_with_sadf(path, sar_args, prefer)
-
+from src.app.services.catalog import CATALOG, list_dirs
 
 ## Unused legacy load_* helpers removed
 
 
 def main():
+    # frames in the frame cache are shared across sessions: edits must copy, not mutate
+    pd.set_option("mode.copy_on_write", True)
     st.set_page_config(page_title="SAR Viewer", layout="wide")
     st.title("SAR Viewer (v11/v12 auto)")
 
     prefer = os.environ.get("SAR_VERSION", "auto").lower()
-    if prefer not in ("auto", "11", "12"):
+    if prefer not in ("auto", "11", "12", "native"):
         prefer = "auto"
 
     # Input controls (top)
     st.subheader("Input")
     logs_root = "logs"
-    dirs = (
-        [
-            d
-            for d in sorted(os.listdir(logs_root))
-            if os.path.isdir(os.path.join(logs_root, d)) and not d.startswith(".")
-        ]
-        if os.path.isdir(logs_root)
-        else []
-    )
+    dirs = list_dirs(logs_root)
 
     if not dirs:
         st.info("Place SAR files under logs/<dir>/ (e.g., logs/dir1/saXX)")
@@ -48,19 +30,11 @@ def main():
     source = st.radio("Source", options=["sar", "csv"], index=0, horizontal=True)
 
     # Filter directories depending on source
-    def _has_csv_bundle(dir_name: str) -> bool:
-        root = os.path.join(logs_root, dir_name, "csv")
-        if not os.path.isdir(root):
-            return False
-        for name in os.listdir(root):
-            cdir = os.path.join(root, name)
-            if os.path.isdir(cdir) and re.match(r"^\d{4}-\d{2}-\d{2}$", name):
-                # require at least cpu.csv inside the date dir
-                if os.path.isfile(os.path.join(cdir, "cpu.csv")):
-                    return True
-        return False
-
-    filtered_dirs = [d for d in dirs if _has_csv_bundle(d)] if source == "csv" else dirs
+    filtered_dirs = (
+        [d for d in dirs if CATALOG.has_csv_bundle(os.path.join(logs_root, d))]
+        if source == "csv"
+        else dirs
+    )
     if not filtered_dirs:
         if source == "csv":
             st.info(
@@ -74,53 +48,12 @@ def main():
 
     sel_dir = st.selectbox("Logs directory", options=filtered_dirs, index=0)
 
-    @st.cache_data(show_spinner=False)
-    def index_sar_files(dir_path: str) -> list[tuple[str, str]]:
-        # Return list of (date_str, path) for sar binaries
-        items: list[tuple[str, str]] = []
-        for name in sorted(os.listdir(dir_path)):
-            path = os.path.join(dir_path, name)
-            if not os.path.isfile(path):
-                continue
-            try:
-                # Prefer filename pattern saYYYYMMDD if present
-                m = re.match(r"^sa(\d{8})$", name)
-                if m:
-                    ymd = m.group(1)
-                    date_str = f"{ymd[0:4]}-{ymd[4:6]}-{ymd[6:8]}"
-                    items.append((date_str, path))
-                    continue
-
-                # Otherwise try sadf header (JSON) to read file-date
-                fmt, text = convert_with_sadf_cached(path, ("-u",), "auto")
-                if fmt == "json":
-                    doc = json.loads(text)
-                    host = doc.get("sysstat", {}).get("hosts", [{}])[0]
-                    file_date = host.get("file-date")
-                    if file_date:
-                        items.append((file_date, path))
-                        continue
-                # Fallback to raw filename
-                items.append((name, path))
-            except Exception:
-                continue
-        return items
-
-    @st.cache_data(show_spinner=False)
-    def index_csv_dates(dir_path: str) -> list[tuple[str, str]]:
-        # Return list of (date_str, csv_date_dir) for per-resource CSV bundles
-        csv_root = os.path.join(dir_path, "csv")
-        items: list[tuple[str, str]] = []
-        if not os.path.isdir(csv_root):
-            return items
-        for name in sorted(os.listdir(csv_root)):
-            cdir = os.path.join(csv_root, name)
-            if os.path.isdir(cdir) and re.match(r"^\d{4}-\d{2}-\d{2}$", name):
-                items.append((name, cdir))
-        return items
-
     dir_path = os.path.join(logs_root, sel_dir)
-    indexed = index_csv_dates(dir_path) if source == "csv" else index_sar_files(dir_path)
+    if source == "csv":
+        indexed = CATALOG.csv_dates(dir_path)
+    else:
+        indexed = [(f.date, f.path) for f in CATALOG.sar_files(dir_path)]
+    CATALOG.save()
     dates = sorted({d for d, _ in indexed})
     if not dates:
         if source == "csv":
@@ -130,59 +63,69 @@ def main():
         else:
             st.warning("No SAR files found (saDD under logs/<dir>/)")
         return
-    sel_date = st.selectbox("Date", options=dates, index=len(dates) - 1)
-    # pick first item matching date
-    if source == "csv":
-        csv_date_dir = next((p for d, p in indexed if d == sel_date), None)
-        path = None
+    if len(dates) > 1:
+        start, end = st.select_slider(
+            "Dates", options=dates, value=(dates[-1], dates[-1]), help="Drag both ends for a range"
+        )
     else:
-        path = next((p for d, p in indexed if d == sel_date), None)
-        csv_date_dir = None
+        start = end = dates[0]
+    # first item per date within the range, in date order
+    by_date: dict[str, str] = {}
+    for d, p in indexed:
+        if start <= d <= end:
+            by_date.setdefault(d, p)
+    days = tuple(sorted(by_date))
+    paths = tuple(by_date[d] for d in days)
 
-    st.caption("Set env SAR_VERSION=auto|12|11 to force format handling.")
+    from src.app.tabs.window import time_window_input
 
-    # Charts area
-    st.subheader("Charts")
-    if source == "sar" and not path:
-        st.info("Select a SAR file from logs.")
-        return
-    if source == "csv" and not csv_date_dir:
-        st.info("Select a CSV date directory under logs/<dir>/csv.")
-        return
+    window = time_window_input(days)
 
-    tabs = st.tabs(["CPU", "Memory", "Disk", "Network", "Filesystem"])
+    from src.app.tabs.live import live_input
 
-    # CPU Tab
-    with tabs[0]:
-        from src.app.tabs import cpu as cpu_tab
+    live_every = live_input(days, dates[-1]) if source == "sar" else None
 
-        cpu_tab.render(path, prefer, source if source in ("sar", "csv") else "sar", csv_date_dir)
+    st.caption(
+        "Set env SAR_VERSION=auto|12|11|native to force format handling; "
+        "SAR_MEMORY_CACHE_MB caps the in-memory frame cache."
+    )
+
+    # Charts area
+    st.subheader("Charts")
+    if not paths:
+        if source == "csv":
+            st.info("Select a CSV date directory under logs/<dir>/csv.")
+        else:
+            st.info("Select a SAR file from logs.")
+        return
 
-    # Memory Tab
-    with tabs[1]:
-        from src.app.tabs import memory as memory_tab
+    from src.app.services.loader import Selection, prefetch, selection_entities
+    from src.app.tabs.filters import current_filters
 
-        memory_tab.render(path, prefer, source if source in ("sar", "csv") else "sar", csv_date_dir)
+    sel = Selection(
+        "csv" if source == "csv" else "sar",
+        prefer,  # type: ignore[arg-type]
+        paths,
+        days,
+        window=window,
+        live=live_every is not None,
+    )
+    # entity widgets live in the tabs; their last state narrows the one conversion pass
+    sel = sel._replace(filters=current_filters(selection_entities(sel)))
+    # load all activities at once in the background; the visible section waits on its own
+    prefetch(sel)
 
-    # Disk Tab
-    with tabs[2]:
-        from src.app.tabs import disk as disk_tab
+    from src.app.tabs.chart import render_controls as render_chart_controls
 
-        disk_tab.render(path, prefer, source if source in ("sar", "csv") else "sar", csv_date_dir)
+    render_chart_controls()
 
-    # Network Tab
-    with tabs[3]:
-        from src.app.tabs import network as network_tab
+    from src.app.tabs.sections import render_sections
 
-        network_tab.render(
-            path, prefer, source if source in ("sar", "csv") else "sar", csv_date_dir
-        )
+    render_sections(sel, live_every)
 
-    # Filesystem Tab
-    with tabs[4]:
-        from src.app.tabs import filesystem as fs_tab
+    from src.app.tabs.diagnostics import render_cache_panel
 
-        fs_tab.render(path, prefer, source if source in ("sar", "csv") else "sar", csv_date_dir)
+    render_cache_panel()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,244 @@
+"""Synthetic sysstat data at any scale: `sadf -j` JSON, `sadf -d` CSV and sa binary files.
+
+The three forms describe the same kind of day (CPU, memory, disk, net-dev and
+filesystem activities) with the keys, headers and struct layouts the parsers in
+src/app/parsers read. Values are random but reproducible for a given seed.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import struct
+from collections.abc import Iterator
+from typing import IO, NamedTuple
+
+import numpy as np
+
+T0 = 1735689600  # 2025-01-01 00:00:00 UTC
+
+
+class Shape(NamedTuple):
+    interval: int = 1  # seconds between records
+    duration: int = 3600  # seconds covered
+    cpus: int = 4  # plus "all"
+    disks: int = 2
+    ifaces: int = 2
+    filesystems: int = 2
+    seed: int = 0
+
+    @property
+    def records(self) -> int:
+        return self.duration // self.interval
+
+    def label(self) -> str:
+        return (
+            f"{self.records}rec-{self.interval}s-{self.cpus}cpu-{self.disks}dev-"
+            f"{self.ifaces}if-{self.filesystems}fs"
+        )
+
+
+def _names(shape: Shape) -> tuple[list[str], list[str], list[str], list[str]]:
+    cpus = ["all", *(str(i) for i in range(shape.cpus))]
+    disks = [f"dev8-{16 * i}" for i in range(shape.disks)]
+    ifaces = ["lo", *(f"eth{i}" for i in range(shape.ifaces - 1))][: shape.ifaces]
+    fss = [f"/dev/sda{i + 1}" for i in range(shape.filesystems)]
+    return cpus, disks, ifaces, fss
+
+
+def _stamp(shape: Shape, i: int) -> tuple[str, str]:
+    t = np.datetime64(T0 + (i + 1) * shape.interval, "s").item()
+    return t.strftime("%Y-%m-%d"), t.strftime("%H:%M:%S")
+
+
+def _json_records(shape: Shape) -> Iterator[dict]:
+    rng = np.random.default_rng(shape.seed)
+    cpus, disks, ifaces, fss = _names(shape)
+    for i in range(shape.records):
+        day, time = _stamp(shape, i)
+        busy = rng.uniform(0, 60, (len(cpus), 3)).round(2)
+        dk = rng.uniform(0, 500, (len(disks), 8)).round(2)
+        nt = rng.uniform(0, 1000, (len(ifaces), 8)).round(2)
+        fs = rng.uniform(0, 100, (len(fss), 3)).round(2)
+        yield {
+            "timestamp": {"date": day, "time": time, "utc": 1, "interval": shape.interval},
+            "cpu-load": [
+                {
+                    "cpu": name,
+                    "user": u,
+                    "nice": 0.0,
+                    "system": s,
+                    "iowait": w,
+                    "steal": 0.0,
+                    "idle": round(100 - u - s - w, 2),
+                }
+                for name, (u, s, w) in zip(cpus, busy.tolist(), strict=True)
+            ],
+            "memory": {
+                "memfree": 400_000 + i % 1000,
+                "avail": 900_000,
+                "memused": 600_000 - i % 1000,
+                "memused-percent": 60.0,
+                "buffers": 20_000,
+                "cached": 300_000,
+                "commit": 700_000,
+                "commit-percent": 35.0,
+                "active": 350_000,
+                "inactive": 150_000,
+                "dirty": i % 500,
+            },
+            "disk": [
+                {
+                    "disk-device": name,
+                    "tps": v[0],
+                    "rkB": v[1],
+                    "wkB": v[2],
+                    "dkB": 0.0,
+                    "areq-sz": v[3],
+                    "aqu-sz": v[4] / 100,
+                    "await": v[5] / 10,
+                    "util-percent": v[6] / 5,
+                }
+                for name, v in zip(disks, dk.tolist(), strict=True)
+            ],
+            "network": {
+                "net-dev": [
+                    {
+                        "iface": name,
+                        "rxpck": v[0],
+                        "txpck": v[1],
+                        "rxkB": v[2],
+                        "txkB": v[3],
+                        "rxcmp": 0.0,
+                        "txcmp": 0.0,
+                        "rxmcst": 0.0,
+                        "ifutil-percent": v[4] / 10,
+                    }
+                    for name, v in zip(ifaces, nt.tolist(), strict=True)
+                ]
+            },
+            "filesystems": [
+                {
+                    "filesystem": name,
+                    "MBfsfree": 50_000 - v[0],
+                    "MBfsused": 50_000 + v[0],
+                    "%fsused": v[1],
+                    "%ufsused": v[1],
+                    "Ifree": 1_000_000,
+                    "Iused": 200_000,
+                    "%Iused": v[2],
+                }
+                for name, v in zip(fss, fs.tolist(), strict=True)
+            ],
+        }
+
+
+def write_sadf_json(shape: Shape, out: IO[str]) -> None:
+    """`sadf -j` output, written record by record."""
+    out.write('{"sysstat": {"hosts": [{"nodename": "bench", "file-date": "2025-01-01", ')
+    out.write('"statistics": [\n')
+    for i, rec in enumerate(_json_records(shape)):
+        out.write((",\n" if i else "") + json.dumps(rec))
+    out.write("\n]}]}}\n")
+
+
+def sadf_json(shape: Shape) -> str:
+    buf = io.StringIO()
+    write_sadf_json(shape, buf)
+    return buf.getvalue()
+
+
+_CSV_HEADERS = {
+    "cpu": "CPU;%user;%nice;%system;%iowait;%steal;%idle",
+    "memory": "kbmemfree;kbavail;kbmemused;%memused;kbbuffers;kbcached;kbcommit;%commit;"
+    "kbactive;kbinact;kbdirty",
+    "disk": "DEV;tps;rkB/s;wkB/s;dkB/s;areq-sz;aqu-sz;await;%util",
+    "network": "IFACE;rxpck/s;txpck/s;rxkB/s;txkB/s;rxcmp/s;txcmp/s;rxmcst/s;%ifutil",
+    "filesystem": "FILESYSTEM;MBfsfree;MBfsused;%fsused;%ufsused;Ifree;Iused;%Iused",
+}
+
+
+def sadf_csv(shape: Shape) -> str:
+    """`sadf -d` output for every activity: one `# hostname;interval;timestamp;...`
+    header per activity block, as sadf prints them.
+    """
+    recs = list(_json_records(shape))
+    blocks: list[str] = []
+    for activity, header in _CSV_HEADERS.items():
+        lines = [f"# hostname;interval;timestamp;{header}"]
+        for rec in recs:
+            ts = rec["timestamp"]
+            prefix = f"bench;{shape.interval};{ts['date']} {ts['time']} UTC;"
+            if activity == "cpu":
+                rows = [
+                    [-1 if c["cpu"] == "all" else c["cpu"], *list(c.values())[1:]]
+                    for c in rec["cpu-load"]
+                ]
+            elif activity == "memory":
+                rows = [list(rec["memory"].values())]
+            elif activity == "disk":
+                rows = [list(d.values()) for d in rec["disk"]]
+            elif activity == "network":
+                rows = [list(n.values()) for n in rec["network"]["net-dev"]]
+            else:
+                rows = [list(f.values()) for f in rec["filesystems"]]
+            lines.extend(prefix + ";".join(map(str, row)) for row in rows)
+        blocks.append("\n".join(lines))
+    return "\n".join(blocks) + "\n"
+
+
+# sa file: (activity id, has_nr, item size, types_nr), in file order
+_SA_ACTS = [(1, 1, 80, (10, 0, 0)), (7, 0, 136, (17, 0, 0)), (11, 1, 64, (1, 3, 7))]
+_SA_ACTS += [(12, 1, 80, (7, 0, 1)), (37, 1, 296, (5, 0, 0))]
+
+
+def _sa_header(shape: Shape) -> bytes:
+    magic = struct.pack("<HHBBBBII3I48x", 0xD596, 0x2175, 12, 6, 5, 0, 392, 0, 0, 1, 12)
+    names = b"".join(struct.pack("65s", n) for n in (b"Linux", b"bench", b"6.1", b"x86_64"))
+    hdr = struct.pack("<QQIIi6I", T0, 100, shape.cpus + 1, len(_SA_ACTS), 125, 1, 1, 12, 2, 0, 1)
+    hdr += struct.pack("<III", 36, 24, 0) + struct.pack("BBb", 1, 0, 8) + names
+    hdr = (hdr + struct.pack("64s", b"UTC")).ljust(392, b"\0")
+    acts = b"".join(
+        struct.pack("<IIiiiiIII", aid, 0, 1, 1, has_nr, size, *types)
+        for aid, has_nr, size, types in _SA_ACTS
+    )
+    return magic + hdr + acts
+
+
+def write_sa_file(shape: Shape, out: IO[bytes]) -> None:
+    """An sa file (sysstat 12 format) with monotonically growing counters."""
+    rng = np.random.default_rng(shape.seed)
+    cpus, disks, ifaces, fss = _names(shape)
+    hz = 100 * shape.interval
+    n = shape.records + 1  # sadf reports rates from the second record on
+    cpu = np.zeros((n, len(cpus), 10), np.uint64)
+    split = rng.dirichlet([3, 1, 1, 6], (n, len(cpus)))  # user, sys, iowait, idle
+    ticks = (split * hz).astype(np.uint64)
+    cpu[:, :, [0, 2, 4, 3]] = np.cumsum(ticks, axis=0)
+    cpu[:, 0] *= shape.cpus  # "all" sums the CPUs
+    disk = np.cumsum(rng.integers(0, 500, (n, len(disks), 11)), axis=0).astype(np.uint64)
+    disk[:, :, 9] = 8  # major, minor: named dev8-0, dev8-16, ...
+    disk[:, :, 10] = 16 * np.arange(len(disks), dtype=np.uint64)
+    net = np.cumsum(rng.integers(0, 1 << 20, (n, len(ifaces), 7)), axis=0).astype(np.uint64)
+    out.write(_sa_header(shape))
+    mem = struct.pack("<17Q", 400, 100, 200, 1000, 0, 1000, 0, 500, 0, 0, 0, 0, 100, 0, 0, 0, 600)
+    fs = b"".join(
+        struct.pack("<5Q128s128s", 4 << 20, 1 << 20, 1 << 20, 100, 25, name.encode(), b"/")
+        for name in fss
+    )
+    for i in range(n):
+        rec = struct.pack("<QQIBBBB", 1000 + i * hz, T0 + i * shape.interval, 0, 1, 0, 0, 0)
+        rec += struct.pack("<i", len(cpus)) + cpu[i].tobytes()
+        rec += mem
+        rec += struct.pack("<i", len(disks))
+        rec += b"".join(
+            struct.pack("<4Q7I", *d[:4].tolist(), *(d[4:] & 0xFFFFFFFF).tolist()).ljust(64, b"\0")
+            for d in disk[i]
+        )
+        rec += struct.pack("<i", len(ifaces))
+        rec += b"".join(
+            struct.pack("<7QI16sB", *v.tolist(), 1000, name.encode(), 2).ljust(80, b"\0")
+            for name, v in zip(ifaces, net[i], strict=True)
+        )
+        rec += struct.pack("<i", len(fss)) + fs
+        out.write(rec)
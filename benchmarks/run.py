@@ -0,0 +1,220 @@
+"""Time and memory-profile the parsers and chart-frame building on synthetic data.
+
+    python -m benchmarks.run --duration 86400 --cpus 16 --out bench.json
+    python -m benchmarks.run --compare bench.json   # exit 1 on a regression
+
+Each case runs --repeat times for wall time (min and median reported), then once more
+under tracemalloc for its peak allocation. Results are written as JSON with the
+fixture shape and library versions, so runs on the same machine can be compared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from src.app.parsers.columnar import feed, iter_statistics
+from src.app.parsers.cpu import parse_cpu_json
+from src.app.parsers.disk import parse_disk_json
+from src.app.parsers.filesystem import parse_fs_json
+from src.app.parsers.memory import parse_mem_json
+from src.app.parsers.network import parse_net_json
+from src.app.parsers.sa_file import read_sa_frames
+from src.app.services.downsample import downsample_frame
+from src.app.services.pivot import wide_frame
+from src.app.services.sadf import _CSV_PARSERS, _JSON_BUILDERS, split_sadf_csv
+
+from .fixtures import Shape, sadf_csv, sadf_json, write_sa_file
+
+Case = tuple[str, Callable[[], Any]]
+
+JSON_PARSERS = {
+    "cpu": parse_cpu_json,
+    "memory": parse_mem_json,
+    "disk": parse_disk_json,
+    "network": parse_net_json,
+    "filesystem": parse_fs_json,
+}
+# tabs chart these per entity (see src/app/tabs)
+CHARTS = {
+    "cpu": ("cpu", ["user", "system", "iowait", "idle"]),
+    "disk": ("dev", ["tps", "rkB", "wkB", "await", "util_pct"]),
+    "network": ("iface", ["rxkB", "txkB", "rxpck", "txpck"]),
+    "filesystem": ("filesystem", ["fsused_pct", "mb_free"]),
+}
+
+
+def _rows(result: Any) -> int:
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, dict):
+        return sum(_rows(v) for v in result.values())
+    return 0
+
+
+def _stream_json(text: str) -> dict[str, pd.DataFrame]:
+    builders = {name: make() for name, make in _JSON_BUILDERS.items()}
+    feed(builders.values(), iter_statistics(io.StringIO(text)))
+    return {name: b.frame() for name, b in builders.items()}
+
+
+def _parse_csv(text: str) -> dict[str, pd.DataFrame]:
+    return {name: _CSV_PARSERS[name](block) for name, block in split_sadf_csv(text).items()}
+
+
+def _chart(df: pd.DataFrame, entity: str, metrics: list[str], points: int) -> pd.DataFrame:
+    entities = df[entity].astype(str).unique().tolist()
+    return downsample_frame(wide_frame(df, entity, metrics, entities), points, "lttb")
+
+
+def cases(shape: Shape, sa_path: str, points: int) -> list[Case]:
+    """Every benchmarked hot path, with its input prepared outside the timed call."""
+    text = sadf_json(shape)
+    csv = sadf_csv(shape)
+    out: list[Case] = [
+        ("json.stream.all", lambda: _stream_json(text)),
+        *(
+            (f"json.{name}", lambda parse=parse: parse(text))
+            for name, parse in JSON_PARSERS.items()
+        ),
+        ("csv.split", lambda: split_sadf_csv(csv)),
+        ("csv.all", lambda: _parse_csv(csv)),
+        ("native.all", lambda: read_sa_frames(sa_path)),
+    ]
+    blocks = split_sadf_csv(csv)
+    out += [(f"csv.{name}", lambda p=_CSV_PARSERS[name], b=b: p(b)) for name, b in blocks.items()]
+    frames = read_sa_frames(sa_path)
+    for name, (entity, metrics) in CHARTS.items():
+        df = frames[name]
+        out.append((f"chart.{name}", lambda df=df, e=entity, m=metrics: _chart(df, e, m, points)))
+    return out
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    times = []
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    rows = _rows(result)
+    del result
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "peak_bytes": peak,
+        "rows": rows,
+    }
+
+
+def run(shape: Shape, repeat: int, points: int, only: str | None = None) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        sa_path = os.path.join(tmp, "sa01")
+        with open(sa_path, "wb") as f:
+            write_sa_file(shape, f)
+        results = {}
+        for name, fn in cases(shape, sa_path, points):
+            if only and not name.startswith(only):
+                continue
+            results[name] = measure(fn, repeat)
+            r = results[name]
+            print(
+                f"{name:24} {r['min_s'] * 1000:9.1f} ms  {r['peak_bytes'] / 2**20:8.1f} MiB"
+                f"  {r['rows']:>9} rows",
+                file=sys.stderr,
+            )
+    return {
+        "shape": shape._asdict() | {"records": shape.records},
+        "repeat": repeat,
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def regressions(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Cases whose min time or peak memory grew by more than tolerance (0.2 = 20%)."""
+    found = []
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        for key in ("min_s", "peak_bytes"):
+            if before[key] and now[key] > before[key] * (1 + tolerance):
+                found.append(f"{name} {key}: {before[key]:.4g} -> {now[key]:.4g}")
+    return found
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    defaults = Shape()
+    parser.add_argument("--interval", type=int, default=defaults.interval)
+    parser.add_argument("--duration", type=int, default=defaults.duration)
+    parser.add_argument("--cpus", type=int, default=defaults.cpus)
+    parser.add_argument("--disks", type=int, default=defaults.disks)
+    parser.add_argument("--ifaces", type=int, default=defaults.ifaces)
+    parser.add_argument("--filesystems", type=int, default=defaults.filesystems)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--points", type=int, default=2000, help="chart point budget")
+    parser.add_argument("--only", help="run cases whose name starts with this")
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="baseline results JSON to check against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    shape = Shape(
+        args.interval, args.duration, args.cpus, args.disks, args.ifaces, args.filesystems
+    )
+    baseline = None
+    if args.compare:  # read first: --out may name the same file
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report = run(shape, max(args.repeat, 1), args.points, args.only)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if baseline is not None:
+        if baseline.get("shape") != report["shape"]:
+            print("baseline was run with another shape; not compared", file=sys.stderr)
+            return 2
+        found = regressions(report, baseline, args.tolerance)
+        for line in found:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Convert a logs/ tree of sar files into a Parquet dataset, without the UI.
+
+    python -m src.app.bulk_export --logs logs --out dataset
+
+Every sa file under logs/<dir>/ is converted on a process pool, every activity at
+once, and written as
+
+    <out>/host=<host>/activity=<activity>/date=<YYYY-MM-DD>/<file>-<source>.parquet
+
+(hive partitioning; <source> is a hash of the file's directory, so sa01 from two
+directories with the same hostname does not collide). Rows are placed by the date of
+their timestamp. Activities have different columns, so the dataset is read back one
+activity at a time, e.g. with read_activity(out, "cpu") or
+pd.read_parquet(f"{out}/host=<host>/activity=cpu"); reading the whole of out as one
+table fails or mixes columns.
+
+Progress is appended to <out>/_manifest.jsonl as files finish; a rerun skips files
+whose size, mtime and inode match a finished entry, so an interrupted run picks up
+where it stopped and a nightly run only converts new or grown files. Files no date
+could be read from (sysstat's sarDD text reports next to the saDD files, say) are
+recorded as skipped, not failed, and left alone until they change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, NamedTuple
+
+import pandas as pd
+
+from .services import parquet_cache
+from .services.catalog import Catalog, list_dirs
+from .services.pool import MAX_WORKERS
+from .services.sadf import Prefer, convert_file
+
+MANIFEST = "_manifest.jsonl"
+
+
+def _write_parquet(df: Any, path: str) -> None:
+    # written beside the target and renamed, so readers never see a partial file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".parquet", dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def export_file(path: str, host: str, out: str, prefer: Prefer) -> dict[str, Any]:
+    """Convert one sa file and write its partitions; runs in a pool worker."""
+    fmt, frames = convert_file(path, prefer)
+    source = hashlib.sha256(os.path.dirname(path).encode()).hexdigest()[:8]
+    name = f"{os.path.basename(path)}-{source}"
+    rows = 0
+    outputs: list[str] = []
+    for activity, df in frames.items():
+        if df.empty or "timestamp" not in df.columns:
+            continue
+        for day, part in df.groupby(df["timestamp"].dt.strftime("%Y-%m-%d"), sort=True):
+            target = os.path.join(
+                out, f"host={host}", f"activity={activity}", f"date={day}", f"{name}.parquet"
+            )
+            _write_parquet(part.reset_index(drop=True), target)
+            rows += len(part)
+            outputs.append(os.path.relpath(target, out))
+    return {"format": fmt, "rows": rows, "outputs": outputs}
+
+
+def read_activity(out: str, activity: str) -> pd.DataFrame:
+    """One activity of a dataset across hosts and dates, with host and date columns."""
+    pattern = os.path.join(
+        glob.escape(out), "host=*", f"activity={activity}", "date=*", "*.parquet"
+    )
+    frames = []
+    for path in sorted(glob.glob(pattern)):
+        date_dir = os.path.dirname(path)
+        host_dir = os.path.dirname(os.path.dirname(date_dir))
+        frames.append(
+            pd.read_parquet(path).assign(
+                host=os.path.basename(host_dir).removeprefix("host="),
+                date=os.path.basename(date_dir).removeprefix("date="),
+            )
+        )
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def read_manifest(out: str) -> dict[str, dict[str, Any]]:
+    """Last manifest entry per source path; a torn last line (killed run) is ignored."""
+    entries: dict[str, dict[str, Any]] = {}
+    try:
+        with open(os.path.join(out, MANIFEST)) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry["path"]] = entry
+    except OSError:
+        pass
+    return entries
+
+
+class Pending(NamedTuple):
+    path: str
+    host: str  # the sa header's nodename, else the directory name
+    identity: list[int]  # taken before converting: a file that grows meanwhile is redone
+    dated: bool  # False: not sar data, recorded as skipped without converting
+
+
+def pending_files(logs: str, out: str, force: bool = False) -> list[Pending]:
+    """Every file under logs not yet exported (or skipped) in its current state."""
+    done = {} if force else read_manifest(out)
+    catalog = Catalog(os.path.join(out, "_catalog.json"))
+    todo: list[Pending] = []
+    for d in list_dirs(logs):
+        for f in catalog.sar_files(os.path.join(logs, d)):
+            path = os.path.abspath(f.path)
+            identity = list(parquet_cache.file_identity(path) or ())
+            entry = done.get(path)
+            if entry and entry["status"] != "error" and entry["identity"] == identity:
+                continue
+            todo.append(Pending(path, f.host or d, identity, f.dated))
+    catalog.save()
+    return todo
+
+
+def _drop_stale(out: str, old: list[str], new: list[str]) -> None:
+    # partitions an earlier export of the file wrote that this one did not (a day the
+    # file no longer holds, or an older file name)
+    for rel in set(old) - set(new):
+        try:
+            os.unlink(os.path.join(out, rel))
+        except OSError:
+            pass
+
+
+def run(logs: str, out: str, prefer: Prefer, workers: int, force: bool = False) -> int:
+    """Export every pending file; returns the number of files that failed."""
+    todo = pending_files(logs, out, force)
+    if not todo:
+        print("nothing to export", file=sys.stderr)
+        return 0
+    os.makedirs(out, exist_ok=True)
+    previous = read_manifest(out)
+    failed = 0
+    ctx = multiprocessing.get_context("spawn")
+    with (
+        ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool,
+        open(os.path.join(out, MANIFEST), "a") as manifest,
+    ):
+        for p in todo:
+            if not p.dated:
+                manifest.write(json.dumps(p._asdict() | {"status": "skipped"}) + "\n")
+                print(f"{p.path}: skipped, no sa header", file=sys.stderr)
+        todo = [p for p in todo if p.dated]
+        futures = {pool.submit(export_file, p.path, p.host, out, prefer): p for p in todo}
+        for i, fut in enumerate(as_completed(futures), 1):
+            item = futures[fut]
+            entry: dict[str, Any] = item._asdict()
+            try:
+                entry |= {"status": "done", **fut.result()}
+                note = f"{entry['rows']} rows ({entry['format']})"
+                _drop_stale(out, previous.get(item.path, {}).get("outputs", []), entry["outputs"])
+            except Exception as e:
+                failed += 1
+                entry |= {"status": "error", "error": str(e)}
+                note = f"failed: {e}"
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            print(f"[{i}/{len(todo)}] {item.path}: {note}", file=sys.stderr)
+    return failed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.app.bulk_export",
+        description="Convert a logs/ tree of sar files into a Parquet dataset.",
+    )
+    parser.add_argument("--logs", default="logs", help="root with one directory per host")
+    parser.add_argument("--out", default="dataset", help="Parquet dataset directory")
+    parser.add_argument(
+        "--prefer",
+        default=os.environ.get("SAR_VERSION", "auto").lower(),
+        choices=["auto", "12", "11", "native"],
+        help="conversion to use (default: SAR_VERSION or auto)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=MAX_WORKERS, help="conversion processes (SAR_WORKERS)"
+    )
+    parser.add_argument("--force", action="store_true", help="export files already exported")
+    args = parser.parse_args(argv)
+    failed = run(args.logs, args.out, args.prefer, max(args.workers, 1), args.force)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
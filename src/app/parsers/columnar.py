@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Iterable, Iterator
+from operator import itemgetter
+from typing import IO, Any
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 65536
+READ_SIZE = 1 << 16
+# sar prints two decimals; float32 is used when every value stays within half of that
+FLOAT32_TOLERANCE = 0.005
+
+
+def _column(values: list[Any]) -> np.ndarray:
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array(values, dtype=object)
+
+
+class FrameBuilder:
+    """Accumulate one activity of sadf JSON statistics into typed column arrays.
+
+    ``section`` picks the activity's entries out of a statistics record. Values are
+    appended straight into per-column buffers through getters bound to the current
+    key schema, so the key -> column mapping is computed once per schema rather than
+    per entry. Buffers become numpy arrays every ``chunk_rows`` rows and the timestamp
+    column is built in one vectorized step at the end.
+    """
+
+    def __init__(
+        self,
+        section: Callable[[dict], list[dict]],
+        rename: Callable[[str], str],
+        entity: str | None = None,
+        keys: tuple[str, ...] | None = None,
+        default: Any = None,
+        finish: Callable[[pd.DataFrame], pd.DataFrame] | None = None,
+        chunk_rows: int = CHUNK_ROWS,
+    ) -> None:
+        self._section = section
+        self._rename = rename
+        self._entity = entity
+        self._fixed_keys = keys
+        self._default = default
+        self._finish = finish
+        self._chunk_rows = chunk_rows
+        self._dates: list[str] = []
+        self._times: list[str] = []
+        self._counts: list[int] = []
+        self._raw_keys: tuple[str, ...] = ()
+        self._keys: tuple[str, ...] = ()
+        self._names: list[str] = []
+        self._getters: list[Callable[[dict], Any]] = []
+        self._buffers: list[list[Any]] = []
+        self._pending = 0
+        self._chunks: list[dict[str, np.ndarray]] = []
+
+    def _set_schema(self, raw_keys: tuple[str, ...]) -> None:
+        self._flush()
+        keys = raw_keys
+        if self._entity in keys:
+            keys = (self._entity, *(k for k in keys if k != self._entity))
+        self._raw_keys = raw_keys
+        self._keys = keys
+        self._names = [self._rename(k) for k in keys]
+        self._getters = [itemgetter(k) for k in keys]
+        self._buffers = [[] for _ in keys]
+
+    def add(self, stat: dict) -> None:
+        entries = self._section(stat)
+        if not entries:
+            return
+        raw_keys = self._fixed_keys or tuple(entries[0])
+        if raw_keys != self._raw_keys:
+            self._set_schema(raw_keys)
+        try:
+            values = [list(map(getter, entries)) for getter in self._getters]
+        except KeyError:
+            # Ragged entries (or fixed keys sadf did not emit): fall back to .get()
+            values = [[e.get(k, self._default) for e in entries] for k in self._keys]
+        for buffer, column in zip(self._buffers, values, strict=True):
+            buffer.extend(column)
+        ts = stat.get("timestamp", {})
+        self._dates.append(ts.get("date"))
+        self._times.append(ts.get("time"))
+        self._counts.append(len(entries))
+        self._pending += len(entries)
+        if self._pending >= self._chunk_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        self._chunks.append(
+            {name: _column(buf) for name, buf in zip(self._names, self._buffers, strict=True)}
+        )
+        self._buffers = [[] for _ in self._keys]
+        self._pending = 0
+
+    def frame(self) -> pd.DataFrame:
+        """Rows added since the last frame() call; the builder starts over afterwards."""
+        self._flush()
+        chunks, dates, times, counts = self._chunks, self._dates, self._times, self._counts
+        self._chunks, self._dates, self._times, self._counts = [], [], [], []
+        if not chunks:
+            return pd.DataFrame()
+        if len(chunks) == 1:
+            df = pd.DataFrame(chunks[0])
+        else:
+            df = pd.concat([pd.DataFrame(c) for c in chunks], ignore_index=True)
+        stamps = pd.to_datetime(
+            pd.Series(dates, dtype=object) + " " + pd.Series(times, dtype=object),
+            format="%Y-%m-%d %H:%M:%S",
+            errors="coerce",
+        ).to_numpy()
+        df.insert(0, "timestamp", np.repeat(stamps, counts))
+        return compact(self._finish(df) if self._finish else df)
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize dtypes of a parsed frame, shared by every parser.
+    Repeated strings (CPU, device, interface and filesystem names, hostnames) become
+    categoricals; float64 metrics become float32 when every value round-trips within
+    FLOAT32_TOLERANCE (large kB counters stay float64). Timestamps stay datetime64.
+    """
+    out = df.copy(deep=False)
+    for name in out.columns:
+        col = out[name]
+        if col.dtype == object:
+            try:
+                repeated = len(col) > 0 and col.nunique() * 2 <= len(col)
+            except TypeError:  # unhashable values
+                repeated = False
+            if repeated:
+                out[name] = col.astype("category")
+        elif col.dtype == np.float64:
+            values = col.to_numpy()
+            small = values.astype(np.float32)
+            with np.errstate(invalid="ignore", over="ignore"):
+                exact = not (np.abs(small - values) > FLOAT32_TOLERANCE).any()
+            if exact:
+                out[name] = small
+    return out
+
+
+def feed(builders: Iterable[FrameBuilder], statistics: Iterable[dict]) -> None:
+    """Dispatch every statistics record to each builder in a single pass."""
+    builders = list(builders)
+    for stat in statistics:
+        for builder in builders:
+            builder.add(stat)
+
+
+def statistics_of(doc: dict) -> list[dict]:
+    return doc["sysstat"]["hosts"][0].get("statistics", [])
+
+
+def iter_statistics(stream: IO[str], read_size: int = READ_SIZE) -> Iterator[dict]:
+    """Yield the first host's statistics records from a `sadf -j` text stream.
+    Only the record being decoded (plus one read buffer) is held in memory, so the
+    full JSON document never exists as a single string or object tree.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    while True:
+        start = buf.find('"statistics"')
+        if start >= 0:
+            bracket = buf.find("[", start)
+            if bracket >= 0:
+                buf = buf[bracket + 1 :]
+                break
+        chunk = stream.read(read_size)
+        if not chunk:
+            return
+        # keep the key (or a tail it may straddle) across reads
+        buf = (buf[start:] if start >= 0 else buf[-16:]) + chunk
+    pos = 0
+    eof = False
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        if pos < len(buf):
+            try:
+                record, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield record
+                continue
+        elif eof:
+            return
+        # need more input: drop what was consumed and read at least as much as is pending
+        buf = buf[pos:]
+        pos = 0
+        chunk = stream.read(max(read_size, len(buf)))
+        eof = not chunk
+        buf += chunk
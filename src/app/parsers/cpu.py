@@ -1,33 +1,39 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime
 
 import pandas as pd
 
+from ..services.instrument import timed
+from .columnar import FrameBuilder, compact, feed, statistics_of
 
-def parse_cpu_json(text: str) -> pd.DataFrame:
-    doc = json.loads(text)
-    host = doc["sysstat"]["hosts"][0]
-    rows: list[dict] = []
-    for stat in host.get("statistics", []):
-        ts = stat.get("timestamp", {})
-        dt = datetime.strptime(f"{ts.get('date')} {ts.get('time')} UTC", "%Y-%m-%d %H:%M:%S UTC")
-        for entry in stat.get("cpu-load", []):
-            row = {
-                "timestamp": dt,
-                "cpu": str(entry.get("cpu")),
-                "user": float(entry.get("user", 0.0)),
-                "system": float(entry.get("system", 0.0)),
-                "iowait": float(entry.get("iowait", 0.0)),
-                "idle": float(entry.get("idle", 0.0)),
-            }
-            rows.append(row)
-    df = pd.DataFrame(rows)
+
+def _finish_cpu(df: pd.DataFrame) -> pd.DataFrame:
+    df["cpu"] = df["cpu"].astype(str)
     df.loc[df["cpu"] == "-1", "cpu"] = "all"
     return df
 
 
+def cpu_builder() -> FrameBuilder:
+    return FrameBuilder(
+        lambda stat: stat.get("cpu-load", []),
+        str,
+        entity="cpu",
+        keys=("cpu", "user", "system", "iowait", "idle"),
+        default=0.0,
+        finish=_finish_cpu,
+    )
+
+
+@timed("parse.cpu.json")
+def parse_cpu_json(text: str | dict) -> pd.DataFrame:
+    doc = json.loads(text) if isinstance(text, str) else text
+    builder = cpu_builder()
+    feed([builder], statistics_of(doc))
+    return builder.frame()
+
+
+@timed("parse.cpu.csv")
 def parse_cpu_csv(text: str) -> pd.DataFrame:
     from io import StringIO
 
@@ -47,4 +53,4 @@ def parse_cpu_csv(text: str) -> pd.DataFrame:
     df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce").dt.tz_convert(None)
     df["cpu"] = df["cpu"].astype(str)
     df.loc[df["cpu"] == "-1", "cpu"] = "all"
-    return df
+    return compact(df)
@@ -1,30 +1,31 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime
 from io import StringIO
 
 import pandas as pd
 
+from ..services.instrument import timed
+from .columnar import FrameBuilder, compact, feed, statistics_of
 
-def parse_disk_json(text: str) -> pd.DataFrame:
-    doc = json.loads(text)
-    host = doc["sysstat"]["hosts"][0]
-    rows: list[dict] = []
-    for stat in host.get("statistics", []):
-        ts = stat.get("timestamp", {})
-        dt = datetime.strptime(f"{ts.get('date')} {ts.get('time')} UTC", "%Y-%m-%d %H:%M:%S UTC")
-        for d in stat.get("disk", []) or []:
-            row: dict = {"timestamp": dt, "dev": d.get("disk-device")}
-            for k, v in d.items():
-                if k == "disk-device":
-                    continue
-                key = k.replace("-percent", "_pct").replace("-", "_")
-                row[key] = v
-            rows.append(row)
-    return pd.DataFrame(rows)
 
+def _column_name(key: str) -> str:
+    return "dev" if key == "disk-device" else key.replace("-percent", "_pct").replace("-", "_")
 
+
+def disk_builder() -> FrameBuilder:
+    return FrameBuilder(lambda stat: stat.get("disk") or [], _column_name, entity="disk-device")
+
+
+@timed("parse.disk.json")
+def parse_disk_json(text: str | dict) -> pd.DataFrame:
+    doc = json.loads(text) if isinstance(text, str) else text
+    builder = disk_builder()
+    feed([builder], statistics_of(doc))
+    return builder.frame()
+
+
+@timed("parse.disk.csv")
 def parse_disk_csv(text: str) -> pd.DataFrame:
     df = pd.read_csv(StringIO(text), sep=";", comment="#")
     if "timestamp" in df.columns:
@@ -42,4 +43,4 @@ def parse_disk_csv(text: str) -> pd.DataFrame:
             "areq-sz": "areq_sz",
         }
     )
-    return df
+    return compact(df)
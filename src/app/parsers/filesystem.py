@@ -1,37 +1,38 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime
 from io import StringIO
 
 import pandas as pd
 
+from ..services.instrument import timed
+from .columnar import FrameBuilder, compact, feed, statistics_of
 
-def parse_fs_json(text: str) -> pd.DataFrame:
-    doc = json.loads(text)
-    host = doc["sysstat"]["hosts"][0]
-    rows: list[dict] = []
-    for stat in host.get("statistics", []):
-        ts = stat.get("timestamp", {})
-        dt = datetime.strptime(f"{ts.get('date')} {ts.get('time')} UTC", "%Y-%m-%d %H:%M:%S UTC")
-        for fs in stat.get("filesystems", []) or []:
-            row: dict = {"timestamp": dt, "filesystem": fs.get("filesystem")}
-            for k, v in fs.items():
-                if k == "filesystem":
-                    continue
-                key = (
-                    k.replace("MBfs", "mb_")
-                    .replace("%fsused", "fsused_pct")
-                    .replace("%ufsused", "ufsused_pct")
-                    .replace("%Iused", "inodes_used_pct")
-                    .replace("Iused", "inodes_used")
-                    .replace("Ifree", "inodes_free")
-                )
-                row[key] = v
-            rows.append(row)
-    return pd.DataFrame(rows)
+
+def _column_name(key: str) -> str:
+    return (
+        key.replace("MBfs", "mb_")
+        .replace("%fsused", "fsused_pct")
+        .replace("%ufsused", "ufsused_pct")
+        .replace("%Iused", "inodes_used_pct")
+        .replace("Iused", "inodes_used")
+        .replace("Ifree", "inodes_free")
+    )
+
+
+def fs_builder() -> FrameBuilder:
+    return FrameBuilder(lambda stat: stat.get("filesystems") or [], _column_name, "filesystem")
+
+
+@timed("parse.filesystem.json")
+def parse_fs_json(text: str | dict) -> pd.DataFrame:
+    doc = json.loads(text) if isinstance(text, str) else text
+    builder = fs_builder()
+    feed([builder], statistics_of(doc))
+    return builder.frame()
 
 
+@timed("parse.filesystem.csv")
 def parse_fs_csv(text: str) -> pd.DataFrame:
     df = pd.read_csv(StringIO(text), sep=";", comment="#")
     if "timestamp" in df.columns:
@@ -50,4 +51,4 @@ def parse_fs_csv(text: str) -> pd.DataFrame:
             "%Iused": "inodes_used_pct",
         }
     )
-    return df
+    return compact(df)
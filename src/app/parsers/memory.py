@@ -1,30 +1,36 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime
 from io import StringIO
 
 import pandas as pd
 
+from ..services.instrument import timed
+from .columnar import FrameBuilder, compact, feed, statistics_of
 
-def parse_mem_json(text: str) -> pd.DataFrame:
-    doc = json.loads(text)
-    host = doc["sysstat"]["hosts"][0]
-    rows: list[dict] = []
-    for stat in host.get("statistics", []):
-        ts = stat.get("timestamp", {})
-        dt = datetime.strptime(f"{ts.get('date')} {ts.get('time')} UTC", "%Y-%m-%d %H:%M:%S UTC")
-        mem = stat.get("memory", {})
-        if not mem:
-            continue
-        row: dict = {"timestamp": dt}
-        for k, v in mem.items():
-            key = k.replace("-percent", "_pct").replace("-", "_")
-            row[key] = v
-        rows.append(row)
-    return pd.DataFrame(rows)
 
+def _column_name(key: str) -> str:
+    return key.replace("-percent", "_pct").replace("-", "_")
 
+
+def _memory_entries(stat: dict) -> list[dict]:
+    mem = stat.get("memory", {})
+    return [mem] if mem else []
+
+
+def mem_builder() -> FrameBuilder:
+    return FrameBuilder(_memory_entries, _column_name)
+
+
+@timed("parse.memory.json")
+def parse_mem_json(text: str | dict) -> pd.DataFrame:
+    doc = json.loads(text) if isinstance(text, str) else text
+    builder = mem_builder()
+    feed([builder], statistics_of(doc))
+    return builder.frame()
+
+
+@timed("parse.memory.csv")
 def parse_mem_csv(text: str) -> pd.DataFrame:
     df = pd.read_csv(StringIO(text), sep=";", comment="#")
     if "timestamp" in df.columns:
@@ -63,4 +69,4 @@ def parse_mem_csv(text: str) -> pd.DataFrame:
         ]
         if c in df.columns
     ]
-    return df.loc[:, keep]
+    return compact(df.loc[:, keep])
@@ -1,31 +1,36 @@
 from __future__ import annotations
 
 import json
-from datetime import datetime
 from io import StringIO
 
 import pandas as pd
 
+from ..services.instrument import timed
+from .columnar import FrameBuilder, compact, feed, statistics_of
 
-def parse_net_json(text: str) -> pd.DataFrame:
-    doc = json.loads(text)
-    host = doc["sysstat"]["hosts"][0]
-    rows: list[dict] = []
-    for stat in host.get("statistics", []):
-        ts = stat.get("timestamp", {})
-        dt = datetime.strptime(f"{ts.get('date')} {ts.get('time')} UTC", "%Y-%m-%d %H:%M:%S UTC")
-        net = stat.get("network", {})
-        for e in net.get("net-dev", []) if isinstance(net, dict) else []:
-            row: dict = {"timestamp": dt, "iface": e.get("iface")}
-            for k, v in e.items():
-                if k == "iface":
-                    continue
-                key = k.replace("-percent", "_pct").replace("-", "_")
-                row[key] = v
-            rows.append(row)
-    return pd.DataFrame(rows)
 
+def _column_name(key: str) -> str:
+    return key.replace("-percent", "_pct").replace("-", "_")
 
+
+def _net_dev_entries(stat: dict) -> list[dict]:
+    net = stat.get("network", {})
+    return net.get("net-dev", []) if isinstance(net, dict) else []
+
+
+def net_builder() -> FrameBuilder:
+    return FrameBuilder(_net_dev_entries, _column_name, entity="iface")
+
+
+@timed("parse.network.json")
+def parse_net_json(text: str | dict) -> pd.DataFrame:
+    doc = json.loads(text) if isinstance(text, str) else text
+    builder = net_builder()
+    feed([builder], statistics_of(doc))
+    return builder.frame()
+
+
+@timed("parse.network.csv")
 def parse_net_csv(text: str) -> pd.DataFrame:
     df = pd.read_csv(StringIO(text), sep=";", comment="#")
     if "timestamp" in df.columns:
@@ -45,4 +50,4 @@ def parse_net_csv(text: str) -> pd.DataFrame:
             "rxmcst/s": "rxmcst_s",
         }
     )
-    return df
+    return compact(df)
@@ -0,0 +1,612 @@
+"""Native reader for sysstat binary data files (saDD / saYYYYMMDD).
+
+Decodes the file header, the activity list and the record stream of the sysstat 12.x
+file format (format magic 0x2175) straight from a memory map, and derives the same
+rates and percentages `sadf -j` reports for CPU, memory, disk, net-dev and
+filesystem activities. Frames use the column names of the JSON parsers, so callers
+can swap this reader in for sadf. Layouts that do not match what this module
+expects raise ValueError instead of guessing.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+from collections.abc import Callable, Collection, Mapping
+from datetime import date, datetime, timezone
+from typing import IO, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from ..services.instrument import timed
+from .columnar import compact
+
+SYSSTAT_MAGIC = 0xD596
+FORMAT_MAGIC = 0x2175
+FILE_MAGIC_SIZE = 76
+
+R_STATS = 1
+R_RESTART = 2
+R_LAST_STATS = 3
+R_COMMENT = 4
+MAX_COMMENT_LEN = 64
+
+A_CPU = 1
+A_MEMORY = 7
+A_DISK = 11
+A_NET_DEV = 12
+A_FS = 37
+
+# Field names in struct order, grouped as sysstat describes them in types_nr:
+# (unsigned long long, unsigned long, unsigned int), then trailing char arrays.
+_LAYOUTS: dict[int, tuple[list[str], list[str], list[str], list[tuple[str, str]]]] = {
+    A_CPU: ("user nice sys idle iowait steal hardirq softirq guest guest_nice".split(), [], [], []),
+    A_MEMORY: (
+        "frmkb bufkb camkb tlmkb frskb tlskb caskb comkb activekb inactkb dirtykb anonpgkb "
+        "slabkb kstackkb pgtblkb vmusedkb availablekb".split(),
+        [],
+        [],
+        [],
+    ),
+    A_DISK: (
+        ["nr_ios"],
+        ["rd_sect", "wr_sect", "dc_sect"],
+        "rd_ticks wr_ticks tot_ticks rq_ticks dc_ticks major minor".split(),
+        [],
+    ),
+    A_NET_DEV: (
+        "rx_packets tx_packets rx_bytes tx_bytes rx_compressed tx_compressed multicast".split(),
+        [],
+        ["speed"],
+        [("interface", "S16"), ("duplex", "u1")],
+    ),
+    A_FS: (
+        "f_blocks f_bfree f_bavail f_files f_ffree".split(),
+        [],
+        [],
+        [("fs_name", "S128"), ("mountp", "S128")],
+    ),
+}
+
+ACTIVITY_IDS: dict[str, int] = {
+    "cpu": A_CPU,
+    "memory": A_MEMORY,
+    "disk": A_DISK,
+    "network": A_NET_DEV,
+    "filesystem": A_FS,
+}
+
+
+class FileActivity(NamedTuple):
+    id: int
+    magic: int
+    nr: int
+    nr2: int
+    has_nr: bool
+    size: int
+    types_nr: tuple[int, int, int]
+
+
+class SaHeader(NamedTuple):
+    version: str
+    nodename: str
+    sysname: str
+    release: str
+    machine: str
+    file_date: str
+    ust_time: int
+    hz: int
+    cpu_nr: int
+    activities: tuple[FileActivity, ...]
+    byteorder: str
+    data_offset: int
+    rec_size: int
+
+
+def _cstr(raw: bytes) -> str:
+    return raw.split(b"\0", 1)[0].decode("utf-8", "replace")
+
+
+def _file_date(ust_time: int, year: int, month: int, day: int) -> str:
+    try:
+        return date(year + 1900, month + 1, day).isoformat()
+    except ValueError:
+        return datetime.fromtimestamp(ust_time, tz=timezone.utc).date().isoformat()
+
+
+def parse_header(buf: bytes | mmap.mmap) -> SaHeader:
+    """Decode file magic, file header and activity list from the start of an sa file."""
+    if len(buf) < FILE_MAGIC_SIZE:
+        raise ValueError("not a sysstat data file (too short)")
+    bo = "<"
+    magic, fmt = struct.unpack_from("<HH", buf, 0)
+    if magic != SYSSTAT_MAGIC:
+        bo = ">"
+        magic, fmt = struct.unpack_from(">HH", buf, 0)
+        if magic != SYSSTAT_MAGIC:
+            raise ValueError("not a sysstat data file (bad magic)")
+    if fmt != FORMAT_MAGIC:
+        raise ValueError(f"unsupported sa file format 0x{fmt:04x}")
+    version = ".".join(str(v) for v in struct.unpack_from("BBB", buf, 4))
+    (header_size,) = struct.unpack_from(bo + "I", buf, 8)
+
+    h = FILE_MAGIC_SIZE
+    ust_time, hz = struct.unpack_from(bo + "QQ", buf, h)
+    cpu_nr, act_nr, year = struct.unpack_from(bo + "IIi", buf, h + 16)
+    act_size, rec_size, extra_next = struct.unpack_from(bo + "III", buf, h + 52)
+    day, month, sizeof_long = struct.unpack_from("BBb", buf, h + 64)
+    names = [_cstr(bytes(buf[h + 67 + 65 * i : h + 67 + 65 * (i + 1)])) for i in range(4)]
+    if sizeof_long != 8:
+        raise ValueError("sa files written with 32-bit longs are not supported")
+    if extra_next:
+        raise ValueError("sa file header extensions are not supported")
+
+    activities = []
+    pos = h + header_size
+    for _ in range(act_nr):
+        aid, amagic, nr, nr2, has_nr, size, t1, t2, t3 = struct.unpack_from(
+            bo + "IIiiiiIII", buf, pos
+        )
+        activities.append(FileActivity(aid, amagic, nr, nr2, bool(has_nr), size, (t1, t2, t3)))
+        pos += act_size
+    return SaHeader(
+        version=version,
+        sysname=names[0],
+        nodename=names[1],
+        release=names[2],
+        machine=names[3],
+        file_date=_file_date(ust_time, year, month, day),
+        ust_time=ust_time,
+        hz=hz,
+        cpu_nr=cpu_nr,
+        activities=tuple(activities),
+        byteorder=bo,
+        data_offset=pos,
+        rec_size=rec_size,
+    )
+
+
+def read_sa_header(path: str, opener: Callable[[str], IO[bytes]] | None = None) -> SaHeader:
+    """Read only the header of an sa file (no record decoding). opener opens path as
+    a binary stream, e.g. a decompressing one for an archive; it is read forward only.
+    """
+    with opener(path) if opener else open(path, "rb") as f:
+        head = f.read(FILE_MAGIC_SIZE + 4096)
+        hdr = parse_header(head)
+        if hdr.data_offset > len(head):
+            head += f.read(hdr.data_offset - len(head))
+            hdr = parse_header(head)
+    return hdr
+
+
+def _struct_dtype(act: FileActivity, bo: str) -> np.dtype:
+    ull, ul, u, tail = _LAYOUTS[act.id]
+    if act.types_nr != (len(ull), len(ul), len(u)):
+        raise ValueError(f"unsupported layout for activity {act.id}: types_nr={act.types_nr}")
+    names, formats, offsets = [], [], []
+    off = 0
+    for name in (*ull, *ul):
+        names.append(name)
+        formats.append(bo + "u8")
+        offsets.append(off)
+        off += 8
+    for name in u:
+        names.append(name)
+        formats.append(bo + "u4")
+        offsets.append(off)
+        off += 4
+    for name, fmt in tail:
+        names.append(name)
+        formats.append(fmt)
+        offsets.append(off)
+        off += np.dtype(fmt).itemsize
+    if off > act.size:
+        raise ValueError(f"activity {act.id} item size {act.size} is smaller than expected")
+    return np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": act.size})
+
+
+class _Records(NamedTuple):
+    ust_time: np.ndarray  # per stats record, seconds since epoch
+    uptime_cs: np.ndarray  # per stats record, 1/100 s
+    first: np.ndarray  # per stats record, True when no usable previous record
+    items: dict[int, tuple[np.ndarray, np.ndarray]]  # activity id -> (struct items, rec index)
+    resume: int  # byte offset of the last complete stats record, to walk on from later
+
+
+def _walk(
+    buf: mmap.mmap | bytes,
+    hdr: SaHeader,
+    wanted: set[int],
+    max_records: int | None = None,
+    window: tuple[int, int] | None = None,
+    start: int | None = None,
+) -> _Records:
+    """Record times of every stats record and the item blocks of the wanted activities.
+    With a window (epoch seconds, inclusive) the walk stops past its end, and items are
+    kept only from the last record before its start onwards (for rate deltas). start is
+    a byte offset returned as resume by an earlier walk: that record is read again,
+    as the previous record of the ones after it.
+    """
+    bo = hdr.byteorder
+    # struct record_header: uptime_cs, ust_time, extra_next, record_type, hour, minute, second
+    rec_fmt = struct.Struct(bo + "QQIBBBB")
+    nr_fmt = struct.Struct(bo + "i")
+    dtypes = {a.id: _struct_dtype(a, bo) for a in hdr.activities if a.id in wanted}
+    # per activity: (record index, byte offset, item count) of every item block
+    spans: dict[int, list[tuple[int, int, int]]] = {aid: [] for aid in dtypes}
+    ust: list[int] = []
+    uptime: list[int] = []
+    first: list[bool] = []
+    after_restart = True
+    end = len(buf)
+    pos = hdr.data_offset if start is None else start
+    resume = pos
+    while pos + hdr.rec_size <= end and (max_records is None or len(ust) < max_records):
+        rec_pos = pos
+        uptime_cs, ust_time, extra_next, rtype, _, _, _ = rec_fmt.unpack_from(buf, pos)
+        pos += hdr.rec_size
+        if rtype == R_RESTART:
+            pos += 4  # new number of CPUs
+            after_restart = True
+            continue
+        if rtype == R_COMMENT:
+            pos += MAX_COMMENT_LEN
+            continue
+        if rtype not in (R_STATS, R_LAST_STATS):
+            raise ValueError(f"unknown record type {rtype}")
+        if window is not None and ust_time > window[1]:
+            break
+        rec = len(ust)
+        truncated = False
+        for act in hdr.activities:
+            if act.has_nr:
+                if pos + 4 > end:
+                    truncated = True
+                    break
+                (nr,) = nr_fmt.unpack_from(buf, pos)
+                pos += 4
+            else:
+                nr = act.nr
+            count = nr * act.nr2
+            size = act.size * count
+            if pos + size > end:
+                truncated = True
+                break
+            if act.id in dtypes and count > 0:
+                spans[act.id].append((rec, pos, count))
+            pos += size
+        if truncated:
+            # sadc may still be appending to the last record
+            for aid in dtypes:
+                if spans[aid] and spans[aid][-1][0] == rec:
+                    spans[aid].pop()
+            break
+        if extra_next:
+            raise ValueError("sa record extensions are not supported")
+        resume = rec_pos
+        ust.append(ust_time)
+        uptime.append(uptime_cs)
+        first.append(after_restart)
+        after_restart = False
+    if window is not None:
+        before = np.flatnonzero(np.asarray(ust, dtype=np.int64) < window[0])
+        if len(before) > 1:
+            lead = int(before[-1])
+            spans = {aid: [b for b in blocks if b[0] >= lead] for aid, blocks in spans.items()}
+    items = {}
+    for aid, blocks in spans.items():
+        if not blocks:
+            continue
+        size = dtypes[aid].itemsize
+        data = b"".join(buf[p : p + n * size] for _, p, n in blocks)
+        owner = np.repeat(
+            np.fromiter((r for r, _, _ in blocks), np.int64, len(blocks)),
+            np.fromiter((n for _, _, n in blocks), np.int64, len(blocks)),
+        )
+        items[aid] = (np.frombuffer(data, dtypes[aid]), owner)
+    return _Records(
+        np.asarray(ust, dtype=np.int64),
+        np.asarray(uptime, dtype=np.int64),
+        np.asarray(first, dtype=bool),
+        items,
+        resume,
+    )
+
+
+def _stamps(recs: _Records, rec: np.ndarray) -> np.ndarray:
+    return (recs.ust_time[rec] * 1_000_000_000).astype("datetime64[ns]")
+
+
+def _deltas(
+    raw: pd.DataFrame, key: str, counters: list[str], recs: _Records
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Per-entity counter deltas against the previous stats record.
+    Entities missing from the previous record count from zero, as sadf does; rows of
+    the first record after a (re)start have no previous record and are dropped.
+    """
+    keep = ~recs.first[raw["rec"].to_numpy()]
+    grouped = raw.groupby(key, sort=False)
+    prev_rec = grouped["rec"].shift()
+    prev = grouped[counters].shift()
+    prev.loc[(prev_rec != raw["rec"] - 1).to_numpy()] = 0
+    delta = (raw[counters].astype(np.float64) - prev.astype(np.float64)).clip(lower=0)
+    return raw.loc[keep].reset_index(drop=True), delta.loc[keep].reset_index(drop=True)
+
+
+def _interval(recs: _Records, rec: np.ndarray) -> np.ndarray:
+    prev = np.maximum(rec - 1, 0)
+    itv = (recs.uptime_cs[rec] - recs.uptime_cs[prev]) / 100.0
+    return np.where(itv > 0, itv, np.nan)
+
+
+def _ratio(num: np.ndarray, den: np.ndarray, scale: float = 1.0) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = num / den * scale
+    return np.where(den > 0, out, 0.0)
+
+
+def _cpu_names(nr: int) -> np.ndarray:
+    # item 0 is the "all" aggregate, item i is CPU i-1
+    return np.array(["all", *(str(i) for i in range(nr - 1))], dtype=object)
+
+
+def _keep(names: np.ndarray | pd.Series, only: Collection[str] | None) -> np.ndarray:
+    if only is None:
+        return np.ones(len(names), dtype=bool)
+    return np.isin(np.asarray(names, dtype=object), list(only))
+
+
+def _cpu_frame(
+    items: np.ndarray, rec: np.ndarray, recs: _Records, only: Collection[str] | None = None
+) -> pd.DataFrame:
+    counters = list(items.dtype.names or ())
+    raw = pd.DataFrame({name: items[name] for name in counters})
+    raw.insert(0, "rec", rec)
+    raw.insert(1, "slot", raw.groupby("rec").cumcount().to_numpy())
+    cpu_names = _cpu_names(int(raw["slot"].to_numpy().max(initial=0)) + 1)
+    online = raw[counters].to_numpy().any(axis=1)
+    raw = raw.loc[online & _keep(cpu_names[raw["slot"].to_numpy()], only)]
+    raw = raw.reset_index(drop=True)
+    raw, d = _deltas(raw, "slot", counters, recs)
+    user = (d["user"] - d["guest"]).clip(lower=0)
+    nice = (d["nice"] - d["guest_nice"]).clip(lower=0)
+    system = d["sys"] + d["hardirq"] + d["softirq"]
+    total = (user + nice + system + d["idle"] + d["iowait"] + d["steal"]).to_numpy()
+    tickless = total == 0
+    slot = raw["slot"].to_numpy()
+    return pd.DataFrame(
+        {
+            "timestamp": _stamps(recs, raw["rec"].to_numpy()),
+            "cpu": cpu_names[slot],
+            "user": _ratio(user.to_numpy(), total, 100.0),
+            "system": _ratio(system.to_numpy(), total, 100.0),
+            "iowait": _ratio(d["iowait"].to_numpy(), total, 100.0),
+            "idle": np.where(tickless, 100.0, _ratio(d["idle"].to_numpy(), total, 100.0)),
+        }
+    )
+
+
+def _memory_frame(
+    items: np.ndarray, rec: np.ndarray, recs: _Records, only: Collection[str] | None = None
+) -> pd.DataFrame:
+    keep = ~recs.first[rec]
+    m = {name: items[name][keep].astype(np.float64) for name in items.dtype.names or ()}
+    tlm = m["tlmkb"]
+    nousedmem = np.minimum(m["frmkb"] + m["bufkb"] + m["camkb"] + m["slabkb"], tlm)
+    used = tlm - nousedmem
+    return pd.DataFrame(
+        {
+            "timestamp": _stamps(recs, rec[keep]),
+            "memfree": m["frmkb"],
+            "avail": m["availablekb"],
+            "memused": used,
+            "memused_pct": _ratio(used, tlm, 100.0),
+            "buffers": m["bufkb"],
+            "cached": m["camkb"],
+            "commit": m["comkb"],
+            "commit_pct": _ratio(m["comkb"], tlm + m["tlskb"], 100.0),
+            "active": m["activekb"],
+            "inactive": m["inactkb"],
+            "dirty": m["dirtykb"],
+        }
+    )
+
+
+def _disk_names(items: np.ndarray) -> pd.Series:
+    major = pd.Series(items["major"]).astype(str)
+    return "dev" + major + "-" + pd.Series(items["minor"]).astype(str)
+
+
+def _disk_frame(
+    items: np.ndarray, rec: np.ndarray, recs: _Records, only: Collection[str] | None = None
+) -> pd.DataFrame:
+    counters = ["nr_ios", "rd_sect", "wr_sect", "dc_sect", "rd_ticks", "wr_ticks"]
+    counters += ["tot_ticks", "rq_ticks", "dc_ticks"]
+    raw = pd.DataFrame({name: items[name] for name in counters})
+    raw.insert(0, "rec", rec)
+    raw.insert(1, "dev", _disk_names(items))
+    raw = raw.loc[_keep(raw["dev"], only)].reset_index(drop=True)
+    raw, d = _deltas(raw, "dev", counters, recs)
+    itv = _interval(recs, raw["rec"].to_numpy())
+    ios = d["nr_ios"].to_numpy()
+    sect = (d["rd_sect"] + d["wr_sect"] + d["dc_sect"]).to_numpy()
+    ticks = (d["rd_ticks"] + d["wr_ticks"] + d["dc_ticks"]).to_numpy()
+    return pd.DataFrame(
+        {
+            "timestamp": _stamps(recs, raw["rec"].to_numpy()),
+            "dev": raw["dev"].to_numpy(dtype=object),
+            "tps": ios / itv,
+            "rkB": d["rd_sect"].to_numpy() / itv / 2,
+            "wkB": d["wr_sect"].to_numpy() / itv / 2,
+            "dkB": d["dc_sect"].to_numpy() / itv / 2,
+            "areq_sz": _ratio(sect, ios, 0.5),
+            "aqu_sz": d["rq_ticks"].to_numpy() / itv / 1000.0,
+            "await": _ratio(ticks, ios),
+            "util_pct": d["tot_ticks"].to_numpy() / itv / 10.0,
+        }
+    )
+
+
+def _decode_names(raw: np.ndarray) -> np.ndarray:
+    codes, uniques = pd.factorize(raw)
+    names = np.array([_cstr(bytes(u)) for u in uniques], dtype=object)
+    return names[codes]
+
+
+def _net_frame(
+    items: np.ndarray, rec: np.ndarray, recs: _Records, only: Collection[str] | None = None
+) -> pd.DataFrame:
+    counters = ["rx_packets", "tx_packets", "rx_bytes", "tx_bytes"]
+    counters += ["rx_compressed", "tx_compressed", "multicast"]
+    raw = pd.DataFrame({name: items[name] for name in counters})
+    raw.insert(0, "rec", rec)
+    raw.insert(1, "iface", _decode_names(items["interface"]))
+    raw["speed"] = items["speed"].astype(np.float64)
+    raw["duplex"] = items["duplex"]
+    raw = raw.loc[_keep(raw["iface"], only)].reset_index(drop=True)
+    raw, d = _deltas(raw, "iface", counters, recs)
+    itv = _interval(recs, raw["rec"].to_numpy())
+    rx = d["rx_bytes"].to_numpy() / itv
+    tx = d["tx_bytes"].to_numpy() / itv
+    speed = raw["speed"].to_numpy() * 1_000_000
+    full = raw["duplex"].to_numpy() == 2
+    return pd.DataFrame(
+        {
+            "timestamp": _stamps(recs, raw["rec"].to_numpy()),
+            "iface": raw["iface"].to_numpy(),
+            "rxpck": d["rx_packets"].to_numpy() / itv,
+            "txpck": d["tx_packets"].to_numpy() / itv,
+            "rxkB": rx / 1024,
+            "txkB": tx / 1024,
+            "rxcmp": d["rx_compressed"].to_numpy() / itv,
+            "txcmp": d["tx_compressed"].to_numpy() / itv,
+            "rxmcst": d["multicast"].to_numpy() / itv,
+            "ifutil_pct": _ratio(np.where(full, np.maximum(rx, tx), rx + tx), speed, 800.0),
+        }
+    )
+
+
+def _fs_frame(
+    items: np.ndarray, rec: np.ndarray, recs: _Records, only: Collection[str] | None = None
+) -> pd.DataFrame:
+    names = _decode_names(items["fs_name"])
+    keep = ~recs.first[rec] & _keep(names, only)
+    f = {n: items[n][keep].astype(np.float64) for n in ("f_blocks", "f_bfree", "f_bavail")}
+    files = items["f_files"][keep].astype(np.float64)
+    ffree = items["f_ffree"][keep].astype(np.float64)
+    blocks = f["f_blocks"]
+    return pd.DataFrame(
+        {
+            "timestamp": _stamps(recs, rec[keep]),
+            "filesystem": names[keep],
+            "mb_free": f["f_bfree"] / 1048576,
+            "mb_used": (blocks - f["f_bfree"]) / 1048576,
+            "fsused_pct": _ratio(blocks - f["f_bfree"], blocks, 100.0),
+            "ufsused_pct": _ratio(blocks - f["f_bavail"], blocks, 100.0),
+            "inodes_free": ffree,
+            "inodes_used": files - ffree,
+            "inodes_used_pct": _ratio(files - ffree, files, 100.0),
+        }
+    )
+
+
+_BUILDERS = {
+    A_CPU: _cpu_frame,
+    A_MEMORY: _memory_frame,
+    A_DISK: _disk_frame,
+    A_NET_DEV: _net_frame,
+    A_FS: _fs_frame,
+}
+
+
+_ENTITY_NAMES = {
+    A_CPU: lambda items: _cpu_names(len(items)),
+    A_DISK: lambda items: _disk_names(items).to_numpy(dtype=object),
+    A_NET_DEV: lambda items: _decode_names(items["interface"]),
+    A_FS: lambda items: _decode_names(items["fs_name"]),
+}
+
+
+def _decode(
+    buf: mmap.mmap,
+    hdr: SaHeader,
+    only: Mapping[str, Collection[str] | None],
+    window: tuple[int, int] | None = None,
+    start: int | None = None,
+) -> tuple[dict[str, pd.DataFrame], int]:
+    wanted = {aid for name, aid in ACTIVITY_IDS.items() if only.get(name) != ()}
+    recs = _walk(buf, hdr, wanted, window=window, start=start)
+    frames: dict[str, pd.DataFrame] = {}
+    for name, aid in ACTIVITY_IDS.items():
+        if aid in recs.items:
+            items, rec = recs.items[aid]
+            df = _BUILDERS[aid](items, rec, recs, only.get(name))
+            if window is not None:
+                lo = np.datetime64(window[0], "s")
+                df = df[df["timestamp"].to_numpy() >= lo].reset_index(drop=True)
+            frames[name] = compact(df)
+        else:
+            frames[name] = pd.DataFrame()
+    return frames, recs.resume
+
+
+@timed("parse.native")
+def read_sa_frames(
+    path: str,
+    only: Mapping[str, Collection[str] | None] | None = None,
+    window: tuple[int, int] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Decode CPU, memory, disk, net-dev and filesystem frames from an sa file.
+    only maps an activity to the entity names to keep (CPUs, devices, interfaces,
+    filesystems); other entities are dropped before any rate is computed, and an empty
+    selection skips the activity. window (epoch seconds, inclusive) limits the records
+    decoded, like sadf -s/-e. Activities not collected come back as empty frames.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        return _decode(buf, parse_header(buf), only or {}, window)[0]
+
+
+@timed("parse.native.tail")
+def read_sa_tail(
+    path: str,
+    only: Mapping[str, Collection[str] | None] | None = None,
+    offset: int | None = None,
+) -> tuple[dict[str, pd.DataFrame], int]:
+    """Frames of the records after offset, and the offset to pass next time. offset
+    is the one returned by the previous call (None decodes the whole file); only the
+    bytes from there on are read, so following a file sadc is appending to costs what
+    was appended. A record still being written is left for the next call.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        return _decode(buf, parse_header(buf), only or {}, start=offset)
+
+
+# bytes of a stream read at first for read_sa_entities (doubled until a record fits)
+_ENTITY_PREFIX = 1 << 20
+
+
+def read_sa_entities(
+    path: str, opener: Callable[[str], IO[bytes]] | None = None
+) -> dict[str, list[str]]:
+    """Entity names per activity (CPUs with "all", devices, interfaces, filesystems),
+    as found in the first stats record; only that record is decoded. With opener (see
+    read_sa_header) the stream is read only as far as that record.
+    """
+    ids = {aid: name for name, aid in ACTIVITY_IDS.items() if aid in _ENTITY_NAMES}
+    if opener is None:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            recs = _walk(buf, parse_header(buf), set(ids), max_records=1)
+    else:
+        with opener(path) as f:
+            head = f.read(_ENTITY_PREFIX)
+            while True:
+                recs = _walk(head, parse_header(head), set(ids), max_records=1)
+                more = b"" if len(recs.ust_time) else f.read(len(head))
+                if not more:
+                    break
+                head += more
+    return {
+        ids[aid]: list(dict.fromkeys(_ENTITY_NAMES[aid](items)))
+        for aid, (items, _) in recs.items.items()
+    }
@@ -0,0 +1,156 @@
+"""Compressed sa archives (.gz, .xz, .zst) as plain files sadf and the native reader can open.
+
+Retention keeps older days compressed. The catalog reads their header through a
+decompressing stream; a conversion needs the whole file, so local_path() inflates it
+once, streaming, into a bounded directory of inflated copies keyed by the archive's
+identity (path, size, mtime, inode). Later conversions of the same archive reuse the
+copy; least recently used copies are dropped once the directory exceeds its budget.
+Converted frames are cached under the archive's own identity (see sadf), so a day
+already in the Parquet cache is not inflated at all.
+
+.zst needs the optional zstandard package; without it .zst files are not listed at all
+(see supported()) rather than listed and then failing to load.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import lzma
+import os
+import shutil
+import tempfile
+import threading
+from collections.abc import Callable
+from importlib.util import find_spec
+from typing import IO
+
+from . import parquet_cache
+from .instrument import stage
+
+INFLATE_DIR = os.environ.get(
+    "SAR_INFLATE_DIR", os.path.join(tempfile.gettempdir(), "sar-viewer-inflated")
+)
+INFLATE_MAX_BYTES = int(os.environ.get("SAR_INFLATE_MAX_MB", "4096")) * 1024 * 1024
+_CHUNK = 1 << 20
+
+
+def _open_zst(path: str) -> IO[bytes]:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError(f"{path}: reading .zst archives needs the zstandard package") from e
+    return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+
+
+# suffix -> opener of a decompressing binary stream
+OPENERS: dict[str, Callable[[str], IO[bytes]]] = {
+    ".gz": lambda path: gzip.open(path, "rb"),
+    ".xz": lambda path: lzma.open(path, "rb"),
+}
+if find_spec("zstandard") is not None:
+    OPENERS[".zst"] = _open_zst
+# archive suffixes sa files are kept under, whether or not they can be opened here
+SUFFIXES = (".gz", ".xz", ".zst")
+
+
+# what a truncated or corrupt archive raises on top of OSError (gzip's BadGzipFile)
+BAD_ARCHIVE: tuple[type[Exception], ...] = (EOFError, lzma.LZMAError)
+try:
+    import zstandard
+
+    BAD_ARCHIVE += (zstandard.ZstdError,)
+except ImportError:
+    pass
+
+
+def compression(path: str) -> str | None:
+    """The archive suffix of path (".gz", ".xz", ...), or None for a plain file."""
+    suffix = os.path.splitext(path)[1].lower()
+    return suffix if suffix in OPENERS else None
+
+
+def supported(path: str) -> bool:
+    """False for an archive this process cannot decompress (.zst without zstandard)."""
+    suffix = os.path.splitext(path)[1].lower()
+    return suffix not in SUFFIXES or suffix in OPENERS
+
+
+def plain_name(path: str) -> str:
+    """File name without its archive suffix: sa20250101.xz -> sa20250101."""
+    name = os.path.basename(path)
+    return os.path.splitext(name)[0] if compression(path) else name
+
+
+def open_stream(path: str) -> IO[bytes]:
+    """path as a binary stream, decompressed on the fly when it is an archive."""
+    suffix = compression(path)
+    return OPENERS[suffix](path) if suffix else open(path, "rb")
+
+
+# one inflation per archive at a time in this process; pool workers rename into place
+_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _lock(key: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def local_path(path: str) -> str:
+    """A plain file with path's content: path itself, or its inflated copy."""
+    if compression(path) is None:
+        return path
+    identity = parquet_cache.file_identity(path)
+    if identity is None:
+        raise FileNotFoundError(path)
+    key = hashlib.sha256(repr((os.path.abspath(path), *identity)).encode()).hexdigest()[:32]
+    target = os.path.join(INFLATE_DIR, f"{key}-{plain_name(path)}")
+    with _lock(key):
+        try:
+            os.utime(target)  # mark as recently used for pruning
+            return target
+        except OSError:
+            pass
+        _inflate(path, target)
+    prune(INFLATE_MAX_BYTES, keep=target)
+    return target
+
+
+def _inflate(path: str, target: str) -> None:
+    # written beside the target and renamed, so a reader never sees a partial copy
+    os.makedirs(INFLATE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=INFLATE_DIR)
+    try:
+        with stage("archive.inflate", path=path) as record:
+            with os.fdopen(fd, "wb") as out, open_stream(path) as src:
+                shutil.copyfileobj(src, out, _CHUNK)
+                record["bytes"] = out.tell()
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def prune(max_bytes: int, keep: str | None = None) -> None:
+    """Drop least recently used inflated copies until the directory fits in max_bytes."""
+    try:
+        files = [
+            (e.stat().st_mtime, e.stat().st_size, e.path)
+            for e in os.scandir(INFLATE_DIR)
+            if e.is_file(follow_symlinks=False) and not e.name.startswith(".")
+        ]
+    except OSError:
+        return
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total -= size
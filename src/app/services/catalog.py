@@ -0,0 +1,205 @@
+"""Catalog of the sar files and CSV bundles under logs/, kept on disk between runs.
+
+Listing thousands of host directories, and converting files just to learn their date,
+made opening the page slow. The catalog records, per host directory, the sar files
+found there (date, hostname and activities, from the sa header only) and the CSV
+date directories. A CSV directory is listed again only when its mtime changes. sadc
+rewrites saDD files in place every month without touching their directory, so a sar
+directory is listed on every call, at the cost of one stat per file, but a header
+is read again only for a file that is new or whose size, mtime or inode changed.
+
+Entries survive restarts in catalog.json under SAR_CACHE_DIR.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Any, NamedTuple
+
+from ..parsers.sa_file import ACTIVITY_IDS, read_sa_header
+from . import parquet_cache
+from .archive import BAD_ARCHIVE, local_path, open_stream, supported
+from .sadf import convert_with_sadf
+
+_SA_NAME = re.compile(r"^sa(\d{8})(\.gz|\.xz|\.zst)?$")
+_DAY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# bump when entries change shape
+_VERSION = 3
+
+
+class SarFile(NamedTuple):
+    date: str  # YYYY-MM-DD, or the file name when no date could be read
+    path: str
+    host: str
+    activities: tuple[str, ...]
+
+    @property
+    def dated(self) -> bool:
+        """Whether the name, the sa header or sadf gave a date: else not sar data at all
+        (sysstat's sarDD text reports, say) or a file still being written.
+        """
+        return self.date != os.path.basename(self.path)
+
+
+def _mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _sadf_date(path: str) -> str | None:
+    """file-date from sadf's JSON header, for files the native reader cannot parse."""
+    fmt, text = convert_with_sadf(local_path(path), ("-u",), "auto")
+    if fmt != "json":
+        return None
+    host = json.loads(text).get("sysstat", {}).get("hosts", [{}])[0]
+    return host.get("file-date") or None
+
+
+def read_sar_file(path: str) -> SarFile:
+    """Date, hostname and activities of one sar file. A saYYYYMMDD name (optionally
+    .gz, .xz or .zst) gives the date; otherwise the sa header does, then sadf, then the
+    file name. The header of an archive is read through a decompressing stream.
+    """
+    name = os.path.basename(path)
+    m = _SA_NAME.match(name)
+    day = f"{m.group(1)[:4]}-{m.group(1)[4:6]}-{m.group(1)[6:]}" if m else None
+    try:
+        hdr = read_sa_header(path, open_stream)
+    except (OSError, RuntimeError, ValueError, *BAD_ARCHIVE):
+        try:
+            day = day or _sadf_date(path)
+        except (OSError, RuntimeError, ValueError, *BAD_ARCHIVE):
+            pass
+        return SarFile(day or name, path, "", ())
+    ids = {a.id for a in hdr.activities}
+    present = tuple(act for act, aid in ACTIVITY_IDS.items() if aid in ids)
+    return SarFile(day or hdr.file_date, path, hdr.nodename, present)
+
+
+class Catalog:
+    def __init__(self, path: str | None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirs: dict[str, dict[str, Any]] | None = None
+        self._dirty = False
+
+    def _entries(self) -> dict[str, dict[str, Any]]:
+        if self._dirs is None:
+            self._dirs = {}
+            if self.path:
+                try:
+                    with open(self.path) as f:
+                        doc = json.load(f)
+                    if doc.get("version") == _VERSION:
+                        self._dirs = doc["dirs"]
+                except (OSError, ValueError, KeyError):
+                    pass
+        return self._dirs
+
+    def save(self) -> None:
+        """Write the catalog if it changed; written to a temp file and renamed."""
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            doc = {"version": _VERSION, "dirs": self._entries()}
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                fd, tmp = tempfile.mkstemp(prefix=".catalog-", dir=os.path.dirname(self.path))
+                with os.fdopen(fd, "w") as f:
+                    json.dump(doc, f)
+                os.replace(tmp, self.path)
+            except OSError:
+                return
+            self._dirty = False
+
+    def _refresh(self, kind: str, dir_path: str, scan: Any, always: bool = False) -> Any:
+        """Cached scan(dir_path, previous) result, redone when the directory's mtime
+        changes (or on every call with always, scan reusing what did not change).
+        """
+        key = f"{kind}:{os.path.abspath(dir_path)}"
+        mtime = _mtime(dir_path)
+        with self._lock:
+            old = self._entries().get(key)
+            if old is not None and old["mtime"] == mtime and not old.get("pending") and not always:
+                return old["items"]
+        items, pending = [], False
+        if mtime is not None:
+            try:
+                items, pending = scan(dir_path, old["items"] if old else None)
+            except OSError:  # removed while listing
+                items, pending = [], True
+        entry = {"mtime": mtime, "items": items, "pending": pending}
+        with self._lock:
+            if entry != old:
+                self._entries()[key] = entry
+                self._dirty = True
+        return items
+
+    def sar_files(self, dir_path: str) -> list[SarFile]:
+        """sar files directly under dir_path, in name order."""
+        items = self._refresh("sar", dir_path, _scan_sar, always=True)
+        return [SarFile(day, path, host, tuple(acts)) for day, path, host, acts, _ in items]
+
+    def csv_dates(self, dir_path: str) -> list[tuple[str, str]]:
+        """(date, directory) of each CSV bundle under dir_path/csv."""
+        items = self._refresh("csv", os.path.join(dir_path, "csv"), _scan_csv)
+        return [(day, path) for day, path, _ in items]
+
+    def has_csv_bundle(self, dir_path: str) -> bool:
+        """Whether some CSV bundle under dir_path/csv holds at least a cpu.csv."""
+        items = self._refresh("csv", os.path.join(dir_path, "csv"), _scan_csv)
+        return any(ready for _, _, ready in items)
+
+
+def _unread(item: list[Any]) -> bool:
+    # no date from the name, the header or sadf, e.g. a file still being written
+    return item[0] == os.path.basename(item[1])
+
+
+def _scan_sar(dir_path: str, old: list[list[Any]] | None) -> tuple[list[list[Any]], bool]:
+    # an entry is kept while its file's identity (the last field) is unchanged: appends
+    # change it too, and a header read is cheap; an unreadable file is not probed with
+    # sadf again until it changes
+    known = {item[1]: item for item in old or []}
+    items: list[list[Any]] = []
+    with os.scandir(dir_path) as it:
+        entries = [e for e in it if e.is_file() and supported(e.name)]
+    for entry in sorted(entries, key=lambda e: e.name):
+        identity = list(parquet_cache.file_identity(entry.path) or ())
+        item = known.get(entry.path)
+        if item is None or item[4] != identity:
+            day, path, host, acts = read_sar_file(entry.path)
+            item = [day, path, host, list(acts), identity]
+        items.append(item)
+    return items, any(_unread(item) for item in items)
+
+
+def _scan_csv(csv_root: str, old: list[list[Any]] | None) -> tuple[list[list[Any]], bool]:
+    # a date directory may be created before its files: keep rescanning until it has cpu.csv
+    items: list[list[Any]] = []
+    with os.scandir(csv_root) as it:
+        entries = [e for e in it if e.is_dir() and _DAY.match(e.name)]
+    for entry in sorted(entries, key=lambda e: e.name):
+        ready = os.path.isfile(os.path.join(entry.path, "cpu.csv"))
+        items.append([entry.name, entry.path, ready])
+    return items, not all(ready for _, _, ready in items)
+
+
+def list_dirs(root: str) -> list[str]:
+    """Host directories under root, in name order (hidden ones skipped)."""
+    try:
+        with os.scandir(root) as it:
+            return sorted(e.name for e in it if e.is_dir() and not e.name.startswith("."))
+    except OSError:
+        return []
+
+
+CATALOG = Catalog(
+    os.path.join(parquet_cache.CACHE_DIR, "catalog.json") if parquet_cache.CACHE_DIR else None
+)
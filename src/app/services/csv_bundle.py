@@ -0,0 +1,175 @@
+"""CSV bundles: one file per activity under logs/<dir>/csv/YYYY-MM-DD/.
+
+Files are read against a declared schema rather than with type inference: only the
+timestamp and the columns the sections chart are read (SCHEMAS), entity names come
+in as categoricals and metrics as float64 (compact() then narrows them like every
+other parser does), and timestamps are parsed with the format pandas writes them in,
+falling back to inference for anything else. pyarrow's multithreaded CSV engine is
+used when it is installed. Columns outside SCHEMAS are never loaded, so they appear
+neither in the sections nor in their exports; add a column there to chart or export it.
+
+The first read of a file also writes a Parquet sidecar beside it (.cpu.csv.parquet for
+cpu.csv) carrying the CSV's size and mtime; later reads of an unchanged CSV load the
+sidecar, memory-mapped, instead of parsing text again. Sidecars need pyarrow; a
+bundle directory that is not writable is simply read from CSV every time.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import tempfile
+from importlib.util import find_spec
+
+import pandas as pd
+
+from ..parsers.columnar import compact
+from . import parquet_cache
+from .instrument import stage
+from .sadf import Activity
+
+# per-activity files of a CSV bundle (logs/<dir>/csv/YYYY-MM-DD/)
+CSV_FILES: dict[Activity, str] = {
+    "cpu": "cpu.csv",
+    "memory": "memory.csv",
+    "disk": "disk.csv",
+    "network": "network.csv",
+    "filesystem": "fs.csv",
+}
+
+_ENTITY = "category"
+_METRIC = "float64"
+
+# columns read from each file besides the timestamp, with their dtypes; others are skipped
+SCHEMAS: dict[Activity, dict[str, str]] = {
+    "cpu": {
+        "cpu": _ENTITY,
+        **dict.fromkeys(("user", "system", "iowait", "idle"), _METRIC),
+    },
+    "memory": dict.fromkeys(
+        ("memused_pct", "memfree", "avail", "cached", "buffers", "commit_pct"), _METRIC
+    ),
+    "disk": {
+        "dev": _ENTITY,
+        **dict.fromkeys(("tps", "rkB_s", "wkB_s", "await", "util_pct"), _METRIC),
+    },
+    "network": {
+        "iface": _ENTITY,
+        **dict.fromkeys(("rxkB_s", "txkB_s", "rxpck_s", "txpck_s", "ifutil_pct"), _METRIC),
+    },
+    "filesystem": {
+        "filesystem": _ENTITY,
+        **dict.fromkeys(
+            ("mb_free", "mb_used", "fsused_pct", "ufsused_pct", "inodes_used_pct"), _METRIC
+        ),
+    },
+}
+
+# how pandas (and the sample:csv task) writes timestamps
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+ENGINE = "pyarrow" if find_spec("pyarrow") is not None else "c"
+
+SIDECARS = os.environ.get("SAR_CSV_SIDECAR", "1") != "0"
+_SOURCE = b"sar_viewer.source"
+# bump when SCHEMAS or the parsing below change the frames a sidecar holds
+SIDECAR_SCHEMA = 1
+
+
+def sidecar_path(path: str) -> str:
+    head, name = os.path.split(path)
+    return os.path.join(head, f".{name}.parquet")
+
+
+def _source(identity: tuple[int, int, int]) -> bytes:
+    # size and mtime only: a bundle copied elsewhere keeps its sidecars valid
+    return json.dumps([SIDECAR_SCHEMA, identity[0], identity[1]]).encode()
+
+
+def _timestamps(col: pd.Series) -> pd.Series:
+    if not pd.api.types.is_datetime64_any_dtype(col):
+        try:
+            col = pd.to_datetime(col, format=TIMESTAMP_FORMAT)
+        except (ValueError, TypeError):
+            col = pd.to_datetime(col, errors="coerce")
+    if isinstance(col.dtype, pd.DatetimeTZDtype):
+        return col
+    # pyarrow infers second resolution; the other parsers produce nanoseconds
+    return col.astype("datetime64[ns]")
+
+
+def read_csv_file(path: str, activity: Activity) -> pd.DataFrame:
+    """One activity file parsed against SCHEMAS[activity]."""
+    schema = SCHEMAS[activity]
+    with open(path, newline="") as f:
+        header = next(csv.reader(f), [])
+    columns = [c for c in header if c == "timestamp" or c in schema]
+    if not columns:
+        return pd.DataFrame()
+    with stage("csv.read", path=path, engine=ENGINE) as record:
+        df = pd.read_csv(
+            path,
+            usecols=columns,
+            dtype={c: schema[c] for c in columns if c in schema},
+            engine=ENGINE,
+        )
+        record["rows"] = len(df)
+    if "timestamp" in df.columns:
+        df["timestamp"] = _timestamps(df["timestamp"])
+    return compact(df)
+
+
+def _read_sidecar(path: str, identity: tuple[int, int, int]) -> pd.DataFrame | None:
+    try:
+        import pyarrow.parquet as pq
+
+        metadata = pq.read_schema(path).metadata or {}
+        if metadata.get(_SOURCE) != _source(identity):
+            return None
+        with stage("csv.sidecar", path=path) as record:
+            df = pd.read_parquet(path, memory_map=True)
+            record["rows"] = len(df)
+    except (OSError, ValueError, ImportError):
+        return None
+    return df
+
+
+def _write_sidecar(path: str, df: pd.DataFrame, identity: tuple[int, int, int]) -> None:
+    # written beside the target and renamed, so a reader never sees a partial sidecar
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), _SOURCE: _source(identity)}
+        )
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".parquet", dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pq.write_table(table, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except (OSError, ValueError, TypeError, ImportError):
+        return
+
+
+def read_csv_day(date_dir: str, activity: Activity) -> pd.DataFrame | None:
+    """One activity file of a CSV bundle, from its sidecar when that is current;
+    None if the bundle has no such file.
+    """
+    path = os.path.join(date_dir, CSV_FILES[activity])
+    identity = parquet_cache.file_identity(path)
+    if identity is None or not os.path.isfile(path):
+        return None
+    side = sidecar_path(path)
+    if SIDECARS:
+        df = _read_sidecar(side, identity)
+        if df is not None:
+            return df
+    df = read_csv_file(path, activity)
+    if SIDECARS:
+        _write_sidecar(side, df, identity)
+    return df
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import Literal
+
+import numpy as np
+import pandas as pd
+
+Method = Literal["lttb", "minmax", "raw"]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: pick n_out points that keep the visual shape.
+    Always keeps the first and last point; one point per bucket in between.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket (or the last point for the final bucket)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Keep the min and max of each of n_out // 2 equal buckets, in time order."""
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    buckets = n_out // 2
+    bucket = np.arange(n) * buckets // n
+    order = np.lexsort((y, bucket))
+    starts = np.searchsorted(bucket[order], np.arange(buckets))
+    ends = np.append(starts[1:], n) - 1
+    return np.unique(np.concatenate([order[starts], order[ends]]))
+
+
+def _x(index: pd.Index) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    return np.arange(len(index), dtype=np.float64)
+
+
+def downsample_series(s: pd.Series, max_points: int, method: Method = "lttb") -> pd.Series:
+    s = s.dropna()
+    if method == "raw" or len(s) <= max_points:
+        return s
+    y = s.to_numpy(dtype=np.float64)
+    if method == "minmax":
+        idx = minmax_indices(y, max_points)
+    else:
+        idx = lttb_indices(_x(s.index), y, max_points)
+    return s.iloc[idx]
+
+
+def downsample_frame(df: pd.DataFrame, max_points: int, method: Method = "lttb") -> pd.DataFrame:
+    """Decimate every column of a wide, time-indexed frame to at most max_points."""
+    if method == "raw" or len(df) <= max_points:
+        return df
+    parts = {col: downsample_series(df[col], max_points, method) for col in df.columns}
+    return pd.concat(parts, axis=1).sort_index()
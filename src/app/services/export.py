@@ -0,0 +1,47 @@
+"""Frames serialized for download, built only when asked for and kept in the frame
+cache under a caller-supplied key (the selection and any tab filter), so a second
+download of the same data does not serialize it again.
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+from collections.abc import Hashable
+from typing import Literal
+
+import pandas as pd
+
+from .frame_cache import CACHE
+
+Format = Literal["csv", "csv.gz", "parquet"]
+FORMATS: list[Format] = ["csv", "csv.gz", "parquet"]
+
+MIME: dict[Format, str] = {
+    "csv": "text/csv",
+    "csv.gz": "application/gzip",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def to_bytes(df: pd.DataFrame, fmt: Format) -> bytes:
+    if fmt == "parquet":
+        buf = io.BytesIO()
+        df.to_parquet(buf, index=False, compression="zstd")
+        return buf.getvalue()
+    data = df.to_csv(index=False).encode("utf-8")
+    if fmt == "csv.gz":
+        # level 6 is several times faster than the default 9 for a few % in size
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    return data
+
+
+def export_bytes(key: Hashable, df: pd.DataFrame, fmt: Format) -> bytes:
+    """df as fmt, cached by (key, fmt): key must identify the data df holds."""
+    entry = ("export", key, fmt)
+    found, data = CACHE.get(entry)
+    if found:
+        return data  # type: ignore[return-value]
+    data = to_bytes(df, fmt)
+    CACHE.put(entry, data)
+    return data
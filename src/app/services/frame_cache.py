@@ -0,0 +1,154 @@
+"""In-process cache for parsed frames, shared by every session.
+
+st.cache_data pickles each return value and hands out an unpickled copy on every hit;
+for frames of hundreds of MB that costs about as much as parsing again. Entries here
+are returned by reference instead, and their size is accounted when stored. The app
+switches pandas copy-on-write on at startup (app.py) so that a tab filtering or
+assigning to a cached frame gets its own copy and never edits the shared entry.
+
+The cache holds at most SAR_MEMORY_CACHE_MB (default 1024). Eviction is LRU weighted by
+size (GreedyDual-Size): each entry's priority is the cache clock at its last use plus
+budget / size, so among entries used about as recently the largest go first.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import sys
+import threading
+from collections.abc import Callable, Hashable
+from typing import Generic, NamedTuple, TypeVar
+
+import pandas as pd
+
+from .instrument import stage
+
+R = TypeVar("R")
+
+MAX_BYTES = int(os.environ.get("SAR_MEMORY_CACHE_MB", "1024")) * 1024 * 1024
+
+
+def nbytes(value: object) -> int:
+    """Approximate resident size of a cached value (frames, and containers of them)."""
+    if isinstance(value, pd.DataFrame | pd.Series):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values())
+    if isinstance(value, list | tuple):
+        return sum(nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    resident_bytes: int
+    max_bytes: int
+
+
+class _Entry:
+    __slots__ = ("value", "size", "priority")
+
+    def __init__(self, value: object, size: int, priority: float) -> None:
+        self.value = value
+        self.size = size
+        self.priority = priority
+
+
+class FrameCache:
+    def __init__(self, max_bytes: int = MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+        self._clock = 0.0  # priority of the last evicted entry
+        self.resident_bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _priority(self, size: int) -> float:
+        return self._clock + self.max_bytes / max(size, 1)
+
+    def get(self, key: Hashable) -> tuple[bool, object]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            entry.priority = self._priority(entry.size)
+            return True, entry.value
+
+    def put(self, key: Hashable, value: object) -> None:
+        """Store value, evicting until the cache fits its budget. A value larger than
+        the whole budget is not stored.
+        """
+        size = nbytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.resident_bytes -= old.size
+            if size > self.max_bytes:
+                return
+            self._entries[key] = _Entry(value, size, self._priority(size))
+            self.resident_bytes += size
+            while self.resident_bytes > self.max_bytes:
+                # never the entry just stored: the caller is about to use it
+                victim = min(
+                    (k for k in self._entries if k != key),
+                    key=lambda k: self._entries[k].priority,
+                )
+                entry = self._entries.pop(victim)
+                self._clock = entry.priority
+                self.resident_bytes -= entry.size
+                self.evictions += 1
+
+    def clear(self, namespace: str | None = None) -> None:
+        """Drop every entry, or only those of one cached function."""
+        with self._lock:
+            for key in list(self._entries):
+                if namespace is None or (isinstance(key, tuple) and key[0] == namespace):
+                    self.resident_bytes -= self._entries.pop(key).size
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self.hits,
+                self.misses,
+                self.evictions,
+                len(self._entries),
+                self.resident_bytes,
+                self.max_bytes,
+            )
+
+
+CACHE = FrameCache()
+
+
+class cached(Generic[R]):
+    """Memoize a function in CACHE by its arguments (which must be hashable).
+    Exceptions are not cached; .clear() drops this function's entries.
+    """
+
+    def __init__(self, fn: Callable[..., R]) -> None:
+        self._fn = fn
+        self._name = f"{fn.__module__}.{fn.__qualname__}"
+        functools.update_wrapper(self, fn)
+
+    def __call__(self, *args: Hashable) -> R:
+        key = (self._name, args)
+        with stage(f"cache.{self._fn.__name__}") as record:
+            found, value = CACHE.get(key)
+            record["cache"] = "hit" if found else "miss"
+            if not found:
+                value = self._fn(*args)
+                CACHE.put(key, value)
+        return value  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        CACHE.clear(self._name)
@@ -0,0 +1,120 @@
+"""Per-stage timings: where a slow page spends its time.
+
+stage() wraps one step (sadf subprocess, parsing, frame building, a cache lookup, a
+chart) and records its wall time, the growth of the process's peak RSS, the rows it
+produced and whether a cache answered it. Records are kept in a bounded in-process
+buffer shown by the Diagnostics panel, and written as one JSON log line each to the
+"sar_viewer.stages" logger (to stderr when SAR_STAGE_LOG=1).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, TypeVar
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+R = TypeVar("R")
+
+log = logging.getLogger("sar_viewer.stages")
+if os.environ.get("SAR_STAGE_LOG") == "1" and not log.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+MAX_RECORDS = 500
+RECORDS: deque[dict[str, Any]] = deque(maxlen=MAX_RECORDS)
+
+# fields added to every record made in this context (e.g. the section being rendered)
+_context: contextvars.ContextVar[dict[str, Any]] = contextvars.ContextVar("stage_context")
+
+
+def peak_rss() -> int:
+    """Peak resident set size of the process so far, in bytes (0 when unknown)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def context(**fields: Any) -> Iterator[None]:
+    """Add fields to every stage recorded inside the block."""
+    token = _context.set(_context.get({}) | fields)
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+@contextmanager
+def stage(name: str, **fields: Any) -> Iterator[dict[str, Any]]:
+    """Record the block as one stage. The record is yielded so the block can add
+    fields: rows, cache ("hit"/"miss") or anything else worth logging.
+    """
+    record: dict[str, Any] = {"stage": name, **_context.get({}), **fields}
+    rss = peak_rss()
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 6)
+        record["peak_rss_delta"] = peak_rss() - rss
+        record["thread"] = threading.current_thread().name
+        record["at"] = time.time()
+        RECORDS.append(record)
+        if log.isEnabledFor(logging.INFO):
+            log.info(json.dumps(record, default=str))
+
+
+def timed(name: str) -> Callable[[Callable[..., R]], Callable[..., R]]:
+    """Decorator form of stage(); rows are taken from a DataFrame (or dict of them) result."""
+
+    def wrap(fn: Callable[..., R]) -> Callable[..., R]:
+        @functools.wraps(fn)
+        def inner(*args: Any, **kwargs: Any) -> R:
+            with stage(name) as record:
+                result = fn(*args, **kwargs)
+                record["rows"] = _rows(result)
+                return result
+
+        return inner
+
+    return wrap
+
+
+def _rows(value: object) -> int:
+    if hasattr(value, "shape") and hasattr(value, "columns"):
+        return int(value.shape[0])  # type: ignore[attr-defined]
+    if isinstance(value, dict):
+        return sum(_rows(v) for v in value.values())
+    if isinstance(value, tuple):
+        return sum(_rows(v) for v in value)
+    return 0
+
+
+def recent(limit: int = MAX_RECORDS) -> list[dict[str, Any]]:
+    """Latest records, newest first."""
+    return list(RECORDS)[-limit:][::-1]
+
+
+def clear() -> None:
+    RECORDS.clear()
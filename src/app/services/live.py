@@ -0,0 +1,118 @@
+"""Live tail: follow today's sa file while sadc keeps appending to it.
+
+A Tail holds the frames of one file and, on refresh(), converts only the records
+added since: the native reader resumes at the byte offset it stopped at, sadf starts
+(-s) after the last timestamp seen. New rows are appended to the held frames, so a
+refresh costs what was appended rather than the whole day. Tails live outside the
+frame and Parquet caches, whose entries are keyed by file identity and would miss
+on every growth.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from . import parquet_cache
+from .instrument import stage
+from .sadf import ACTIVITY_ARGS, NO_FILTERS, Activity, Filters, Format, Prefer, convert_since
+
+# tails kept at once (one per file and entity selection being watched)
+MAX_TAILS = 4
+
+
+def _append(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    if new.empty:
+        return old
+    if old.empty:
+        return new
+    # categoricals keep their dtype only when both sides share the categories
+    for name, dtype in old.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and name in new.columns:
+            values = new[name].astype(object)
+            extra = pd.Index(values.dropna().unique()).difference(dtype.categories)
+            if len(extra):
+                dtype = pd.CategoricalDtype([*dtype.categories, *extra])
+                old = old.astype({name: dtype})
+            new = new.astype({name: dtype})
+    return pd.concat([old, new], ignore_index=True)
+
+
+class Tail:
+    """Frames of one growing sa file, extended by refresh()."""
+
+    def __init__(self, path: str, prefer: Prefer, filters: Filters = NO_FILTERS) -> None:
+        self.path = path
+        self.prefer = prefer
+        self.filters = filters
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.fmt: Format | None = None
+        self.frames: dict[Activity, pd.DataFrame] = {name: pd.DataFrame() for name in ACTIVITY_ARGS}
+        self._identity: tuple[int, int, int] | None = None
+        self._offset: int | None = None
+
+    def _last(self, activity: Activity) -> pd.Timestamp | None:
+        df = self.frames[activity]
+        if df.empty or "timestamp" not in df.columns:
+            return None
+        return df["timestamp"].iloc[-1]
+
+    def snapshot(self) -> tuple[Format | None, dict[Activity, pd.DataFrame]]:
+        """Format and frames as of the last refresh; later refreshes leave them as is."""
+        with self._lock:
+            return self.fmt, self.frames
+
+    def refresh(self) -> int:
+        """Convert the records added since the last refresh and append them; returns
+        the number of new rows. A file replaced or truncated is read again from the start.
+        """
+        with self._lock:
+            identity = parquet_cache.file_identity(self.path)
+            if identity is None or identity == self._identity:
+                return 0
+            old = self._identity
+            if old is not None and (identity[2] != old[2] or identity[0] < old[0]):
+                self._reset()
+            lasts = {name: self._last(name) for name in ACTIVITY_ARGS}
+            known = [t for t in lasts.values() if t is not None]
+            with stage("live.refresh", path=self.path) as record:
+                fmt, new, offset = convert_since(
+                    self.path, self.prefer, self.filters, min(known, default=None), self._offset
+                )
+                added = 0
+                frames = dict(self.frames)
+                for name, df in new.items():
+                    last = lasts[name]
+                    if last is not None and "timestamp" in df.columns:
+                        df = df[df["timestamp"] > last]
+                    added += len(df)
+                    frames[name] = _append(frames[name], df)
+                record["rows"] = added
+            # replaced, not mutated: snapshots handed out earlier stay consistent
+            self.frames = frames
+            self.fmt = fmt
+            self._offset = offset
+            self._identity = identity
+            return added
+
+
+_tails: OrderedDict[tuple[str, Prefer, Filters], Tail] = OrderedDict()
+_tails_lock = threading.Lock()
+
+
+def tail(path: str, prefer: Prefer, filters: Filters = NO_FILTERS) -> Tail:
+    """The Tail of a file and entity selection, kept across reruns and sessions."""
+    key = (path, prefer, filters)
+    with _tails_lock:
+        found = _tails.get(key)
+        if found is None:
+            found = _tails[key] = Tail(path, prefer, filters)
+        _tails.move_to_end(key)
+        while len(_tails) > MAX_TAILS:
+            _tails.popitem(last=False)
+        return found
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import contextvars
+import os
+import re
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Literal, NamedTuple
+
+import pandas as pd
+
+from . import frame_cache, live, parquet_cache
+from .csv_bundle import CSV_FILES, read_csv_day
+from .instrument import stage
+from .pool import parallel_map, run_pooled
+from .sadf import (
+    CONVERSIONS,
+    NO_FILTERS,
+    WAIT_TIMEOUT,
+    Activity,
+    Filters,
+    Flight,
+    Prefer,
+    SingleFlight,
+    Window,
+    conversion_key,
+    convert_cached,
+    current_flight,
+    file_span,
+    list_entities,
+    load_sar_frames,
+    wait,
+    window_frames,
+)
+
+Source = Literal["sar", "csv"]
+
+
+class Selection(NamedTuple):
+    """What the tabs chart: sar files or CSV date directories, one per day, in date order.
+    days holds the date of each path; window is an optional (start, end) across them.
+    live follows a single, still growing sar file (see services.live).
+    """
+
+    source: Source
+    prefer: Prefer
+    paths: tuple[str, ...]
+    days: tuple[str, ...]
+    filters: Filters = NO_FILTERS
+    window: Window | None = None
+    live: bool = False
+
+
+_DAY = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# (path, window clipped to that path's day or None for the whole day)
+Part = tuple[str, Window | None]
+
+
+def day_parts(sel: Selection) -> tuple[Part, ...]:
+    """Paths the window overlaps, each with the part of the window it may hold: a sar
+    file's span comes from its header (see file_span), a CSV bundle's from its date.
+    Paths with neither are read whole and cut afterwards.
+    """
+    if sel.window is None:
+        return tuple((p, None) for p in sel.paths)
+    start, end = sel.window
+    parts: list[Part] = []
+    for path, day in zip(sel.paths, sel.days, strict=True):
+        span = file_span(path) if sel.source == "sar" else None
+        if span is None and _DAY.match(day):
+            span = (f"{day} 00:00:00", f"{day} 23:59:59")
+        if span is None:
+            parts.append((path, None))
+            continue
+        lo, hi = span
+        if end < lo or start > hi:
+            continue
+        clipped = (max(start, lo), min(end, hi))
+        parts.append((path, None if clipped == (lo, hi) else clipped))
+    return tuple(parts)
+
+
+def concat_days(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Join per-day frames into one frame sorted by timestamp (stable within a sample)."""
+    frames = [df for df in frames if not df.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    # concat turns categoricals with different categories into object; unify them first
+    names = {
+        name
+        for df in frames
+        for name, dtype in df.dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype)
+    }
+    for name in names:
+        cols = [df[name] for df in frames if name in df.columns]
+        values = [c.cat.categories if isinstance(c.dtype, pd.CategoricalDtype) else c for c in cols]
+        dtype = pd.CategoricalDtype(pd.unique(pd.concat([pd.Series(v) for v in values]).dropna()))
+        frames = [df.astype({name: dtype}) if name in df.columns else df for df in frames]
+    df = pd.concat(frames, ignore_index=True)
+    if "timestamp" in df.columns:
+        df = df.sort_values("timestamp", kind="stable", ignore_index=True)
+    return df
+
+
+@frame_cache.cached
+def _load_csv_range(
+    dirs: tuple[str, ...],
+    activity: Activity,
+    window: Window | None,
+    identities: tuple[object, ...],
+) -> pd.DataFrame:
+    days = parallel_map(partial(read_csv_day, activity=activity), dirs)
+    found = [df for df in days if df is not None]
+    if not found:
+        raise FileNotFoundError(f"{CSV_FILES[activity]} not found under selected date directory")
+    return window_frames({activity: concat_days(found)}, window)[activity]
+
+
+def load_csv_range(
+    dirs: tuple[str, ...], activity: Activity, window: Window | None = None
+) -> pd.DataFrame:
+    """One activity over several CSV bundles, cut to the window. CSV has no
+    pushdown, so each file (or its Parquet sidecar, see csv_bundle) is read whole;
+    the result is cached per window.
+    """
+    identities = tuple(
+        parquet_cache.file_identity(os.path.join(d, CSV_FILES[activity])) for d in dirs
+    )
+    return _load_csv_range(dirs, activity, window, identities)
+
+
+def _convert_part(
+    part: Part, prefer: Prefer, filters: Filters
+) -> tuple[str, dict[Activity, pd.DataFrame]]:
+    return convert_cached(part[0], prefer, filters, part[1])
+
+
+def _pooled_part(
+    part: Part, prefer: Prefer, filters: Filters
+) -> tuple[str, dict[Activity, pd.DataFrame]]:
+    flight = current_flight()
+    cancel = flight.cancelled if flight is not None else None
+    return run_pooled(_convert_part, part, prefer, filters, cancel=cancel)
+
+
+def _shared_part(part: Part, prefer: Prefer, filters: Filters) -> Flight:
+    # converted on the pool, but as one of CONVERSIONS: a day another session is
+    # converting (alone or in its own range) is waited for, not converted again
+    key = conversion_key(part[0], prefer, filters, part[1])
+    return CONVERSIONS.submit(key, _pooled_part, part, prefer, filters)
+
+
+@frame_cache.cached
+def _load_sar_range(
+    parts: tuple[Part, ...], prefer: Prefer, filters: Filters, identities: tuple[object, ...]
+) -> tuple[str, dict[Activity, pd.DataFrame]]:
+    days = [f.result() for f in [_shared_part(part, prefer, filters) for part in parts]]
+    fmts = list(dict.fromkeys(fmt for fmt, _ in days))
+    frames = {name: concat_days([day[name] for _, day in days]) for name in CSV_FILES}
+    return "/".join(fmts), frames
+
+
+def load_sar_range(
+    parts: tuple[Part, ...], prefer: Prefer = "auto", filters: Filters = NO_FILTERS
+) -> tuple[str, dict[Activity, pd.DataFrame]]:
+    """All activities for several sar files, one continuous time-sorted frame each.
+    Days are converted in parallel on the shared process pool; each day still goes
+    through the Parquet cache, so widening a range only converts the new days.
+    """
+    if not parts:
+        return "", {name: pd.DataFrame() for name in CSV_FILES}
+    if len(parts) == 1:
+        return load_sar_frames(parts[0][0], prefer, filters, parts[0][1])
+    identities = tuple(parquet_cache.file_identity(p) for p, _ in parts)
+    return _load_sar_range(parts, prefer, filters, identities)
+
+
+# loads running in the background, by what they load; a finished load lives in frame_cache.
+# A page starts a handful of loads that mostly wait on sadf, pyarrow or the process
+# pool; a thread each keeps them from queueing behind one another.
+_LOADS = SingleFlight("load")
+# progress callback of the waits in the current context (see waiting())
+_on_wait: contextvars.ContextVar[Callable[[float], None]] = contextvars.ContextVar("on_wait")
+
+
+def _range_flight(sel: Selection, activity: Activity) -> Flight:
+    """The load behind load_frame(sel, activity). All activities of a sar selection
+    come from one conversion, so they share a flight.
+    """
+    parts = day_parts(sel)
+    if sel.source == "csv":
+        dirs = tuple(p for p, _ in parts)
+        key = ("csv", dirs, activity, sel.window)
+        return _LOADS.submit(key, load_csv_range, dirs, activity, sel.window)
+    key = ("sar", parts, sel.prefer, sel.filters)
+    return _LOADS.submit(key, load_sar_range, parts, sel.prefer, sel.filters)
+
+
+def prefetch(sel: Selection) -> None:
+    """Start loading every activity of the selection in the background, so that a page
+    waits about as long as its slowest activity rather than the sum of them.
+    """
+    if sel.live or (sel.source == "csv" and not day_parts(sel)):
+        return
+    for activity in CSV_FILES:
+        _range_flight(sel, activity)
+
+
+def load_frame(sel: Selection, activity: Activity) -> tuple[pd.DataFrame, str]:
+    """Frame for one activity over the whole selection, with the format it was parsed as.
+    sar files are converted for the window only; CSV bundles are read whole and cut.
+    Waits for a load already started by prefetch() rather than starting another, for
+    at most WAIT_TIMEOUT seconds; a timeout leaves the load running for later reruns.
+    Frames are shared with the cache (see frame_cache): treat them as read-only.
+    A live selection gets the frames of its last refresh_live().
+    """
+    if sel.live:
+        fmt, frames = live_tail(sel).snapshot()
+        df = window_frames({activity: frames[activity]}, sel.window)[activity]
+        return df, fmt or ""
+    if sel.source == "csv":
+        if not day_parts(sel):
+            return pd.DataFrame(), "csv"
+        with stage("load.wait", activity=activity):
+            return _wait(_range_flight(sel, activity)), "csv"
+    with stage("load.wait", activity=activity):
+        fmt, frames = _wait(_range_flight(sel, activity))
+    df = frames[activity]
+    if sel.window is not None and any(w is None for _, w in day_parts(sel)):
+        # files without a known span, or wholly inside the window, were converted whole
+        df = window_frames({activity: df}, sel.window)[activity]
+    return df, fmt
+
+
+def _wait(flight: Flight) -> Any:
+    return wait(flight, WAIT_TIMEOUT, on_wait=_on_wait.get(None))
+
+
+@contextmanager
+def waiting(on_wait: Callable[[float], None]) -> Iterator[None]:
+    """Call on_wait(seconds waited) while load_frame waits inside the block. The UI
+    shows progress with it; an exception it raises (a Streamlit rerun request, say)
+    stops the wait and abandons the load. Unless someone else waits on it, or a rerun
+    asks for it again shortly, the load is then cancelled and its sadf killed.
+    """
+    token = _on_wait.set(on_wait)
+    try:
+        yield
+    finally:
+        _on_wait.reset(token)
+
+
+def live_tail(sel: Selection) -> live.Tail:
+    if sel.source != "sar" or len(sel.paths) != 1:
+        raise ValueError("live mode follows a single sar file")
+    return live.tail(sel.paths[0], sel.prefer, sel.filters)
+
+
+def refresh_live(sel: Selection) -> int:
+    """Bring a live selection up to date with its file; returns the rows added."""
+    return live_tail(sel).refresh()
+
+
+def selection_entities(sel: Selection) -> dict[Activity, list[str]]:
+    """Entity names per activity across every file of a sar selection, in first-seen
+    order; empty for CSV bundles or when the conversion cannot filter by entity.
+    """
+    if sel.source == "csv":
+        return {}
+    merged: dict[Activity, dict[str, None]] = {}
+    for path in sel.paths:
+        for name, names in list_entities(path, sel.prefer).items():
+            merged.setdefault(name, {}).update(dict.fromkeys(names))
+    return {name: list(names) for name, names in merged.items()}
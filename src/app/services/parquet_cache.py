@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from functools import lru_cache
+
+import pandas as pd
+
+CACHE_DIR = os.environ.get("SAR_CACHE_DIR", os.path.join(".cache", "sar-viewer"))
+CACHE_MAX_BYTES = int(os.environ.get("SAR_CACHE_MAX_MB", "2048")) * 1024 * 1024
+
+_META = "meta.json"
+# age after which a .tmp- entry is taken for the leftover of an interrupted store
+TMP_GRACE_S = 600
+# bump when the parsers change the frames they produce (columns, dtypes)
+SCHEMA = 2
+
+
+@lru_cache(maxsize=1)
+def sadf_version() -> str:
+    try:
+        p = subprocess.run(["sadf", "-V"], capture_output=True, text=True)
+    except OSError:
+        return ""
+    out = (p.stdout or p.stderr).strip()
+    return out.splitlines()[0] if out else ""
+
+
+def file_identity(path: str) -> tuple[int, int, int] | None:
+    """(size, mtime_ns, inode) of a file; changes whenever the file is rewritten."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+
+def cache_key(path: str, sar_args: tuple[str, ...], prefer: str) -> str | None:
+    identity = file_identity(path)
+    if identity is None or not CACHE_DIR:
+        return None
+    parts = (SCHEMA, os.path.abspath(path), *identity, sar_args, prefer, sadf_version())
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+
+
+def load(key: str) -> tuple[str, dict[str, pd.DataFrame]] | None:
+    entry = os.path.join(CACHE_DIR, key)
+    try:
+        with open(os.path.join(entry, _META)) as f:
+            meta = json.load(f)
+        frames = {
+            name: pd.read_parquet(os.path.join(entry, f"{name}.parquet"))
+            for name in meta["activities"]
+        }
+        os.utime(entry)  # mark as recently used for pruning
+    except (OSError, ValueError, KeyError, ImportError):
+        return None
+    return meta["format"], frames
+
+
+def store(key: str, fmt: str, frames: dict[str, pd.DataFrame]) -> None:
+    """Write frames as one Parquet file per activity, then prune the cache to its budget.
+    Entries are written to a temp dir and renamed into place so readers never see a
+    partial entry.
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=CACHE_DIR)
+        try:
+            for name, df in frames.items():
+                df.to_parquet(os.path.join(tmp, f"{name}.parquet"), index=False)
+            with open(os.path.join(tmp, _META), "w") as f:
+                json.dump({"format": fmt, "activities": list(frames)}, f)
+            os.replace(tmp, os.path.join(CACHE_DIR, key))
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+    except (OSError, ValueError, ImportError):
+        return
+    prune(CACHE_MAX_BYTES)
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for entry in os.scandir(path):
+        if entry.is_file(follow_symlinks=False):
+            total += entry.stat().st_size
+    return total
+
+
+def prune(max_bytes: int) -> None:
+    """Drop least recently used entries until the cache fits in max_bytes. Temp dirs
+    left by a store that crashed or was killed are removed once TMP_GRACE_S old.
+    """
+    stale = time.time() - TMP_GRACE_S
+    try:
+        entries = []
+        for e in os.scandir(CACHE_DIR):
+            if not e.is_dir(follow_symlinks=False):
+                continue
+            if e.name.startswith(".tmp-"):
+                if e.stat().st_mtime < stale:
+                    shutil.rmtree(e.path, ignore_errors=True)
+            elif not e.name.startswith("."):
+                entries.append((e.stat().st_mtime, _dir_size(e.path), e.path))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import pandas as pd
+
+from .instrument import timed
+
+
+def series_name(metric: str, entity: str) -> str:
+    return f"{metric}[{entity}]"
+
+
+@timed("chart.pivot")
+def wide_frame(
+    df: pd.DataFrame, entity_col: str, metrics: Sequence[str], entities: Sequence[str]
+) -> pd.DataFrame:
+    """Pivot a long frame (timestamp, entity, metrics...) into one time-indexed column per
+    (metric, entity), named "metric[entity]", in one pass over the frame.
+    Columns follow metrics then entities; an entity without rows gives an all-NaN
+    column. Duplicate (timestamp, entity) rows, e.g. where two days overlap, keep the last.
+    """
+    metrics = [m for m in metrics if m in df.columns]
+    if not metrics or not entities or df.empty or entity_col not in df.columns:
+        return pd.DataFrame()
+    keys = df[entity_col]
+    # compare as strings; categoricals only rename their categories
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        keys = keys.cat.rename_categories(str)
+    else:
+        keys = keys.astype(str)
+    mask = keys.isin(entities).to_numpy()
+    rows = df.loc[mask, ["timestamp", *metrics]]
+    rows.insert(1, entity_col, keys[mask].astype(str).to_numpy())
+    rows = rows.drop_duplicates(["timestamp", entity_col], keep="last")
+    wide = rows.set_index(["timestamp", entity_col])[metrics].unstack(entity_col)
+    wide = wide.reindex(columns=pd.MultiIndex.from_product([metrics, list(entities)]))
+    wide.columns = [series_name(m, e) for m, e in wide.columns]
+    return wide.sort_index()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import contextvars
+import multiprocessing
+import os
+import tempfile
+import threading
+import uuid
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+MAX_WORKERS = int(os.environ.get("SAR_WORKERS", "0")) or os.cpu_count() or 1
+
+_pool: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process pool shared by every session, created on first use.
+    Workers are spawned rather than forked: the Streamlit server is multi-threaded.
+    """
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def parallel_map(fn: Callable[[T], R], items: Sequence[T]) -> list[R]:
+    """fn over items on the shared pool, in order; a single item runs in-process."""
+    if len(items) <= 1 or MAX_WORKERS <= 1:
+        return [fn(item) for item in items]
+    return list(get_pool().map(fn, items))
+
+
+# in a pool worker, the cancel event of the task being run (see task_cancelled())
+_task_cancel: contextvars.ContextVar[threading.Event] = contextvars.ContextVar("task_cancel")
+_POLL = 0.25
+
+
+def task_cancelled() -> threading.Event | None:
+    """In a task run_pooled() started with cancel: an event set once the submitter
+    gives up on it, for the task to stop (services.sadf kills its sadf on it).
+    """
+    return _task_cancel.get(None)
+
+
+def _watched(fn: Callable[..., R], args: tuple[object, ...], flag: str) -> R:
+    # runs in the worker; the submitter creates flag (a file) to cancel
+    cancel, done = threading.Event(), threading.Event()
+
+    def watch() -> None:
+        while not done.wait(_POLL):
+            if os.path.exists(flag):
+                cancel.set()
+                return
+
+    threading.Thread(target=watch, name="cancel-watch", daemon=True).start()
+    token = _task_cancel.set(cancel)
+    try:
+        return fn(*args)
+    finally:
+        done.set()
+        _task_cancel.reset(token)
+
+
+def run_pooled(fn: Callable[..., R], *args: object, cancel: threading.Event | None = None) -> R:
+    """fn(*args) on the shared pool, waiting for it; in-process without a pool. Once
+    cancel is set a task still queued is dropped (CancelledError); one already running
+    is told through a flag file, and sees it as task_cancelled().
+    """
+    if MAX_WORKERS <= 1:
+        return fn(*args)
+    if cancel is None:
+        return get_pool().submit(fn, *args).result()
+    flag = os.path.join(tempfile.gettempdir(), f"sar-viewer-cancel-{uuid.uuid4().hex}")
+    fut = get_pool().submit(_watched, fn, args, flag)
+    try:
+        flagged = False
+        while not wait([fut], _POLL).done:
+            if cancel.is_set() and not flagged:
+                if fut.cancel():
+                    break
+                open(flag, "a").close()
+                flagged = True
+        return fut.result()
+    finally:
+        try:
+            os.unlink(flag)
+        except OSError:
+            pass
@@ -1,37 +1,785 @@
 from __future__ import annotations
 
+import calendar
+import concurrent.futures
+import contextvars
 import os
+import re
+import shutil
+import struct
 import subprocess
-from typing import Literal
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from concurrent.futures import Future
+from itertools import islice
+from typing import IO, Any, Literal, NamedTuple
 
-import streamlit as st
+import pandas as pd
 
+from ..parsers.columnar import FrameBuilder, feed, iter_statistics
+from ..parsers.cpu import cpu_builder, parse_cpu_csv
+from ..parsers.disk import disk_builder, parse_disk_csv
+from ..parsers.filesystem import fs_builder, parse_fs_csv
+from ..parsers.memory import mem_builder, parse_mem_csv
+from ..parsers.network import net_builder, parse_net_csv
+from ..parsers.sa_file import read_sa_entities, read_sa_frames, read_sa_header, read_sa_tail
+from . import frame_cache, parquet_cache
+from .archive import BAD_ARCHIVE, compression, local_path, open_stream
+from .instrument import stage
+from .pool import task_cancelled
 
-def _run(cmd: list[str]) -> tuple[int, str, str]:
-    p = subprocess.run(cmd, capture_output=True, text=True)
-    return p.returncode, p.stdout, p.stderr
+Activity = Literal["cpu", "memory", "disk", "network", "filesystem"]
+# "native" decodes the binary file in-process (parsers.sa_file) instead of running sadf
+Prefer = Literal["auto", "12", "11", "native"]
+Format = Literal["json", "csv", "native"]
+# (start, end) as "YYYY-MM-DD HH:MM:SS" UTC, inclusive, both on the day of one file
+Window = tuple[str, str]
+
+# sar options for every activity the tabs chart; one sadf pass covers all of them
+ACTIVITY_ARGS: dict[Activity, tuple[str, ...]] = {
+    "cpu": ("-u", "-P", "ALL"),
+    "memory": ("-r",),
+    "disk": ("-d",),
+    "network": ("-n", "DEV"),
+    "filesystem": ("-F",),
+}
+
+# entity column of each per-entity activity, and the sar option that selects entities
+ENTITY_COLUMNS: dict[Activity, str] = {
+    "cpu": "cpu",
+    "disk": "dev",
+    "network": "iface",
+    "filesystem": "filesystem",
+}
+_ENTITY_OPTIONS: dict[Activity, str] = {"disk": "--dev", "network": "--iface", "filesystem": "--fs"}
+# --dev/--iface/--fs and "all" inside a -P list need sysstat 12.2+
+_FILTERS_SINCE = (12, 2)
+
+
+class Filters(NamedTuple):
+    """Entities to convert per activity. None converts every entity; an empty tuple
+    skips the activity altogether.
+    """
+
+    cpu: tuple[str, ...] | None = None
+    disk: tuple[str, ...] | None = None
+    network: tuple[str, ...] | None = None
+    filesystem: tuple[str, ...] | None = None
+
+    def only(self) -> dict[Activity, tuple[str, ...] | None]:
+        return {name: getattr(self, name) for name in ENTITY_COLUMNS}
+
+
+NO_FILTERS = Filters()
+
+
+def sar_args(filters: Filters = NO_FILTERS) -> tuple[str, ...]:
+    """sar options for every charted activity, narrowed to the selected entities."""
+    args: list[str] = []
+    only = filters.only()
+    for name, base in ACTIVITY_ARGS.items():
+        wanted = only.get(name)
+        if wanted is None:
+            args += base
+        elif not wanted:
+            continue
+        elif name == "cpu":
+            # plain -u reports the "all" aggregate only
+            args += ("-u",) if wanted == ("all",) else ("-u", "-P", ",".join(wanted))
+        else:
+            args += (*base, f"{_ENTITY_OPTIONS[name]}={','.join(wanted)}")
+    return tuple(args)
+
+
+def time_args(window: Window | None) -> tuple[str, ...]:
+    """sadf -s/-e options for a window; sadf matches them against UTC times of day, so
+    a window across midnight gets none (the caller cuts the frames, see window_frames).
+    """
+    if window is None or window[0][:10] != window[1][:10]:
+        return ()
+    return ("-s", window[0][-8:], "-e", window[1][-8:])
+
+
+def _window_key(window: Window | None) -> tuple[str, ...]:
+    # what a windowed conversion is cached under: the whole window, dates included
+    return () if window is None else ("--window", *window)
+
+
+def _epoch(ts: str) -> int:
+    return calendar.timegm(pd.Timestamp(ts).timetuple())
+
+
+def window_frames(
+    frames: dict[Activity, pd.DataFrame], window: Window | None
+) -> dict[Activity, pd.DataFrame]:
+    """Rows of each frame inside the window (inclusive); frames without timestamps as is."""
+    if window is None:
+        return frames
+    lo, hi = pd.Timestamp(window[0]), pd.Timestamp(window[1])
+    out: dict[Activity, pd.DataFrame] = {}
+    for name, df in frames.items():
+        if "timestamp" in df.columns:
+            df = df[df["timestamp"].between(lo, hi)].reset_index(drop=True)
+        out[name] = df
+    return out
+
+
+def _native(prefer: Prefer) -> bool:
+    return prefer == "native" or (prefer == "auto" and shutil.which("sadf") is None)
+
+
+def supports_filters(prefer: Prefer) -> bool:
+    """Whether entity filters can be pushed into the conversion for this mode."""
+    if _native(prefer):
+        return True
+    m = re.search(r"(\d+)\.(\d+)", parquet_cache.sadf_version())
+    return bool(m) and (int(m.group(1)), int(m.group(2))) >= _FILTERS_SINCE
+
+
+_JSON_BUILDERS: dict[Activity, Callable[[], FrameBuilder]] = {
+    "cpu": cpu_builder,
+    "memory": mem_builder,
+    "disk": disk_builder,
+    "network": net_builder,
+    "filesystem": fs_builder,
+}
+
+_CSV_PARSERS: dict[Activity, Callable[[str], pd.DataFrame]] = {
+    "cpu": parse_cpu_csv,
+    "memory": parse_mem_csv,
+    "disk": parse_disk_csv,
+    "network": parse_net_csv,
+    "filesystem": parse_fs_csv,
+}
+
+
+# conversions (sadf processes, native decodes) running at once across every session
+SADF_JOBS = int(os.environ.get("SAR_SADF_JOBS", "0")) or os.cpu_count() or 1
+# how long a page waits for its data before giving up (0: no limit)
+WAIT_TIMEOUT = float(os.environ.get("SAR_WAIT_TIMEOUT", "600")) or None
+# how long one sadf process may run before it is killed (0: no limit)
+SADF_TIMEOUT = float(os.environ.get("SAR_SADF_TIMEOUT", "900")) or None
+_POLL = 0.25
+# an abandoned run is cancelled only if no one waits on it again within this many
+# seconds: a rerun for the same selection picks it up instead of starting over
+_GRACE = 2.0
+
+
+class Cancelled(Exception):
+    """A shared run was given up: by its caller, or by everyone waiting on it."""
+
+
+# the flight whose thread is running; waits and sadf processes inside it follow it
+_current: contextvars.ContextVar[Flight] = contextvars.ContextVar("flight")
+
+
+class Flight:
+    """One shared run: its Future, how many callers wait on it, and a cancel event
+    that also kills the sadf processes it started (see SadfProcess).
+    """
+
+    def __init__(self) -> None:
+        self.future: Future = Future()
+        self.cancelled = threading.Event()
+        self.waiters = 0
+        self._procs: set[SadfProcess] = set()
+        self._lock = threading.Lock()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self) -> Any:
+        return wait(self)
+
+    def join(self) -> None:
+        with self._lock:
+            self.waiters += 1
+
+    def leave(self, abandon: bool) -> None:
+        """A waiter is gone; when it was the last one and abandoned the run (rather
+        than just timing out), the run is cancelled unless someone waits again soon.
+        """
+        with self._lock:
+            self.waiters -= 1
+            last = self.waiters == 0
+        if abandon and last and not self.future.done():
+            timer = threading.Timer(_GRACE, self._cancel_unwatched)
+            timer.daemon = True
+            timer.start()
+
+    def _cancel_unwatched(self) -> None:
+        with self._lock:
+            unwatched = self.waiters == 0
+        if unwatched and not self.future.done():
+            self.cancel()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+        with self._lock:
+            procs = list(self._procs)
+        for proc in procs:
+            proc.kill("cancelled")
+
+    def attach(self, proc: SadfProcess) -> None:
+        with self._lock:
+            self._procs.add(proc)
+        if self.cancelled.is_set():
+            proc.kill("cancelled")
+
+    def detach(self, proc: SadfProcess) -> None:
+        with self._lock:
+            self._procs.discard(proc)
+
+
+def current_flight() -> Flight | None:
+    """The flight whose run is on this thread, if any."""
+    return _current.get(None)
+
+
+class SingleFlight:
+    """Runs fn(*args) once for every concurrent caller of the same key, on a thread of
+    its own, and hands each of them the same Flight. Once done the key is forgotten:
+    the result lives in the caches, and a failure is retried by the next caller.
+    With slots, at most that many runs go at once; the others queue on their thread.
+    A run every waiter abandoned is cancelled (see wait), queued or not.
+    """
+
+    def __init__(self, name: str, slots: int | None = None) -> None:
+        self.name = name
+        self._flights: dict[Hashable, Flight] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(slots) if slots else None
+        self.joined = 0  # callers that found their key already in flight
+        self.cancelled = 0  # runs given up by all their waiters
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Flight:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and not flight.cancelled.is_set():
+                self.joined += 1
+                return flight
+            flight = self._flights[key] = Flight()
+
+        def forget(_: Future) -> None:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if flight.cancelled.is_set():
+                    self.cancelled += 1
+
+        flight.future.add_done_callback(forget)
+        threading.Thread(
+            target=self._run, args=(flight, fn, args), name=self.name, daemon=True
+        ).start()
+        return flight
+
+    def _run(self, flight: Flight, fn: Callable[..., Any], args: tuple[Any, ...]) -> None:
+        fut = flight.future
+        if not fut.set_running_or_notify_cancel():
+            return
+        _current.set(flight)  # a new thread starts with an empty context
+        try:
+            if self._slots is not None:
+                while not self._slots.acquire(timeout=_POLL):
+                    if flight.cancelled.is_set():
+                        raise Cancelled("given up before it started")
+            try:
+                if flight.cancelled.is_set():
+                    raise Cancelled("given up before it started")
+                fut.set_result(fn(*args))
+            finally:
+                if self._slots is not None:
+                    self._slots.release()
+        except BaseException as e:
+            fut.set_exception(e)
+
+    def run(
+        self,
+        key: Hashable,
+        fn: Callable[..., Any],
+        *args: Any,
+        timeout: float | None = None,
+        cancel: threading.Event | None = None,
+    ) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+        if flight is not None and flight is _current.get(None):
+            # called from inside the run of that very key (a pooled day run in-process
+            # when there is no pool): waiting on it would wait on itself
+            return fn(*args)
+        return wait(self.submit(key, fn, *args), timeout, cancel)
+
+
+def wait(
+    flight: Flight,
+    timeout: float | None = None,
+    cancel: threading.Event | None = None,
+    on_wait: Callable[[float], None] | None = None,
+) -> Any:
+    """Result of a shared run. Raises TimeoutError after timeout seconds, and Cancelled
+    once cancel is set; inside another flight, cancel defaults to that flight's (in a
+    pool task, to the task's), so giving up on an outer run gives up on what it waits
+    for. A timeout leaves the run going; a caller that cancels or is interrupted (an
+    exception from on_wait, which is called between polls, every _POLL seconds)
+    abandons it, and a run abandoned by all its waiters is cancelled.
+    """
+    if cancel is None:
+        outer = _current.get(None)
+        cancel = outer.cancelled if outer is not None else task_cancelled()
+    start = time.monotonic()
+    flight.join()
+    abandon = True
+    try:
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise Cancelled("stopped waiting for the conversion")
+            step = _POLL
+            if timeout is not None:
+                step = min(step, timeout - (time.monotonic() - start))
+                if step <= 0:
+                    abandon = False
+                    raise TimeoutError(f"no result after {timeout:g} s; still converting")
+            done, _ = concurrent.futures.wait([flight.future], step)
+            if done:
+                abandon = False
+                return flight.future.result()
+            if on_wait is not None:
+                on_wait(time.monotonic() - start)
+    finally:
+        flight.leave(abandon)
+
+
+class SadfProcess:
+    """A sadf child process read as it writes. It is killed after timeout seconds,
+    when the flight or pool task running it is cancelled, or when the block exits early
+    (a reader that stops consuming), so an abandoned conversion stops using CPU.
+
+        with SadfProcess(["sadf", "-j", path, "--", "-u"]) as proc:
+            for line in proc.stdout: ...
+            proc.check()
+    """
+
+    def __init__(
+        self, cmd: list[str], env: dict[str, str] | None = None, timeout: float | None = None
+    ) -> None:
+        self.cmd = cmd
+        self.env = env
+        self.timeout = SADF_TIMEOUT if timeout is None else timeout or None
+        self.killed: str | None = None  # why it was killed, if it was
+        self._flight = _current.get(None)
+        self._timer: threading.Timer | None = None
+
+    def __enter__(self) -> SadfProcess:
+        self.proc = subprocess.Popen(
+            self.cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=self.env,
+        )
+        assert self.proc.stdout is not None and self.proc.stderr is not None
+        self.stdout: IO[str] = self.proc.stdout
+        if self.timeout:
+            self._timer = threading.Timer(self.timeout, self.kill, ("timed out",))
+            self._timer.daemon = True
+            self._timer.start()
+        if self._flight is not None:
+            self._flight.attach(self)
+        else:
+            cancel = task_cancelled()
+            if cancel is not None:
+                threading.Thread(target=self._watch, args=(cancel,), daemon=True).start()
+        return self
+
+    def _watch(self, cancel: threading.Event) -> None:
+        # a pool task outside any flight: the submitter's cancel reaches it this way
+        while self.proc.poll() is None:
+            if cancel.wait(_POLL):
+                self.kill("cancelled")
+                return
+
+    def kill(self, reason: str) -> None:
+        if self.proc.poll() is None:
+            self.killed = self.killed or reason
+            self.proc.kill()
+
+    def check(self) -> None:
+        """Wait for the exit; raise if it was killed or failed."""
+        self.proc.wait()
+        if self.killed == "timed out":
+            raise TimeoutError(f"{self.cmd[0]} ran longer than {self.timeout:g} s")
+        if self.killed:
+            raise Cancelled(f"{self.cmd[0]} {self.killed}")
+        if self.proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(self.cmd[:2])} failed: {self.proc.stderr.read()}")
+
+    def __exit__(self, *exc: object) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._flight is not None:
+            self._flight.detach(self)
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.wait()
+        self.stdout.close()
+        self.proc.stderr.close()  # type: ignore[union-attr]
+
+
+# one conversion per file, options and window at a time, whichever session asks
+CONVERSIONS = SingleFlight("convert", SADF_JOBS)
+
+
+def _c_locale() -> dict[str, str]:
+    return {**os.environ, "LC_ALL": "C"}
+
+
+def _run(cmd: list[str], env: dict[str, str] | None = None) -> str:
+    """stdout of a whole sadf run; raises as SadfProcess.check() does."""
+    with SadfProcess(cmd, env) as proc:
+        out = proc.stdout.read()
+        proc.check()
+    return out
+
+
+def run_sadf(
+    path: str,
+    sar_args: tuple[str, ...],
+    prefer: Literal["auto", "12", "11"] = "auto",
+    window: Window | None = None,
+) -> tuple[Literal["json", "csv"], str]:
+    """Uncached sadf conversion; see convert_with_sadf."""
+    with stage("sadf.run", path=path) as record:
+        fmt, out = _run_sadf(path, sar_args, prefer, window)
+        record.update(format=fmt, bytes=len(out))
+    return fmt, out
+
+
+def _run_sadf(
+    path: str,
+    sar_args: tuple[str, ...],
+    prefer: Literal["auto", "12", "11"],
+    window: Window | None,
+) -> tuple[Literal["json", "csv"], str]:
+    if prefer in ("auto", "12"):
+        try:
+            out = _run(["sadf", "-j", *time_args(window), path, "--", *sar_args])
+        except RuntimeError:
+            if prefer == "12":
+                raise
+        else:
+            if out.strip():
+                return "json", out
+            if prefer == "12":
+                raise RuntimeError("sadf -j produced no output")
+    # Fallback to CSV-like; timeouts and cancellation are not retried
+    return "csv", _run(["sadf", "-d", *time_args(window), path, "--", *sar_args], _c_locale())
+
+
+def stream_sadf_json(
+    path: str, sar_args: tuple[str, ...], window: Window | None = None
+) -> Iterator[dict]:
+    """Run `sadf -j` and yield statistics records as they are read from its stdout pipe.
+    Closing the generator early kills sadf.
+    """
+    with SadfProcess(["sadf", "-j", *time_args(window), path, "--", *sar_args]) as proc:
+        yield from iter_statistics(proc.stdout)
+        proc.check()
+
+
+def stream_sadf_csv(
+    path: str, sar_args: tuple[str, ...], window: Window | None = None
+) -> Iterator[str]:
+    """Run `sadf -d` and yield its lines as they are read from its stdout pipe."""
+    cmd = ["sadf", "-d", *time_args(window), path, "--", *sar_args]
+    with SadfProcess(cmd, _c_locale()) as proc:
+        yield from proc.stdout
+        proc.check()
 
 
-@st.cache_data(show_spinner=False)
 def convert_with_sadf(
-    path: str, sar_args: tuple[str, ...], prefer: Literal["auto", "12", "11"] = "auto"
+    path: str,
+    sar_args: tuple[str, ...],
+    prefer: Literal["auto", "12", "11"] = "auto",
+    window: Window | None = None,
 ) -> tuple[Literal["json", "csv"], str]:
     """Convert a sar binary file to text using sadf.
     Tries JSON first (v12+) then falls back to CSV-like (v11 compat) unless prefer is fixed.
-    Returns (format, text).
+    window limits the output with -s/-e. Returns (format, text). Not cached: the text
+    is parsed into frames, and those are what load_sar_frames caches.
     """
+    return run_sadf(path, sar_args, prefer, window)
+
+
+def _csv_activity(columns: list[str]) -> Activity | None:
+    if "CPU" in columns:
+        return "cpu"
+    if "kbmemfree" in columns:
+        return "memory"
+    if "DEV" in columns:
+        return "disk"
+    if "IFACE" in columns and "rxpck/s" in columns:
+        return "network"
+    if "FILESYSTEM" in columns:
+        return "filesystem"
+    return None
+
+
+def split_sadf_csv(text: str | Iterable[str]) -> dict[Activity, str]:
+    """Split multi-activity `sadf -d` output (text, or its lines as they are read)
+    into one CSV text per activity. Each activity block starts with a
+    `# hostname;interval;timestamp;...` header; the leading `# ` is dropped so the
+    per-activity parsers see a plain header row.
+    """
+    sections: dict[Activity, list[str]] = {}
+    current: list[str] | None = None
+    lines = text.splitlines() if isinstance(text, str) else (line.rstrip("\n") for line in text)
+    for line in lines:
+        if line.startswith("#"):
+            header = line.lstrip("#").strip()
+            activity = _csv_activity(header.split(";"))
+            if activity is None:
+                current = None
+            elif activity in sections:
+                current = sections[activity]
+            else:
+                current = sections[activity] = [header]
+        elif current is not None and line.strip():
+            current.append(line)
+    return {name: "\n".join(lines) for name, lines in sections.items()}
+
+
+def _convert_frames(
+    path: str,
+    sar_args: tuple[str, ...],
+    prefer: Prefer,
+    filters: Filters = NO_FILTERS,
+    window: Window | None = None,
+) -> tuple[Format, dict[Activity, pd.DataFrame]]:
+    path = local_path(path)  # archives are inflated first (cached, see archive)
+    if _native(prefer):
+        epochs = (_epoch(window[0]), _epoch(window[1])) if window else None
+        frames = read_sa_frames(path, filters.only(), epochs)
+        return "native", {name: frames[name] for name in ACTIVITY_ARGS}
     if prefer in ("auto", "12"):
-        rc, out, err = _run(["sadf", "-j", path, "--", *sar_args])
-        if rc == 0 and out.strip():
-            return "json", out
-        if prefer == "12":
-            raise RuntimeError(f"sadf -j failed: {err}")
-    # Fallback to CSV-like
-    env = os.environ.copy()
-    env.update({"LC_ALL": "C"})
-    p = subprocess.run(
-        ["sadf", "-d", path, "--", *sar_args], capture_output=True, text=True, env=env
+        builders = {name: make() for name, make in _JSON_BUILDERS.items()}
+        try:
+            # sadf and JSON decoding interleave on the pipe: timed together
+            with stage("sadf.json.stream", path=path):
+                feed(builders.values(), stream_sadf_json(path, sar_args, window))
+        except (RuntimeError, ValueError):
+            if prefer == "12":
+                raise
+        else:
+            with stage("frames.build", path=path) as record:
+                frames = {name: builder.frame() for name, builder in builders.items()}
+                record["rows"] = sum(len(df) for df in frames.values())
+            if any(not df.empty for df in frames.values()):
+                return "json", frames
+            if prefer == "12":
+                raise RuntimeError("sadf -j produced no statistics")
+    with stage("sadf.csv.stream", path=path):
+        sections = split_sadf_csv(stream_sadf_csv(path, sar_args, window))
+    frames = {
+        name: parse_csv(sections[name]) if name in sections else pd.DataFrame()
+        for name, parse_csv in _CSV_PARSERS.items()
+    }
+    return "csv", frames
+
+
+def convert_file(path: str, prefer: Prefer = "auto") -> tuple[Format, dict[Activity, pd.DataFrame]]:
+    """Every activity of a whole file, neither cached nor filtered; for batch jobs that
+    store the frames themselves (see bulk_export).
+    """
+    return _convert_frames(path, sar_args(NO_FILTERS), prefer)
+
+
+def convert_since(
+    path: str,
+    prefer: Prefer,
+    filters: Filters = NO_FILTERS,
+    since: pd.Timestamp | None = None,
+    offset: int | None = None,
+) -> tuple[Format, dict[Activity, pd.DataFrame], int | None]:
+    """Records a growing file gained after an earlier conversion; not cached (see
+    services.live). The native reader resumes at offset, as returned by the previous
+    call, and returns the next one. sadf converts from the second after since (-s);
+    it still reads the file up to there, but only new records are printed and parsed.
+    """
+    if not supports_filters(prefer):
+        filters = NO_FILTERS
+    if _native(prefer):
+        frames, offset = read_sa_tail(path, filters.only(), offset)
+        return "native", {name: frames[name] for name in ACTIVITY_ARGS}, offset
+    window = None
+    if since is not None:
+        # past 23:59:59 this wraps to the whole day; the caller drops rows it has
+        start = since + pd.Timedelta(seconds=1)
+        window = (start.strftime("%Y-%m-%d %H:%M:%S"), since.strftime("%Y-%m-%d 23:59:59"))
+    fmt, frames = _convert_frames(path, sar_args(filters), prefer, filters, window)
+    return fmt, frames, None
+
+
+def convert_cached(
+    path: str, prefer: Prefer, filters: Filters = NO_FILTERS, window: Window | None = None
+) -> tuple[Format, dict[Activity, pd.DataFrame]]:
+    """Parquet cache lookup, else convert and store. No Streamlit state, so pool workers
+    (services.pool) can run it for a multi-day range. Filters the conversion cannot
+    apply are dropped; the tabs filter their frames again anyway. A window is cut from
+    the full-day entry when one is cached, else converted, cut (sadf -s/-e only match
+    times of day) and cached on its own.
+    """
+    if not supports_filters(prefer):
+        filters = NO_FILTERS
+    args = sar_args(filters)
+    if window is not None:
+        full_key = parquet_cache.cache_key(path, args, prefer)
+        full = parquet_cache.load(full_key) if full_key else None
+        if full is not None:
+            return full[0], window_frames(full[1], window)  # type: ignore[return-value,arg-type]
+    key = parquet_cache.cache_key(path, args + _window_key(window), prefer)
+    with stage("parquet.load", path=path) as record:
+        cached = parquet_cache.load(key) if key else None
+        record["cache"] = "miss" if cached is None else "hit"
+    if cached is not None:
+        return cached  # type: ignore[return-value]
+    # sessions missing the cache at once share one conversion
+    return CONVERSIONS.run(
+        conversion_key(path, prefer, filters, window),
+        _convert_and_store,
+        path,
+        args,
+        prefer,
+        filters,
+        window,
+        key,
     )
-    if p.returncode != 0:
-        raise RuntimeError(f"sadf -d failed: {p.stderr}")
-    return "csv", p.stdout
+
+
+def conversion_key(
+    path: str, prefer: Prefer, filters: Filters = NO_FILTERS, window: Window | None = None
+) -> Hashable:
+    """What identifies a conversion in CONVERSIONS: file identity, options and window."""
+    if not supports_filters(prefer):
+        filters = NO_FILTERS
+    args = sar_args(filters) + _window_key(window)
+    return ("convert", path, parquet_cache.file_identity(path), args, prefer)
+
+
+def _convert_and_store(
+    path: str,
+    args: tuple[str, ...],
+    prefer: Prefer,
+    filters: Filters,
+    window: Window | None,
+    key: str | None,
+) -> tuple[Format, dict[Activity, pd.DataFrame]]:
+    fmt, frames = _convert_frames(path, args, prefer, filters, window)
+    frames = window_frames(frames, window)
+    if key:
+        with stage("parquet.store", path=path):
+            parquet_cache.store(key, fmt, dict(frames))
+    return fmt, frames
+
+
+@frame_cache.cached
+def _load_sar_frames(
+    path: str,
+    prefer: Prefer,
+    filters: Filters,
+    window: Window | None,
+    identity: tuple[int, int, int] | None,
+) -> tuple[Format, dict[Activity, pd.DataFrame]]:
+    # identity is only part of the cache key: a file rewritten in place is re-read
+    return convert_cached(path, prefer, filters, window)
+
+
+def load_sar_frames(
+    path: str,
+    prefer: Prefer = "auto",
+    filters: Filters = NO_FILTERS,
+    window: Window | None = None,
+) -> tuple[Format, dict[Activity, pd.DataFrame]]:
+    """Convert all charted activities in one sadf pass and split the result per activity.
+    Every tab reads its frame from here, so a file is decoded once per page instead of
+    once per tab. JSON is streamed from the sadf pipe record by record into the column
+    builders; the CSV fallback is read as text. Missing activities come back empty.
+    Results are also kept on disk as Parquet (see parquet_cache), keyed by file
+    identity, sar options and sadf version, so restarts skip the decode. filters
+    narrow the conversion to the selected CPUs, devices, interfaces and filesystems;
+    window to a time range of the day (sadf -s/-e).
+    """
+    identity = parquet_cache.file_identity(path)
+    return _load_sar_frames(path, prefer, filters, window, identity)
+
+
+def load_activity(
+    path: str,
+    activity: Activity,
+    prefer: Prefer = "auto",
+    filters: Filters = NO_FILTERS,
+    window: Window | None = None,
+) -> tuple[pd.DataFrame, Format]:
+    fmt, frames = load_sar_frames(path, prefer, filters, window)
+    return frames[activity], fmt
+
+
+def _first_record_entities(path: str) -> dict[Activity, list[str]]:
+    builders = {name: _JSON_BUILDERS[name]() for name in ENTITY_COLUMNS}
+    stream = stream_sadf_json(path, sar_args())
+    try:
+        feed(builders.values(), islice(stream, 1))
+    finally:
+        stream.close()
+    out: dict[Activity, list[str]] = {}
+    for name, builder in builders.items():
+        df = builder.frame()
+        if ENTITY_COLUMNS[name] in df.columns:
+            out[name] = list(dict.fromkeys(df[ENTITY_COLUMNS[name]].astype(str)))
+    return out
+
+
+@frame_cache.cached
+def _list_entities(
+    path: str, prefer: Prefer, identity: tuple[int, int, int] | None
+) -> dict[Activity, list[str]]:
+    if not supports_filters(prefer):
+        return {}
+    try:
+        if compression(path):
+            # read from the decompressing stream: a listing never inflates an archive
+            return read_sa_entities(path, open_stream)  # type: ignore[return-value]
+        if _native(prefer):
+            return read_sa_entities(path)  # type: ignore[return-value]
+        return _first_record_entities(path)
+    except (OSError, RuntimeError, ValueError, struct.error, *BAD_ARCHIVE):
+        return {}
+
+
+@frame_cache.cached
+def _file_span(path: str, identity: tuple[int, int, int] | None) -> Window | None:
+    try:
+        start = read_sa_header(path, open_stream).ust_time
+    except (OSError, RuntimeError, ValueError, struct.error, *BAD_ARCHIVE):
+        return None
+    lo, hi = (pd.Timestamp(t, unit="s") for t in (start, start + 86400))
+    return lo.strftime("%Y-%m-%d %H:%M:%S"), hi.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def file_span(path: str) -> Window | None:
+    """UTC time range a sar file can hold: a day from the time its header says it was
+    started. A file named for one day may hold records of the day before or after in
+    UTC (sadc starts files at local midnight). None when the header cannot be read.
+    """
+    return _file_span(path, parquet_cache.file_identity(path))
+
+
+def list_entities(path: str, prefer: Prefer = "auto") -> dict[Activity, list[str]]:
+    """CPUs, devices, interfaces and filesystems of a file, from its first record only.
+    Empty when the conversion cannot filter by entity (sadf before 12.2).
+    """
+    return _list_entities(path, prefer, parquet_cache.file_identity(path))
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import pandas as pd
+import streamlit as st
+
+from src.app.services.downsample import Method, downsample_frame
+from src.app.services.instrument import stage
+
+MODES: dict[str, Method] = {"LTTB": "lttb", "Min/Max": "minmax", "Raw": "raw"}
+DEFAULT_POINTS = 2000
+
+
+def render_controls() -> None:
+    """Chart resolution controls shared by every tab (stored in session state)."""
+    cols = st.columns(2)
+    with cols[0]:
+        st.radio("Chart points", list(MODES), key="chart_mode", horizontal=True)
+    with cols[1]:
+        st.number_input(
+            "Points per series",
+            min_value=100,
+            max_value=100_000,
+            value=DEFAULT_POINTS,
+            step=500,
+            key="chart_points",
+            disabled=st.session_state.get("chart_mode") == "Raw",
+        )
+
+
+def line_chart(df: pd.DataFrame) -> None:
+    """st.line_chart with each series decimated to the selected point budget."""
+    method = MODES.get(st.session_state.get("chart_mode", "LTTB"), "lttb")
+    points = int(st.session_state.get("chart_points", DEFAULT_POINTS))
+    with stage("chart.downsample", method=method) as record:
+        small = downsample_frame(df, points, method)
+        record.update(rows=len(df), points=small.size)
+    with stage("chart.render", rows=len(small)):
+        st.line_chart(small)
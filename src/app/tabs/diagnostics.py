@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import pandas as pd
+import streamlit as st
+
+from src.app.services import instrument
+from src.app.services.frame_cache import CACHE
+from src.app.services.sadf import CONVERSIONS, SADF_JOBS
+
+_MB = 1024 * 1024
+_COLUMNS = ["stage", "section", "activity", "seconds", "rows", "cache", "peak_rss_delta"]
+
+
+@st.fragment
+def render_cache_panel() -> None:
+    """Frame cache counters (see services.frame_cache) and, on request, the latest stage
+    timings (see services.instrument), in a collapsed expander.
+    """
+    stats = CACHE.stats()
+    with st.expander("Diagnostics", expanded=False):
+        cols = st.columns(5)
+        cols[0].metric("Cache hits", stats.hits)
+        cols[1].metric("Misses", stats.misses)
+        cols[2].metric("Evictions", stats.evictions)
+        cols[3].metric("Entries", stats.entries)
+        cols[4].metric(
+            "Resident", f"{stats.resident_bytes / _MB:,.0f} / {stats.max_bytes / _MB:,.0f} MB"
+        )
+        st.caption(
+            f"Conversions in flight: {len(CONVERSIONS)} (at most {SADF_JOBS} at once); "
+            f"requests that joined one already running: {CONVERSIONS.joined}; "
+            f"abandoned and stopped: {CONVERSIONS.cancelled}"
+        )
+        if st.toggle("Stage timings", key="diag_stages"):
+            render_stages()
+
+
+def render_stages() -> None:
+    # clicking reruns just this fragment, picking up the stages recorded since
+    st.button("Refresh", key="diag_refresh")
+    records = instrument.recent()
+    if not records:
+        st.caption("No stages recorded yet")
+        return
+    df = pd.DataFrame(records).reindex(columns=[*_COLUMNS, "path", "thread"])
+    df["peak_rss_delta"] = df["peak_rss_delta"] / _MB
+    df = df.rename(columns={"peak_rss_delta": "peak_rss_delta_mb"})
+    by_stage = (
+        df.groupby("stage")["seconds"]
+        .agg(["count", "sum", "max"])
+        .sort_values("sum", ascending=False)
+        .rename(columns={"sum": "total_s", "max": "max_s"})
+    )
+    st.caption("Per stage, over the latest records (slowest total first)")
+    st.dataframe(by_stage)
+    st.caption("Latest records, newest first; SAR_STAGE_LOG=1 also logs them as JSON lines")
+    st.dataframe(df, hide_index=True)
@@ -3,6 +3,9 @@ from __future__ import annotations
 import pandas as pd
 import streamlit as st
 
+from src.app.services.pivot import wide_frame
+from src.app.tabs.chart import line_chart
+
 
 def render(fsdf: pd.DataFrame) -> None:
     filesystems = (
@@ -28,10 +31,6 @@ def render(fsdf: pd.DataFrame) -> None:
         default=[m for m in ["mb_free", "fsused_pct"] if m in cap_metrics_all],
     )
     if sel_fs and sel_cap:
-        series: dict[str, pd.Series] = {}
-        for m in sel_cap:
-            for fs in sel_fs:
-                key = f"{m}[{fs}]"
-                series[key] = fsdf.loc[fsdf["filesystem"] == fs].set_index("timestamp")[m]
-        if series:
-            st.line_chart(pd.concat(series, axis=1).sort_index())
+        chart_df = wide_frame(fsdf, "filesystem", sel_cap, sel_fs)
+        if not chart_df.empty:
+            line_chart(chart_df)
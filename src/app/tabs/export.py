@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from collections.abc import Hashable
+
+import pandas as pd
+import streamlit as st
+
+from src.app.services import parquet_cache
+from src.app.services.export import FORMATS, MIME, export_bytes
+from src.app.services.loader import Selection
+
+
+def export_key(sel: Selection, *extra: Hashable) -> tuple[Hashable, ...]:
+    """Key for an export of the selection (plus any tab filter); a rewritten file
+    gives a new key.
+    """
+    return sel, tuple(parquet_cache.file_identity(p) for p in sel.paths), extra
+
+
+def download(label: str, df: pd.DataFrame, name: str, key: Hashable) -> None:
+    """Format picker and a Prepare button; the file is serialized only once asked for,
+    then offered for download for as long as key and format stay the same.
+    """
+    state = f"export_{name}"
+    cols = st.columns([1, 1, 2], vertical_alignment="bottom")
+    fmt = cols[0].selectbox(f"{label} export", FORMATS, key=f"{state}_fmt")
+    wanted = (key, fmt)
+    if cols[1].button("Prepare download", key=f"{state}_prepare"):
+        st.session_state[state] = wanted
+    if st.session_state.get(state) != wanted:
+        return
+    cols[2].download_button(
+        f"Download {label} {fmt}",
+        export_bytes(key, df, fmt),
+        file_name=f"{name}.{fmt}",
+        mime=MIME[fmt],
+    )
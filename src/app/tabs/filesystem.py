@@ -1,66 +1,40 @@
 from __future__ import annotations
 
-import os
-from typing import Literal
-
 import pandas as pd
 import streamlit as st
 
-from src.app.parsers.filesystem import parse_fs_csv, parse_fs_json
-from src.app.services.sadf import convert_with_sadf
-
-
-def _csv_path(csv_date_dir: str | None) -> str | None:
-    if not csv_date_dir:
-        return None
-    p = os.path.join(csv_date_dir, "fs.csv")
-    return p if os.path.isfile(p) else None
+from src.app.services.loader import Selection, load_frame, selection_entities
+from src.app.services.pivot import wide_frame
+from src.app.tabs.chart import line_chart
+from src.app.tabs.export import download, export_key
+from src.app.tabs.filters import entity_multiselect
 
 
-def load_fs_df(
-    path: str | None,
-    prefer: Literal["auto", "12", "11"],
-    source: Literal["sar", "csv"],
-    csv_date_dir: str | None,
-) -> tuple[pd.DataFrame, str]:
-    if source == "csv":
-        cp = _csv_path(csv_date_dir)
-        if not cp:
-            raise FileNotFoundError("fs.csv not found under selected date directory")
-        df = pd.read_csv(cp)
-        if "timestamp" in df.columns:
-            df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-        return df, "csv"
-    fmt, text = convert_with_sadf(path or "", ("-F",), prefer)
-    if fmt == "json":
-        return parse_fs_json(text), "json"
-    else:
-        return parse_fs_csv(text), "csv"
+def load_fs_df(sel: Selection) -> tuple[pd.DataFrame, str]:
+    return load_frame(sel, "filesystem")
 
 
-def render(
-    path: str | None,
-    prefer: Literal["auto", "12", "11"],
-    source: Literal["sar", "csv"],
-    csv_date_dir: str | None,
-) -> None:
+def render(sel: Selection) -> None:
     try:
-        fsdf, fmt = load_fs_df(path, prefer, source, csv_date_dir)
+        fsdf, fmt = load_fs_df(sel)
         st.caption(f"Parsed as {fmt}")
     except Exception as e:  # pragma: no cover
         st.error(f"Filesystem read failed: {e}")
         return
-    if fsdf is None or fsdf.empty:
+    filesystems = selection_entities(sel).get("filesystem") or (
+        sorted(pd.Series(fsdf["filesystem"]).dropna().astype(str).unique().tolist())
+        if "filesystem" in fsdf.columns
+        else []
+    )
+    if not filesystems:
         st.info("No filesystem data")
         return
+    sel_fs = entity_multiselect("Filesystems", "filesystem", filesystems)
+    if fsdf.empty:
+        return
     choices = [c for c in ["fsused_pct", "mb_free", "mb_used"] if c in fsdf.columns]
     defaults = [m for m in ["fsused_pct", "mb_free"] if m in choices]
     metrics = st.multiselect("Metrics", choices, default=defaults)
-    if metrics:
-        st.line_chart(fsdf.set_index("timestamp")[metrics])
-    st.download_button(
-        "Download FS CSV",
-        fsdf.to_csv(index=False).encode("utf-8"),
-        file_name="fs.csv",
-        mime="text/csv",
-    )
+    if metrics and sel_fs:
+        line_chart(wide_frame(fsdf, "filesystem", metrics, sel_fs))
+    download("FS", fsdf, "fs", export_key(sel, "filesystem"))
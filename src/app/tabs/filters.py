@@ -0,0 +1,73 @@
+"""Entity selections (CPUs, devices, interfaces, filesystems) shared by the tab widgets
+and the conversion. app.py reads them from session state before any tab renders, so
+the single sadf pass only decodes what the tabs show.
+"""
+
+from __future__ import annotations
+
+import streamlit as st
+
+from src.app.services.sadf import NO_FILTERS, Activity, Filters
+
+KEYS: dict[Activity, str] = {
+    "cpu": "cpu_filter",
+    "disk": "disk_devs",
+    "network": "net_ifaces",
+    "filesystem": "fs_names",
+}
+DEFAULT_CPU_FILTER = "all"
+
+
+def parse_cpu_filter(text: str | None) -> list[str]:
+    return [c.strip() for c in (text or "").split(",") if c.strip()]
+
+
+def _default(options: list[str]) -> list[str]:
+    return options[:2]
+
+
+def _selected(activity: Activity, options: list[str]) -> list[str]:
+    value = st.session_state.get(KEYS[activity])
+    if value is None:
+        return _default(options)
+    return [v for v in value if v in options]
+
+
+def current_filters(entities: dict[Activity, list[str]]) -> Filters:
+    """Filters for the current widget state; no filtering when entities are unknown."""
+    if not entities:
+        return NO_FILTERS
+    cpu = None
+    cpus = parse_cpu_filter(st.session_state.get(KEYS["cpu"], DEFAULT_CPU_FILTER))
+    if cpus and "cpu" in entities:
+        cpu = tuple(c for c in cpus if c in entities["cpu"])
+    picked = {
+        name: tuple(_selected(name, entities[name])) if name in entities else None
+        for name in ("disk", "network", "filesystem")
+    }
+    return Filters(cpu=cpu, **picked)
+
+
+def keep_filter_state() -> None:
+    """Keep entity selections whose widgets are not rendered in this run (a hidden
+    section); Streamlit otherwise drops a widget's state once it is not drawn.
+    """
+    for key in KEYS.values():
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+
+def cpu_filter_input() -> list[str]:
+    label = "CPU filter (e.g., all, 0, 1, 2)"
+    if KEYS["cpu"] in st.session_state:
+        return parse_cpu_filter(st.text_input(label, key=KEYS["cpu"]))
+    return parse_cpu_filter(st.text_input(label, value=DEFAULT_CPU_FILTER, key=KEYS["cpu"]))
+
+
+def entity_multiselect(label: str, activity: Activity, options: list[str]) -> list[str]:
+    key = KEYS[activity]
+    if key in st.session_state:
+        # drop entities the current selection no longer has (e.g. another date range)
+        st.session_state[key] = [v for v in st.session_state[key] if v in options]
+        return st.multiselect(label, options, key=key)
+    return st.multiselect(label, options, default=_default(options), key=key)
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import streamlit as st
+
+# refresh intervals offered in live mode, in seconds
+INTERVALS = (5, 10, 30, 60)
+
+
+def live_input(days: tuple[str, ...], newest: str) -> int | None:
+    """Live toggle, offered while the one selected file is the newest one.
+    Returns the refresh interval in seconds while on, else None.
+    """
+    if len(days) != 1 or days[0] != newest:
+        return None
+    left, right = st.columns([1, 3])
+    if not left.toggle("Live", key="live", help="Follow the file as sadc appends to it"):
+        return None
+    return right.select_slider("Refresh every (s)", options=INTERVALS, value=10, key="live_every")
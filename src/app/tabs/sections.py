@@ -0,0 +1,57 @@
+"""Section switcher for the charts area. Unlike st.tabs, which runs every tab body on
+each rerun, only the visible section loads its frames and builds its charts, and the
+whole area is a fragment: a widget inside it reruns the section, not the page. In
+live mode the fragment also reruns on a timer, appending new records before it draws.
+"""
+
+from __future__ import annotations
+
+import time
+from importlib import import_module
+
+import streamlit as st
+
+from src.app.services import instrument
+from src.app.services.loader import Selection, refresh_live, selection_entities, waiting
+from src.app.tabs.filters import current_filters, keep_filter_state
+
+# section label -> module with render(sel)
+SECTIONS: dict[str, str] = {
+    "CPU": "src.app.tabs.cpu",
+    "Memory": "src.app.tabs.memory",
+    "Disk": "src.app.tabs.disk",
+    "Network": "src.app.tabs.network",
+    "Filesystem": "src.app.tabs.filesystem",
+}
+
+
+def render_sections(sel: Selection, every: int | None = None) -> None:
+    """Charts of sel; every (seconds) reruns them on a timer, for live selections."""
+    st.fragment(_render_sections, run_every=every)(sel)
+
+
+def _render_sections(sel: Selection) -> None:
+    # hidden sections' widgets are not rendered; keep their entity selections
+    keep_filter_state()
+    name = st.radio(
+        "Section", list(SECTIONS), key="section", horizontal=True, label_visibility="collapsed"
+    )
+    # a fragment rerun reuses the page's selection: pick up entity changes made since
+    sel = sel._replace(filters=current_filters(selection_entities(sel)))
+    if sel.live:
+        added = refresh_live(sel)
+        st.caption(f"Live: {added} new rows at {time.strftime('%H:%M:%S')}")
+    status = st.empty()
+
+    def on_wait(seconds: float) -> None:
+        # each update also lets Streamlit stop this run when the user changes the
+        # selection; a conversion no one waits on any more is then killed
+        status.caption(f"Waiting for the conversion… {seconds:.0f} s")
+
+    with (
+        waiting(on_wait),
+        instrument.context(section=name),
+        instrument.stage("section.render"),
+    ):
+        import_module(SECTIONS[name]).render(sel)
+    status.empty()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from src.app.services.sadf import Window
+
+_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def time_window_input(days: tuple[str, ...]) -> Window | None:
+    """Time window slider over the selected days (UTC, minute steps).
+    Returns None while it spans the whole range, so full-day conversions are reused.
+    """
+    if not days or not all(re.match(r"^\d{4}-\d{2}-\d{2}$", d) for d in days):
+        return None
+    lo = datetime.strptime(days[0], "%Y-%m-%d")
+    hi = datetime.strptime(days[-1], "%Y-%m-%d") + timedelta(days=1, minutes=-1)
+    start, end = st.slider(
+        "Time window (UTC)",
+        min_value=lo,
+        max_value=hi,
+        value=(lo, hi),
+        step=timedelta(minutes=1),
+        format="MM-DD HH:mm",
+        help="Narrow to convert and parse only this part of the files",
+    )
+    if (start, end) == (lo, hi):
+        return None
+    # the end minute is inclusive
+    return start.strftime(_FMT), (end + timedelta(seconds=59)).strftime(_FMT)
@@ -0,0 +1,70 @@
+import gzip
+import lzma
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from test_sa_file import _header, _record, _stats  # noqa: E402
+
+from app.parsers import sa_file  # noqa: E402
+from app.services import archive, catalog, instrument, sadf  # noqa: E402
+
+
+def test_archives_are_catalogued_and_inflated_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "INFLATE_DIR", str(tmp_path / "inflated"))
+    blob = _header() + b"".join(_record(i) + _stats(i) for i in range(4))
+    host = tmp_path / "host1"
+    host.mkdir()
+    (host / "sa20250101").write_bytes(blob)
+    (host / "sa20250102.gz").write_bytes(gzip.compress(blob))
+    (host / "sa20250103.xz").write_bytes(lzma.compress(blob))
+    (host / "sa20250104.xz").write_bytes(lzma.compress(blob)[:100])  # truncated
+
+    files = catalog.Catalog(None).sar_files(str(host))
+    assert [(f.date, f.host) for f in files] == [
+        ("2025-01-01", "host1"),
+        ("2025-01-02", "host1"),
+        ("2025-01-03", "host1"),
+        ("2025-01-04", ""),
+    ]
+
+    # entity lists come from the decompressing stream, without inflating
+    entities = sadf.list_entities(str(host / "sa20250103.xz"), "native")
+    assert entities == sadf.list_entities(str(host / "sa20250101"), "native")
+    assert entities["cpu"] == ["all", "0", "1"]
+    assert not (tmp_path / "inflated").exists()
+
+    want = sa_file.read_sa_frames(str(host / "sa20250101"))
+    instrument.clear()
+    for _ in range(2):
+        fmt, frames = sadf.convert_file(str(host / "sa20250102.gz"), "native")
+        assert fmt == "native"
+        for name, df in want.items():
+            pd.testing.assert_frame_equal(frames[name], df)
+    inflated = [r for r in instrument.recent() if r["stage"] == "archive.inflate"]
+    assert len(inflated) == 1 and inflated[0]["bytes"] == len(blob)
+    copy = archive.local_path(str(host / "sa20250102.gz"))
+    assert copy.endswith("-sa20250102") and Path(copy).read_bytes() == blob
+
+
+def test_inflated_copies_are_pruned_to_budget(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "INFLATE_DIR", str(tmp_path / "inflated"))
+    monkeypatch.setattr(archive, "INFLATE_MAX_BYTES", 1500)
+    paths = []
+    for day in range(3):
+        path = tmp_path / f"sa2025010{day + 1}.gz"
+        path.write_bytes(gzip.compress(bytes(1000)))
+        paths.append(archive.local_path(str(path)))
+    # each copy is 1000 bytes: only the newest fits, and it is never the one dropped
+    assert [Path(p).exists() for p in paths] == [False, False, True]
+
+
+def test_zst_is_listed_only_when_it_can_be_read(tmp_path, monkeypatch):
+    (tmp_path / "sa20250101.zst").write_bytes(b"\x28\xb5\x2f\xfd")
+    monkeypatch.delitem(archive.OPENERS, ".zst", raising=False)
+    assert catalog.Catalog(None).sar_files(str(tmp_path)) == []
+    monkeypatch.setitem(archive.OPENERS, ".zst", archive._open_zst)
+    assert [f.date for f in catalog.Catalog(None).sar_files(str(tmp_path))] == ["2025-01-01"]
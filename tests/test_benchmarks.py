@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmarks import run  # noqa: E402
+from benchmarks.fixtures import Shape  # noqa: E402
+
+
+def test_fixtures_decode_alike_in_every_form():
+    shape = Shape(interval=10, duration=60, cpus=3, disks=2, ifaces=3, filesystems=1)
+    report = run.run(shape, repeat=1, points=100)
+    results = report["results"]
+    # records x (cpus + all, memory, disks, ifaces, filesystems)
+    rows = 6 * (4 + 1 + 2 + 3 + 1)
+    assert results["json.stream.all"]["rows"] == results["csv.all"]["rows"] == rows
+    assert results["native.all"]["rows"] == rows
+    assert results["json.cpu"]["rows"] == 6 * 4
+    assert all(r["peak_bytes"] > 0 and r["min_s"] >= 0 for r in results.values())
+    slower = {"results": {k: v | {"min_s": v["min_s"] * 2 + 1} for k, v in results.items()}}
+    assert run.regressions(report, report, 0.2) == []
+    assert len(run.regressions(slower, report, 0.2)) == len(results)
@@ -0,0 +1,55 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from test_sa_file import _header, _record, _stats  # noqa: E402
+
+from app import bulk_export  # noqa: E402
+
+pytest.importorskip("pyarrow")
+
+
+def test_export_is_partitioned_and_resumable(tmp_path):
+    logs = tmp_path / "logs"
+    (logs / "dir1").mkdir(parents=True)
+    (logs / "dir2").mkdir()
+    sa = logs / "dir1" / "sa01"
+    sa.write_bytes(_header() + b"".join(_record(i) + _stats(i) for i in range(3)))
+    # another directory of the same host, with a file of the same name
+    (logs / "dir2" / "sa01").write_bytes(sa.read_bytes())
+    (logs / "dir1" / "sa20250102").write_bytes(b"not an sa file")
+    report = logs / "dir1" / "sar01"  # sysstat's text report: not sar data
+    report.write_text("Linux 6.1 (host1) \t01/01/2025\n")
+    out = tmp_path / "dataset"
+
+    assert bulk_export.main(["--logs", str(logs), "--out", str(out), "--prefer", "native"]) == 1
+    day = out / "host=host1" / "activity=cpu" / "date=2025-01-01"
+    assert len(list(day.glob("sa01-*.parquet"))) == 2
+    cpu = bulk_export.read_activity(str(out), "cpu")
+    assert len(cpu) == 12 and set(cpu["host"]) == {"host1"} and set(cpu["date"]) == {"2025-01-01"}
+    assert {"user", "idle"} <= set(cpu.columns)
+    assert "memused_pct" in bulk_export.read_activity(str(out), "memory").columns
+    entries = bulk_export.read_manifest(str(out))
+    assert entries[str(sa)]["status"] == "done"
+    assert entries[str(logs / "dir1" / "sa20250102")]["status"] == "error"
+    assert entries[str(report)]["status"] == "skipped"
+
+    # only the failed file is tried again; a grown file is exported again
+    assert [p.path for p in bulk_export.pending_files(str(logs), str(out))] == [
+        str(logs / "dir1" / "sa20250102")
+    ]
+    with open(sa, "ab") as f:
+        f.write(_record(3) + _stats(3))
+    assert len(bulk_export.pending_files(str(logs), str(out))) == 2
+    lines = (out / bulk_export.MANIFEST).read_text().splitlines()
+    assert {json.loads(line)["path"] for line in lines} == set(entries)
+
+    # without the failing file, a rerun succeeds and the report stays skipped
+    (logs / "dir1" / "sa20250102").unlink()
+    assert bulk_export.main(["--logs", str(logs), "--out", str(out), "--prefer", "native"]) == 0
+    # dir1/sa01 again (now 3 samples of 3 CPUs, its old partition replaced), dir2/sa01
+    assert len(bulk_export.read_activity(str(out), "cpu")) == 9 + 6
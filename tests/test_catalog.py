@@ -0,0 +1,83 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from test_sa_file import _header  # noqa: E402
+
+from app.services import catalog  # noqa: E402
+
+
+def test_catalog_reads_headers_once_and_persists(tmp_path, monkeypatch):
+    host = tmp_path / "host1"
+    host.mkdir()
+    (host / "sa01").write_bytes(_header())
+    (host / "sa20250102").write_bytes(b"not an sa file")
+    csv = host / "csv"
+    (csv / "2025-01-03").mkdir(parents=True)
+    (csv / "2025-01-03" / "cpu.csv").write_text("timestamp,cpu\n")
+    (csv / "2025-01-04").mkdir()
+
+    store = str(tmp_path / "cache" / "catalog.json")
+    cat = catalog.Catalog(store)
+    assert cat.sar_files(str(host)) == [
+        catalog.SarFile("2025-01-01", str(host / "sa01"), "host1", tuple(catalog.ACTIVITY_IDS)),
+        catalog.SarFile("2025-01-02", str(host / "sa20250102"), "", ()),
+    ]
+    assert cat.has_csv_bundle(str(host))
+    assert [d for d, _ in cat.csv_dates(str(host))] == ["2025-01-03", "2025-01-04"]
+    cat.save()
+
+    # a fresh catalog answers from disk; only a new file is read
+    read = []
+    real = catalog.read_sar_file
+    monkeypatch.setattr(catalog, "read_sar_file", lambda p: read.append(p) or real(p))
+    cat = catalog.Catalog(store)
+    assert len(cat.sar_files(str(host))) == 2 and read == []
+    (host / "sa02").write_bytes(_header())
+    assert [f.path for f in cat.sar_files(str(host))][-1] == str(host / "sa20250102")
+    assert read == [str(host / "sa02")]
+
+
+def test_unreadable_file_is_probed_again_only_once_changed(tmp_path, monkeypatch):
+    host = tmp_path / "host1"
+    host.mkdir()
+    bad = host / "junk"
+    bad.write_bytes(b"not an sa file")
+    read = []
+    real = catalog.read_sar_file
+    monkeypatch.setattr(catalog, "read_sar_file", lambda p: read.append(p) or real(p))
+    store = str(tmp_path / "cache" / "catalog.json")
+    cat = catalog.Catalog(store)
+    assert cat.sar_files(str(host)) == [catalog.SarFile("junk", str(bad), "", ())]
+    cat.save()
+    cat = catalog.Catalog(store)
+    cat.sar_files(str(host))
+    assert read == [str(bad)]
+
+    bad.write_bytes(_header())
+    assert cat.sar_files(str(host))[0].host == "host1"
+    assert read == [str(bad)] * 2
+
+
+def test_file_rewritten_in_place_is_read_again(tmp_path):
+    host = tmp_path / "host1"
+    host.mkdir()
+    sa = host / "sa01"
+    sa.write_bytes(_header(day=1))
+    store = str(tmp_path / "cache" / "catalog.json")
+    cat = catalog.Catalog(store)
+    assert cat.sar_files(str(host))[0].date == "2025-01-01"
+    cat.save()
+
+    # sadc starts the next month's sa01 over, same inode, directory untouched
+    dir_mtime = host.stat().st_mtime_ns
+    written = sa.stat().st_mtime_ns
+    with open(sa, "r+b") as f:
+        f.truncate(0)
+        f.write(_header(day=2, host=b"host2"))
+    os.utime(sa, ns=(written + 10**9, written + 10**9))  # a month later, in practice
+    assert host.stat().st_mtime_ns == dir_mtime
+    found = catalog.Catalog(store).sar_files(str(host))
+    assert [(f.date, f.host) for f in found] == [("2025-01-02", "host2")]
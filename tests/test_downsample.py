@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from app.services.downsample import (  # noqa: E402
+    downsample_frame,
+    lttb_indices,
+    minmax_indices,
+)
+
+
+def test_lttb_keeps_endpoints_and_spike():
+    y = np.zeros(10_000)
+    y[4321] = 100.0
+    x = np.arange(len(y), dtype=float)
+    idx = lttb_indices(x, y, 200)
+    assert len(idx) == 200 and idx[0] == 0 and idx[-1] == len(y) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert 4321 in idx
+
+
+def test_minmax_keeps_extremes_per_bucket():
+    y = np.sin(np.linspace(0, 20, 5_000))
+    y[1234] = -5.0
+    idx = minmax_indices(y, 100)
+    assert len(idx) <= 100 and np.all(np.diff(idx) > 0)
+    assert y[idx].min() == -5.0 and y[idx].max() == y.max()
+
+
+def test_downsample_frame_per_series_budget():
+    t = pd.date_range("2025-01-01", periods=86_400, freq="s")
+    df = pd.DataFrame({"a": np.random.default_rng(0).random(len(t)), "b": 1.0}, index=t)
+    out = downsample_frame(df, 500, "lttb")
+    assert out["a"].count() == 500 and out["b"].count() == 500
+    assert downsample_frame(df, 500, "raw") is df
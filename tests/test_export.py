@@ -0,0 +1,47 @@
+import gzip
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from app.services import export  # noqa: E402
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "timestamp": pd.to_datetime(["2025-01-01 00:00:01", "2025-01-01 00:00:02"]),
+            "cpu": pd.Categorical(["all", "0"]),
+            "user": [1.5, 2.5],
+        }
+    )
+
+
+def test_formats_round_trip():
+    df = _frame()
+    csv = export.to_bytes(df, "csv")
+    assert csv == df.to_csv(index=False).encode("utf-8")
+    assert gzip.decompress(export.to_bytes(df, "csv.gz")) == csv
+    back = pd.read_parquet(io.BytesIO(export.to_bytes(df, "parquet")))
+    pd.testing.assert_frame_equal(back, df, check_dtype=False, check_categorical=False)
+
+
+def test_export_is_built_once_per_key(monkeypatch):
+    calls = []
+    real = export.to_bytes
+
+    def counting(df, fmt):
+        calls.append(fmt)
+        return real(df, fmt)
+
+    monkeypatch.setattr(export, "to_bytes", counting)
+    df = _frame()
+    first = export.export_bytes(("test", 1), df, "csv.gz")
+    assert export.export_bytes(("test", 1), df, "csv.gz") is first
+    export.export_bytes(("test", 1), df, "csv")
+    export.export_bytes(("test", 2), df, "csv")
+    assert calls == ["csv.gz", "csv", "csv"]
+    export.CACHE.clear("export")
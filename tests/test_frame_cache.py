@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from app.services import frame_cache  # noqa: E402
+
+
+def test_cached_frames_are_shared_and_accounted():
+    calls = []
+
+    @frame_cache.cached
+    def load(n: int) -> dict[str, pd.DataFrame]:
+        calls.append(n)
+        return {"cpu": pd.DataFrame({"x": np.arange(n, dtype=np.float64)})}
+
+    before = frame_cache.CACHE.resident_bytes
+    first = load(1000)
+    assert load(1000) is first and calls == [1000]
+    assert frame_cache.CACHE.resident_bytes - before >= 8000
+
+    # with copy-on-write on (as app.py runs): editing a derived frame never touches the
+    # cached one
+    with pd.option_context("mode.copy_on_write", True):
+        col = first["cpu"]["x"]
+        col.iloc[0] = -1.0
+    assert first["cpu"]["x"].min() == 0.0
+
+    load.clear()
+    assert frame_cache.CACHE.resident_bytes == before
+    load(1000)
+    assert calls == [1000, 1000]
+    load.clear()
+
+
+def test_byte_budget_evicts_large_entries_first():
+    cache = frame_cache.FrameCache(max_bytes=100_000)
+
+    def frame(n: int) -> pd.DataFrame:
+        return pd.DataFrame({"x": np.zeros(n // 8)})
+
+    cache.put("small", frame(8_000))
+    cache.put("large", frame(60_000))
+    cache.put("medium", frame(40_000))
+    assert cache.resident_bytes <= 100_000
+    # over budget: the large entry goes before the older small one
+    assert [k for k in ("small", "large", "medium") if cache.get(k)[0]] == ["small", "medium"]
+    assert cache.get("missing") == (False, None)
+    cache.put("huge", frame(200_000))  # larger than the budget: not stored
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (2, 2, 1, 2)
+    assert stats.resident_bytes == cache.resident_bytes <= stats.max_bytes
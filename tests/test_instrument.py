@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from app.services import frame_cache, instrument  # noqa: E402
+
+
+def test_stages_record_time_fields_and_errors():
+    instrument.clear()
+
+    @instrument.timed("parse.test")
+    def parse(n: int) -> dict[str, pd.DataFrame]:
+        return {"a": pd.DataFrame({"x": range(n)}), "b": pd.DataFrame({"x": range(2)})}
+
+    with instrument.context(section="CPU"):
+        parse(3)
+        with pytest.raises(ValueError), instrument.stage("sadf.run", path="sa01"):
+            raise ValueError("bad file")
+
+    failed, parsed = instrument.recent()
+    assert parsed["stage"] == "parse.test" and parsed["rows"] == 5
+    assert parsed["section"] == "CPU" and parsed["seconds"] >= 0
+    assert parsed["peak_rss_delta"] >= 0 and "error" not in parsed
+    assert failed["stage"] == "sadf.run" and failed["path"] == "sa01"
+    assert failed["error"] == "ValueError"
+    # the context ends with its block
+    with instrument.stage("chart.render"):
+        pass
+    assert "section" not in instrument.recent(1)[0]
+
+
+def test_cache_lookups_are_recorded_as_hits_and_misses():
+    @frame_cache.cached
+    def load_stage_test(n: int) -> pd.DataFrame:
+        return pd.DataFrame({"x": range(n)})
+
+    instrument.clear()
+    load_stage_test(4)
+    load_stage_test(4)
+    hit, miss = instrument.recent()
+    assert hit["stage"] == miss["stage"] == "cache.load_stage_test"
+    assert (miss["cache"], hit["cache"]) == ("miss", "hit")
+    load_stage_test.clear()
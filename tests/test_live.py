@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from test_sa_file import _header, _record, _stats  # noqa: E402
+
+from app.parsers import sa_file  # noqa: E402
+from app.services import live  # noqa: E402
+
+
+def _assert_same(got: dict, want: dict) -> None:
+    for name, df in want.items():
+        pd.testing.assert_frame_equal(got[name], df, check_categorical=False)
+
+
+def test_read_sa_tail_resumes_where_it_stopped(tmp_path):
+    path = tmp_path / "sa01"
+    records = [_record(i) + _stats(i) for i in range(6)]
+    path.write_bytes(_header() + b"".join(records[:3]) + records[3][:40])
+    first, offset = sa_file.read_sa_tail(str(path))
+    assert first["cpu"]["timestamp"].dt.second.unique().tolist() == [1, 2]
+
+    path.write_bytes(_header() + b"".join(records))
+    rest, _ = sa_file.read_sa_tail(str(path), offset=offset)
+    # the record at offset is only read again as the base of the rates after it
+    assert rest["cpu"]["timestamp"].dt.second.unique().tolist() == [3, 4, 5]
+    full = sa_file.read_sa_frames(str(path))
+    for name, df in full.items():
+        joined = pd.concat([first[name], rest[name]], ignore_index=True)
+        pd.testing.assert_frame_equal(joined, df, check_categorical=False)
+
+
+def test_tail_appends_new_records_and_restarts_on_truncation(tmp_path):
+    path = tmp_path / "sa01"
+    records = [_record(i) + _stats(i) for i in range(8)]
+    path.write_bytes(_header() + b"".join(records[:4]))
+    tail = live.Tail(str(path), "native")
+    assert tail.refresh() > 0
+    assert tail.refresh() == 0  # unchanged file: nothing converted
+    before = tail.snapshot()[1]
+
+    path.write_bytes(_header() + b"".join(records))
+    assert tail.refresh() == 4 * 3 + 4 * 4  # 3 CPUs, 4 single-row activities per record
+    fmt, frames = tail.snapshot()
+    assert fmt == "native" and len(before["cpu"]) == 3 * 3
+    _assert_same(frames, sa_file.read_sa_frames(str(path)))
+
+    path.write_bytes(_header() + b"".join(records[:2]))  # rotated: shorter than before
+    tail.refresh()
+    _assert_same(tail.snapshot()[1], sa_file.read_sa_frames(str(path)))
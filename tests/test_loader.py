@@ -0,0 +1,181 @@
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from test_sa_file import _header, _record, _stats  # noqa: E402
+
+from app.services.loader import Selection, day_parts, load_frame  # noqa: E402
+
+
+def _bundle(root: Path, day: str, times: list[str]) -> str:
+    d = root / day
+    d.mkdir()
+    rows = "".join(f"{day} {t},all,{i}.0,1.0,0.0,90.0\n" for i, t in enumerate(times))
+    (d / "cpu.csv").write_text("timestamp,cpu,user,system,iowait,idle\n" + rows)
+    return str(d)
+
+
+def test_load_frame_joins_csv_days_in_time_order(tmp_path):
+    # second day listed first and written out of order: the result must still be sorted
+    d2 = _bundle(tmp_path, "2025-01-02", ["00:00:02", "00:00:01"])
+    d1 = _bundle(tmp_path, "2025-01-01", ["23:59:59"])
+    df, fmt = load_frame(Selection("csv", "auto", (d2, d1), ("2025-01-02", "2025-01-01")), "cpu")
+    assert fmt == "csv"
+    assert df["timestamp"].dt.strftime("%d %H:%M:%S").tolist() == [
+        "01 23:59:59",
+        "02 00:00:01",
+        "02 00:00:02",
+    ]
+    assert df["user"].tolist() == [0.0, 1.0, 0.0]
+
+    with pytest.raises(FileNotFoundError):
+        load_frame(Selection("csv", "auto", (d1,), ("2025-01-01",)), "memory")
+
+
+def test_window_is_clipped_per_day(tmp_path):
+    d1 = _bundle(tmp_path, "2025-01-01", ["23:59:59"])
+    d2 = _bundle(tmp_path, "2025-01-02", ["00:00:01", "00:00:02", "06:00:00"])
+    d3 = _bundle(tmp_path, "2025-01-03", ["00:00:01"])
+    days = ("2025-01-01", "2025-01-02", "2025-01-03")
+    sel = Selection("csv", "auto", (d1, d2, d3), days)
+    assert day_parts(sel) == ((d1, None), (d2, None), (d3, None))
+
+    sel = sel._replace(window=("2025-01-01 12:00:00", "2025-01-02 00:00:01"))
+    assert day_parts(sel) == (
+        (d1, ("2025-01-01 12:00:00", "2025-01-01 23:59:59")),
+        (d2, ("2025-01-02 00:00:00", "2025-01-02 00:00:01")),
+    )
+    df, _ = load_frame(sel, "cpu")
+    assert df["timestamp"].dt.strftime("%d %H:%M:%S").tolist() == ["01 23:59:59", "02 00:00:01"]
+
+
+def test_sar_file_span_comes_from_its_header(tmp_path, monkeypatch):
+    from app.services import parquet_cache, pool
+
+    monkeypatch.setattr(pool, "MAX_WORKERS", 1)
+    monkeypatch.setattr(parquet_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    # named for 2025-01-02, but started 2025-01-01 00:00:00 UTC by its header
+    path = tmp_path / "sa20250102"
+    path.write_bytes(_header(day=1) + b"".join(_record(i) + _stats(i) for i in range(4)))
+    window = ("2025-01-01 00:00:01", "2025-01-01 00:00:02")
+    sel = Selection("sar", "native", (str(path),), ("2025-01-02",), window=window)
+    assert day_parts(sel) == ((str(path), window),)
+    df, _ = load_frame(sel, "memory")
+    assert df["timestamp"].dt.strftime("%d %H:%M:%S").tolist() == ["01 00:00:01", "01 00:00:02"]
+
+
+def test_prefetch_loads_activities_together(tmp_path, monkeypatch):
+    from app.services import loader
+
+    d1 = _bundle(tmp_path, "2025-01-01", ["00:00:01"])
+    sel = Selection("csv", "auto", (d1,), ("2025-01-01",))
+    # every activity has to be loading at once for the barrier to open
+    barrier = threading.Barrier(len(loader.CSV_FILES), timeout=5)
+    calls = []
+
+    def slow_load(dirs, activity, window=None):
+        if activity not in calls:
+            calls.append(activity)
+            barrier.wait()
+        return pd.DataFrame({"activity": [activity]})
+
+    monkeypatch.setattr(loader, "load_csv_range", slow_load)
+    loader.prefetch(sel)
+    assert load_frame(sel, "disk")[0]["activity"].tolist() == ["disk"]
+    assert sorted(calls) == sorted(loader.CSV_FILES)
+
+
+def test_csv_day_reads_schema_columns_and_writes_a_sidecar(tmp_path, monkeypatch):
+    from app.services import csv_bundle
+
+    d = tmp_path / "2025-01-01"
+    d.mkdir()
+    path = d / "cpu.csv"
+    path.write_text(
+        "timestamp,cpu,user,system,iowait,idle,extra\n"
+        "2025-01-01 00:00:01,all,1.5,1.0,0.0,90.0,x\n"
+        "2025-01-01 00:00:02,0,2.5,1.0,0.0,90.0,y\n"
+    )
+    df = csv_bundle.read_csv_day(str(d), "cpu")
+    assert "extra" not in df.columns
+    assert isinstance(df["cpu"].dtype, pd.CategoricalDtype)
+    assert df["timestamp"].dtype == "datetime64[ns]"
+    side = csv_bundle.sidecar_path(str(path))
+    assert Path(side).is_file()
+
+    # an unchanged CSV is not parsed again
+    def parse(*args):
+        raise AssertionError("parsed the CSV")
+
+    monkeypatch.setattr(csv_bundle, "read_csv_file", parse)
+    again = csv_bundle.read_csv_day(str(d), "cpu")
+    pd.testing.assert_frame_equal(again, df)
+
+    # a rewritten CSV makes the sidecar stale
+    monkeypatch.undo()
+    path.write_text("timestamp,cpu,user\n2025-01-01T00:00:03,all,4.0\n")
+    df = csv_bundle.read_csv_day(str(d), "cpu")
+    assert df["user"].tolist() == [4.0]
+    assert df["timestamp"].dt.strftime("%H:%M:%S").tolist() == ["00:00:03"]
+
+
+def test_sar_range_without_a_pool(tmp_path, monkeypatch):
+    from app.parsers.sa_file import read_sa_frames
+    from app.services import loader, parquet_cache, pool
+
+    # no pool: each day converts in-process, on the thread of its shared conversion
+    monkeypatch.setattr(pool, "MAX_WORKERS", 1)
+    monkeypatch.setattr(parquet_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    parts = []
+    for day in ("01", "02"):
+        path = tmp_path / f"sa{day}"
+        path.write_bytes(_header() + b"".join(_record(i) + _stats(i) for i in range(4)))
+        parts.append((str(path), None))
+    result = []
+    worker = threading.Thread(
+        target=lambda: result.append(loader.load_sar_range(tuple(parts), "native")), daemon=True
+    )
+    worker.start()
+    worker.join(timeout=10)
+    assert result, "range conversion did not finish"
+    fmt, frames = result[0]
+    assert fmt == "native"
+    assert len(frames["cpu"]) == 2 * len(read_sa_frames(parts[0][0])["cpu"])
+
+
+# columns a CSV bundle file is read with (see csv_bundle.SCHEMAS): what the sections
+# chart, and so all that their views and exports hold
+CSV_COLUMNS = {
+    "cpu": ["timestamp", "cpu", "user", "system", "iowait", "idle"],
+    "memory": ["timestamp", "memused_pct", "memfree", "avail", "cached", "buffers", "commit_pct"],
+    "disk": ["timestamp", "dev", "tps", "rkB_s", "wkB_s", "await", "util_pct"],
+    "network": ["timestamp", "iface", "rxkB_s", "txkB_s", "rxpck_s", "txpck_s", "ifutil_pct"],
+    "filesystem": [
+        "timestamp",
+        "filesystem",
+        "mb_free",
+        "mb_used",
+        "fsused_pct",
+        "ufsused_pct",
+        "inodes_used_pct",
+    ],
+}
+
+
+def test_csv_bundle_keeps_only_charted_columns(tmp_path, monkeypatch):
+    from app.services import csv_bundle
+
+    monkeypatch.setattr(csv_bundle, "SIDECARS", False)
+    for activity, columns in CSV_COLUMNS.items():
+        header = ["extra", *reversed(columns), "%steal"]
+        row = ["x" if c in ("extra", "cpu", "dev", "iface", "filesystem") else "1" for c in header]
+        row[header.index("timestamp")] = "2025-01-01 00:00:01"
+        path = tmp_path / csv_bundle.CSV_FILES[activity]
+        path.write_text(",".join(header) + "\n" + ",".join(row) + "\n")
+        df = csv_bundle.read_csv_day(str(tmp_path), activity)
+        assert sorted(df.columns) == sorted(columns), activity
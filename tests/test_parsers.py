@@ -1,3 +1,4 @@
+import io
 import json
 import sys
 from pathlib import Path
@@ -6,7 +7,9 @@ from textwrap import dedent
 # Ensure the repository root is importable so we can import app.py directly
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
+from app.parsers.columnar import FrameBuilder, feed, iter_statistics  # noqa: E402
 from app.parsers.cpu import parse_cpu_csv, parse_cpu_json  # noqa: E402
+from app.parsers.disk import parse_disk_json  # noqa: E402
 
 
 def test_parse_cpu_json_basic():
@@ -52,3 +55,59 @@ def test_parse_cpu_csv_basic():
     ).strip()
     df = parse_cpu_csv(csv_text)
     assert list(df.columns) == ["timestamp", "cpu", "user", "system", "iowait", "idle"]
+
+
+def _stat(time: str, disks: list[dict]) -> dict:
+    return {"timestamp": {"date": "2025-01-01", "time": time, "utc": 1}, "disk": disks}
+
+
+def test_parse_disk_json_columns_and_timestamps():
+    doc = {
+        "sysstat": {
+            "hosts": [
+                {
+                    "statistics": [
+                        _stat("00:00:01", [{"disk-device": "sda", "tps": 1, "util-percent": 2.0}]),
+                        _stat(
+                            "00:00:02",
+                            [
+                                {"tps": 3, "disk-device": "sda", "util-percent": 4.0},
+                                {"disk-device": "sdb", "tps": 5},
+                            ],
+                        ),
+                    ]
+                }
+            ]
+        }
+    }
+    df = parse_disk_json(json.dumps(doc))
+    assert list(df.columns) == ["timestamp", "dev", "tps", "util_pct"]
+    assert df["dev"].tolist() == ["sda", "sda", "sdb"]
+    assert df["tps"].tolist() == [1.0, 3.0, 5.0]
+    assert df["util_pct"].isna().tolist() == [False, False, True]
+    assert df["timestamp"].dt.second.tolist() == [1, 2, 2]
+
+
+def test_frame_builder_chunks_match_single_pass():
+    stats = [
+        _stat(f"00:00:{i:02d}", [{"disk-device": d, "tps": i} for d in ("sda", "sdb")])
+        for i in range(10)
+    ]
+    chunked = FrameBuilder(lambda s: s["disk"], str, entity="disk-device", chunk_rows=3)
+    whole = FrameBuilder(lambda s: s["disk"], str, entity="disk-device")
+    feed([chunked, whole], stats)
+    assert chunked.frame().equals(whole.frame())
+
+    # frame() starts the builder over: more rows get their own timestamps
+    feed([chunked], [_stat("00:00:30", [{"disk-device": "sda", "tps": 30}])])
+    again = chunked.frame()
+    assert again["timestamp"].dt.second.tolist() == [30]
+    assert again["tps"].tolist() == [30]
+
+
+def test_iter_statistics_streams_records():
+    stats = [_stat(f"00:00:{i:02d}", [{"disk-device": "sda", "tps": i}]) for i in range(20)]
+    doc = {"sysstat": {"hosts": [{"nodename": "h", "statistics": stats, "restarts": []}]}}
+    text = json.dumps(doc, indent="\t")
+    for read_size in (1, 7, 4096):
+        assert list(iter_statistics(io.StringIO(text), read_size)) == stats
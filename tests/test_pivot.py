@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from app.services.pivot import wide_frame  # noqa: E402
+
+
+def _long() -> pd.DataFrame:
+    ts = pd.to_datetime(["2025-01-01 00:00:01", "2025-01-01 00:00:02"])
+    return pd.DataFrame(
+        {
+            "timestamp": np.repeat(ts, 2),
+            "dev": pd.Categorical(["sda", "sdb", "sda", "sdb"]),
+            "tps": [1.0, 2.0, 3.0, 4.0],
+            "await": [0.1, 0.2, 0.3, 0.4],
+        }
+    )
+
+
+def test_wide_frame_names_and_orders_columns():
+    wide = wide_frame(_long(), "dev", ["tps", "await", "missing"], ["sdb", "sda", "sdc"])
+    assert list(wide.columns) == [
+        "tps[sdb]",
+        "tps[sda]",
+        "tps[sdc]",
+        "await[sdb]",
+        "await[sda]",
+        "await[sdc]",
+    ]
+    assert wide["tps[sda]"].tolist() == [1.0, 3.0]
+    assert wide["await[sdb]"].tolist() == [0.2, 0.4]
+    assert wide["tps[sdc]"].isna().all()
+    assert wide.index.is_monotonic_increasing
+
+
+def test_wide_frame_keeps_last_of_overlapping_rows():
+    df = pd.concat([_long(), _long().assign(tps=9.0)], ignore_index=True)
+    df["cpu"] = [0, 0, 0, 0, 0, 0, 0, 0]
+    wide = wide_frame(df, "cpu", ["tps"], ["0"])
+    assert wide["tps[0]"].tolist() == [9.0, 9.0]
+    assert wide_frame(df.iloc[:0], "cpu", ["tps"], ["0"]).empty
+    assert wide_frame(df, "cpu", ["nope"], ["0"]).empty
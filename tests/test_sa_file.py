@@ -0,0 +1,197 @@
+import glob
+import json
+import shutil
+import struct
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from app.parsers import sa_file  # noqa: E402
+from app.parsers.columnar import statistics_of  # noqa: E402
+from app.services.sadf import _JSON_BUILDERS, ACTIVITY_ARGS  # noqa: E402
+
+T0 = 1735689600  # 2025-01-01 00:00:00 UTC
+
+# (id, has_nr, size, types_nr); id 2 (pcsw) is not decoded and must be skipped
+ACTS = [
+    (sa_file.A_CPU, 1, 80, (10, 0, 0)),
+    (2, 0, 16, (2, 0, 0)),
+    (sa_file.A_MEMORY, 0, 136, (17, 0, 0)),
+    (sa_file.A_DISK, 1, 64, (1, 3, 7)),
+    (sa_file.A_NET_DEV, 1, 80, (7, 0, 1)),
+    (sa_file.A_FS, 1, 296, (5, 0, 0)),
+]
+
+
+def _header(day: int = 1, host: bytes = b"host1") -> bytes:
+    magic = struct.pack("<HHBBBBII3I48x", 0xD596, 0x2175, 12, 6, 5, 0, 392, 0, 0, 1, 12)
+    names = b"".join(struct.pack("65s", n) for n in (b"Linux", host, b"6.1", b"x86_64"))
+    ust_time = T0 + (day - 1) * 86400
+    hdr = struct.pack("<QQIIi6I", ust_time, 100, 3, len(ACTS), 125, 1, 1, 12, 2, 0, 1)
+    hdr += (
+        struct.pack("<III", 36, 24, 0)
+        + struct.pack("BBb", day, 0, 8)
+        + names
+        + struct.pack("64s", b"UTC")
+    )
+    hdr = hdr.ljust(392, b"\0")
+    acts = b"".join(
+        struct.pack("<IIiiiiIII", aid, 0, 1, 1, has_nr, size, *types)
+        for aid, has_nr, size, types in ACTS
+    )
+    return magic + hdr + acts
+
+
+def _record(i: int, rtype: int = 1) -> bytes:
+    return struct.pack("<QQIBBBB", 1000 + i * 100, T0 + i, 0, rtype, 0, 0, i % 60)
+
+
+def _stats(i: int) -> bytes:
+    # cpu: "all" + 2 CPUs; each second adds 100 jiffies split user 30 / sys 10 / idle 60
+    cpu = struct.pack("<i", 3)
+    for scale in (2, 1, 1):
+        vals = [30 * i * scale, 0, 10 * i * scale, 60 * i * scale] + [0] * 6
+        cpu += struct.pack("<10Q", *vals)
+    pcsw = struct.pack("<QQ", i, i)
+    mem = [400, 100, 200, 1000, 0, 1000, 0, 500, 0, 0, 0, 0, 100, 0, 0, 0, 600]
+    memory = struct.pack("<17Q", *mem)
+    disk = struct.pack("<i", 1) + struct.pack(
+        "<4Q7I", 10 * i, 2048 * i, 0, 0, 5 * i, 5 * i, 500 * i, 0, 0, 8, 0
+    ).ljust(64, b"\0")
+    net = struct.pack("<i", 1)
+    net += struct.pack("<7QI16sB", 0, 0, 1024 * i, 2048 * i, 0, 0, 0, 1, b"eth0", 2).ljust(
+        80, b"\0"
+    )
+    fs = struct.pack("<i", 1)
+    fs += struct.pack("<5Q128s128s", 4 << 20, 1 << 20, 1 << 20, 100, 25, b"/dev/sda1", b"/")
+    return cpu + pcsw + memory + disk + net + fs
+
+
+def test_read_sa_frames_synthetic(tmp_path):
+    blob = _header()
+    for i in range(3):
+        blob += _record(i) + _stats(i)
+    blob += _record(3, sa_file.R_COMMENT) + b"hello".ljust(64, b"\0")
+    blob += _record(4, sa_file.R_RESTART) + struct.pack("<I", 3)
+    blob += _record(5) + _stats(5) + _record(6) + _stats(6)
+    blob += _record(7)[:10]  # sadc still writing
+    path = tmp_path / "sa01"
+    path.write_bytes(blob)
+
+    hdr = sa_file.read_sa_header(str(path))
+    assert (hdr.nodename, hdr.file_date, hdr.version) == ("host1", "2025-01-01", "12.6.5")
+    assert [a.id for a in hdr.activities] == [a[0] for a in ACTS]
+
+    frames = sa_file.read_sa_frames(str(path))
+    cpu = frames["cpu"]
+    # records 1, 2 and 6 have a usable previous record; 0 and 5 start an epoch
+    assert cpu["timestamp"].dt.second.unique().tolist() == [1, 2, 6]
+    assert cpu["cpu"].tolist()[:3] == ["all", "0", "1"]
+    assert cpu[["user", "system", "iowait", "idle"]].iloc[0].tolist() == [30.0, 10.0, 0.0, 60.0]
+
+    mem = frames["memory"].iloc[0]
+    assert mem["memused"] == 1000 - (400 + 100 + 200 + 100)
+    assert mem["memused_pct"] == pytest.approx(20.0)
+    assert mem["commit_pct"] == pytest.approx(25.0)
+
+    disk = frames["disk"].iloc[0]
+    assert disk["dev"] == "dev8-0"
+    assert (disk["tps"], disk["rkB"], disk["await"], disk["util_pct"]) == (10.0, 1024.0, 1.0, 50.0)
+
+    net = frames["network"].iloc[0]
+    assert (net["iface"], net["rxkB"], net["txkB"]) == ("eth0", 1.0, 2.0)
+    assert net["ifutil_pct"] == pytest.approx(2048 * 800 / 1_000_000)
+
+    fs = frames["filesystem"].iloc[0]
+    assert (fs["filesystem"], fs["mb_free"], fs["mb_used"], fs["fsused_pct"]) == (
+        "/dev/sda1",
+        1.0,
+        3.0,
+        75.0,
+    )
+    assert fs["inodes_used_pct"] == 75.0
+
+
+def test_record_times_are_read_at_fixed_offsets(tmp_path):
+    # late in the day, with an uptime (1/100 s) in the range of epoch seconds: the
+    # uptime is nearer the header's time than the record time is, yet not the time
+    def record(i: int) -> bytes:
+        return struct.pack("<QQIBBBB", T0 + i * 100, T0 + 86000 + i, 0, 1, 23, 53, 20 + i)
+
+    path = tmp_path / "sa01"
+    path.write_bytes(_header() + b"".join(record(i) + _stats(i) for i in range(3)))
+    cpu = sa_file.read_sa_frames(str(path))["cpu"]
+    assert cpu["timestamp"].dt.strftime("%H:%M:%S").unique().tolist() == ["23:53:21", "23:53:22"]
+    assert cpu[["user", "system", "idle"]].iloc[0].tolist() == [30.0, 10.0, 60.0]
+
+
+def test_read_sa_frames_only_selected_entities(tmp_path):
+    blob = _header() + b"".join(_record(i) + _stats(i) for i in range(3))
+    path = tmp_path / "sa01"
+    path.write_bytes(blob)
+    assert sa_file.read_sa_entities(str(path)) == {
+        "cpu": ["all", "0", "1"],
+        "disk": ["dev8-0"],
+        "network": ["eth0"],
+        "filesystem": ["/dev/sda1"],
+    }
+    full = sa_file.read_sa_frames(str(path))
+    frames = sa_file.read_sa_frames(str(path), {"cpu": ("1",), "disk": (), "network": ("lo",)})
+    assert frames["cpu"]["cpu"].unique().tolist() == ["1"]
+    pd.testing.assert_frame_equal(
+        frames["cpu"],
+        full["cpu"][full["cpu"]["cpu"] == "1"].reset_index(drop=True),
+        check_categorical=False,
+    )
+    assert frames["disk"].empty and frames["network"].empty
+    assert len(frames["filesystem"]) == len(full["filesystem"])
+
+
+def test_read_sa_frames_window_matches_full_decode(tmp_path):
+    blob = _header() + b"".join(_record(i) + _stats(i) for i in range(8))
+    path = tmp_path / "sa01"
+    path.write_bytes(blob)
+    full = sa_file.read_sa_frames(str(path))
+    part = sa_file.read_sa_frames(str(path), window=(T0 + 3, T0 + 5))
+    for name, df in full.items():
+        ts = df["timestamp"]
+        lo, hi = pd.Timestamp(T0 + 3, unit="s"), pd.Timestamp(T0 + 5, unit="s")
+        expected = df[ts.between(lo, hi)].reset_index(drop=True)
+        assert part[name].equals(expected), name
+        assert len(expected) > 0
+
+
+def test_read_sa_header_rejects_other_formats(tmp_path):
+    path = tmp_path / "sa01"
+    path.write_bytes(struct.pack("<HH", 0xD596, 0x2171).ljust(200, b"\0"))
+    with pytest.raises(ValueError):
+        sa_file.read_sa_header(str(path))
+
+
+SAMPLES = sorted(glob.glob(str(Path(__file__).resolve().parents[1] / "samples" / "*.dat")))
+
+
+@pytest.mark.skipif(not SAMPLES or not shutil.which("sadf"), reason="needs samples/ and sadf")
+@pytest.mark.parametrize("path", SAMPLES)
+def test_native_reader_matches_sadf(path):
+    sar_args = [a for args in ACTIVITY_ARGS.values() for a in args]
+    out = subprocess.run(["sadf", "-j", path, "--", *sar_args], capture_output=True, text=True)
+    stats = statistics_of(json.loads(out.stdout))
+    native = sa_file.read_sa_frames(path)
+    for name, make in _JSON_BUILDERS.items():
+        builder = make()
+        for stat in stats:
+            builder.add(stat)
+        expected = builder.frame()
+        got = native[name]
+        assert len(got) == len(expected), name
+        for col in expected.columns:
+            if col == "timestamp" or not pd.api.types.is_numeric_dtype(expected[col]):
+                assert got[col].tolist() == expected[col].tolist(), (name, col)
+            else:
+                assert got[col].to_numpy() == pytest.approx(expected[col].to_numpy(), abs=0.01)
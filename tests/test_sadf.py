@@ -0,0 +1,228 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from textwrap import dedent
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from app.services import parquet_cache, pool, sadf  # noqa: E402
+
+
+def test_split_sadf_csv_by_activity():
+    text = dedent(
+        """
+        # hostname;interval;timestamp;CPU;%user;%nice;%system;%iowait;%steal;%idle
+        host;1;2025-01-01 00:00:01 UTC;-1;1.0;0.0;2.0;0.5;0.0;96.5
+        # hostname;interval;timestamp;kbmemfree;kbavail;kbmemused;%memused
+        host;1;2025-01-01 00:00:01 UTC;100;200;300;40.0
+        # hostname;interval;timestamp;IFACE;rxpck/s;txpck/s;rxkB/s;txkB/s
+        host;1;2025-01-01 00:00:01 UTC;eth0;1.0;2.0;3.0;4.0
+        """
+    ).strip()
+    sections = sadf.split_sadf_csv(text)
+    assert set(sections) == {"cpu", "memory", "network"}
+    # lines as they stream from the sadf pipe split the same way
+    assert sadf.split_sadf_csv(iter(text.splitlines(keepends=True))) == sections
+    assert sections["cpu"].splitlines()[0].startswith("hostname;interval;timestamp;CPU")
+    cpu = sadf.parse_cpu_csv(sections["cpu"])
+    assert cpu["cpu"].tolist() == ["all"]
+
+
+def test_load_sar_frames_single_pass(monkeypatch):
+    calls = []
+    stat = {
+        "timestamp": {"date": "2025-01-01", "time": "00:00:01", "utc": 1, "interval": 1},
+        "cpu-load": [{"cpu": "all", "user": 1.0, "system": 2.0, "iowait": 0.5, "idle": 96.5}],
+        "memory": {"memfree": 100, "memused-percent": 40.0},
+        "disk": [{"disk-device": "sda", "tps": 1.0, "util-percent": 2.0}],
+    }
+
+    def fake_stream(path, sar_args, window=None):
+        calls.append(sar_args)
+        yield stat
+
+    monkeypatch.setattr(sadf, "stream_sadf_json", fake_stream)
+    monkeypatch.setattr(sadf.shutil, "which", lambda name: f"/usr/bin/{name}")
+    sadf._load_sar_frames.clear()
+    fmt, frames = sadf.load_sar_frames("sa01", "auto")
+    assert fmt == "json" and len(calls) == 1
+    assert set(frames) == set(sadf.ACTIVITY_ARGS)
+    assert frames["memory"]["memused_pct"].tolist() == [40.0]
+    assert frames["disk"]["util_pct"].tolist() == [2.0]
+    assert frames["network"].empty and frames["filesystem"].empty
+
+
+def test_parquet_cache_keyed_by_file_identity(tmp_path, monkeypatch):
+    monkeypatch.setattr(parquet_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    sa = tmp_path / "sa01"
+    sa.write_bytes(b"v1")
+    key = parquet_cache.cache_key(str(sa), ("-u",), "auto")
+    assert key and parquet_cache.load(key) is None
+    frames = {"memory": pd.DataFrame({"timestamp": pd.to_datetime(["2025-01-01"]), "x": [1.0]})}
+    parquet_cache.store(key, "json", frames)
+    fmt, loaded = parquet_cache.load(key) or ("", {})
+    assert fmt == "json" and loaded["memory"].equals(frames["memory"])
+
+    sa.write_bytes(b"version2")
+    assert parquet_cache.cache_key(str(sa), ("-u",), "auto") != key
+    assert parquet_cache.cache_key(str(sa), ("-r",), "auto") != key
+
+    # a store interrupted midway leaves a temp dir: kept while it may still be written
+    cache = tmp_path / "cache"
+    fresh, orphan = cache / ".tmp-fresh", cache / ".tmp-orphan"
+    fresh.mkdir()
+    orphan.mkdir()
+    (orphan / "cpu.parquet").write_bytes(b"partial")
+    old = time.time() - parquet_cache.TMP_GRACE_S - 1
+    os.utime(orphan, (old, old))
+    parquet_cache.prune(0)
+    assert parquet_cache.load(key) is None
+    assert fresh.is_dir() and not orphan.exists()
+
+
+def test_sar_args_push_entity_filters_down():
+    assert sadf.sar_args() == ("-u", "-P", "ALL", "-r", "-d", "-n", "DEV", "-F")
+    filters = sadf.Filters(cpu=("all",), disk=(), network=("eth0", "eth1"), filesystem=None)
+    assert sadf.sar_args(filters) == ("-u", "-r", "-n", "DEV", "--iface=eth0,eth1", "-F")
+    assert sadf.sar_args(sadf.Filters(cpu=("all", "3")))[:3] == ("-u", "-P", "all,3")
+    key = parquet_cache.cache_key(__file__, sadf.sar_args(filters), "auto")
+    assert key != parquet_cache.cache_key(__file__, sadf.sar_args(), "auto")
+
+
+def test_time_window_args_and_cut():
+    window = ("2025-01-01 10:00:00", "2025-01-01 10:20:59")
+    assert sadf.time_args(None) == ()
+    assert sadf.time_args(window) == ("-s", "10:00:00", "-e", "10:20:59")
+    ts = pd.to_datetime(["2025-01-01 09:59:59", "2025-01-01 10:00:00", "2025-01-01 10:21:00"])
+    frames = {"memory": pd.DataFrame({"timestamp": ts, "x": [1.0, 2.0, 3.0]})}
+    assert sadf.window_frames(frames, window)["memory"]["x"].tolist() == [2.0]
+    # sadf only matches times of day: a window across midnight is not pushed down
+    assert sadf.time_args(("2025-01-01 23:00:00", "2025-01-02 01:00:00")) == ()
+
+
+def test_windowed_conversion_is_cut_to_the_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(parquet_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    # what sadf -s 10:00:00 -e 10:20:59 prints for a file spanning two UTC dates
+    ts = pd.to_datetime(["2025-01-01 10:00:00", "2025-01-02 10:00:00"])
+    frames = {"memory": pd.DataFrame({"timestamp": ts, "x": [1.0, 2.0]})}
+    monkeypatch.setattr(sadf, "_convert_frames", lambda *a: ("json", frames))
+    window = ("2025-01-02 10:00:00", "2025-01-02 10:20:59")
+    for _ in range(2):  # converted, then from the Parquet cache
+        _, got = sadf.convert_cached(__file__, "auto", window=window)
+        assert got["memory"]["x"].tolist() == [2.0]
+
+
+def test_concurrent_identical_conversions_share_one_sadf_run(tmp_path, monkeypatch):
+    calls = []
+    release = threading.Event()
+    stat = {
+        "timestamp": {"date": "2025-01-01", "time": "00:00:01", "utc": 1, "interval": 1},
+        "memory": {"memfree": 100, "memused-percent": 40.0},
+    }
+
+    def fake_stream(path, sar_args, window=None):
+        calls.append(path)
+        release.wait(5)
+        yield stat
+
+    monkeypatch.setattr(sadf, "stream_sadf_json", fake_stream)
+    monkeypatch.setattr(sadf.shutil, "which", lambda name: f"/usr/bin/{name}")
+    monkeypatch.setattr(parquet_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    sa = tmp_path / "sa01"
+    sa.write_bytes(b"v1")
+    joined = sadf.CONVERSIONS.joined
+    with ThreadPoolExecutor(4) as sessions:
+        results = [sessions.submit(sadf.convert_cached, str(sa), "auto") for _ in range(4)]
+        while sadf.CONVERSIONS.joined < joined + 3:
+            time.sleep(0.01)
+        release.set()
+        frames = [r.result()[1] for r in results]
+    assert len(calls) == 1
+    assert all(f["memory"] is frames[0]["memory"] for f in frames)
+    # stored on the way out: the next miss-free caller reads the cache
+    assert sadf.convert_cached(str(sa), "auto")[1]["memory"]["memused_pct"].tolist() == [40.0]
+    assert len(calls) == 1
+
+
+def test_single_flight_slots_and_giving_up():
+    flights = sadf.SingleFlight("test", slots=1)
+    gate = threading.Event()
+    running = []
+
+    def job(name):
+        running.append(name)
+        gate.wait(5)
+        return name
+
+    first = flights.submit("a", job, "a")
+    second = flights.submit("b", job, "b")
+    while not running:
+        time.sleep(0.01)
+    with pytest.raises(TimeoutError):
+        sadf.wait(second, timeout=0.05)
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(sadf.Cancelled):
+        sadf.wait(first, cancel=cancel)
+    assert running == ["a"]  # one slot: b queues behind a
+    gate.set()
+    # waiters that gave up did not stop the runs
+    assert (sadf.wait(first), sadf.wait(second)) == ("a", "b")
+
+
+SLOW = [sys.executable, "-c", "import time; print('first', flush=True); time.sleep(30)"]
+
+
+def test_sadf_process_streams_output_and_times_out():
+    start = time.monotonic()
+    with sadf.SadfProcess(SLOW, timeout=0.5) as proc:
+        assert proc.stdout.readline() == "first\n"  # partial output, while it still runs
+        assert proc.stdout.read() == ""  # ends when the timeout kills it
+        with pytest.raises(TimeoutError):
+            proc.check()
+    assert time.monotonic() - start < 10
+
+
+def test_abandoned_flight_kills_its_process(monkeypatch):
+    monkeypatch.setattr(sadf, "_GRACE", 0.0)
+    flights = sadf.SingleFlight("test")
+    started = threading.Event()
+    procs = []
+
+    def convert():
+        with sadf.SadfProcess(SLOW) as proc:
+            procs.append(proc)
+            started.set()
+            out = proc.stdout.read()
+            proc.check()
+        return out
+
+    flight = flights.submit("sa01", convert)
+    assert started.wait(5)
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    with pytest.raises(sadf.Cancelled):
+        sadf.wait(flight, cancel=cancel)  # the only waiter gives up
+    with pytest.raises(sadf.Cancelled):
+        flight.future.result(timeout=10)
+    assert procs[0].killed == "cancelled" and procs[0].proc.returncode is not None
+
+
+def test_cancel_reaches_sadf_running_in_a_pool_worker(monkeypatch):
+    monkeypatch.setattr(pool, "MAX_WORKERS", 2)
+    monkeypatch.setattr(pool, "_pool", None)
+    cancel = threading.Event()
+    threading.Timer(3.0, cancel.set).start()  # after the spawned worker has started SLOW
+    start = time.monotonic()
+    try:
+        with pytest.raises(sadf.Cancelled):
+            pool.run_pooled(sadf._run, SLOW, cancel=cancel)
+    finally:
+        pool.get_pool().shutdown()
+    assert time.monotonic() - start < 15